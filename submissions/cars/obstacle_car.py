@@ -6,154 +6,216 @@ Handles AI-controlled cars that the player must avoid
 import pygame
 import random
 from config import *
+from utils.sprite_cache import sprite_cache
+
+
+CAR_TYPES = ('sedan', 'sports', 'suv')
 
 
 class ObstacleCar:
     """AI-controlled obstacle car"""
     
-    def __init__(self, road_left, road_right):
+    def __init__(self, road_left, road_right, x=None, y=None, speed=OBSTACLE_CAR_SPEED):
         self.width = OBSTACLE_CAR_WIDTH
         self.height = OBSTACLE_CAR_HEIGHT
-        self.x = random.randint(road_left, road_right - self.width)
-        self.y = -self.height
-        self.speed = OBSTACLE_CAR_SPEED
+        self.x = random.randint(road_left, road_right - self.width) if x is None else x
+        self.y = -self.height if y is None else y
+        # Where the car drives on the straight road; a curving track shifts x from it
+        self.lane_x = self.x
+        self.speed = speed
         self.color = random.choice(OBSTACLE_CAR_COLORS)
-        self.car_type = random.choice(['sedan', 'sports', 'suv'])
+        self.car_type = random.choice(CAR_TYPES)
+        
+        # Collision rect, kept in step with x/y instead of rebuilt
+        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        # Sprite bounds, the area the collision mask covers, for the cheap box test before it
+        self.bounds = self.rect.inflate(SPRITE_PADDING * 2, SPRITE_PADDING * 2)
         
-    def draw(self, screen):
-        """Draw the obstacle car based on its type"""
+    def draw(self, screen, simplified=False):
+        """Draw the obstacle car based on its type (or as a plain block when simplified)"""
+        if simplified:
+            self._draw_simple(screen, self.x, self.y)
+        else:
+            self._draw_body(screen, self.x, self.y)
+            
+    def _draw_body(self, screen, x, y):
+        """Draw the car body with its top-left corner at (x, y)"""
         if self.car_type == 'sports':
-            self._draw_sports_car(screen)
+            self._draw_sports_car(screen, x, y)
         elif self.car_type == 'suv':
-            self._draw_suv(screen)
+            self._draw_suv(screen, x, y)
         else:
-            self._draw_sedan(screen)
+            self._draw_sedan(screen, x, y)
             
-    def _draw_sedan(self, screen):
+    def draw_scaled(self, screen, scale, simplified=False):
+        """Draw the car from its cached sprite onto a surface at the given (x, y) scale"""
+        screen.blit(self.sprite(scale, simplified), ((self.x - SPRITE_PADDING) * scale[0],
+                                                     (self.y - SPRITE_PADDING) * scale[1]))
+                                                     
+    def sprite(self, scale=(1.0, 1.0), simplified=False):
+        """Cached sprite for the car's current look; its top-left is SPRITE_PADDING above-left of the car"""
+        if simplified:
+            return sprite_cache.get(('simple', self.color), self.build_simple_sprite, scale)
+        return sprite_cache.get(self.sprite_key(), self.build_sprite, scale)
+        
+    def sprite_key(self):
+        """Key identifying the car's look in the sprite cache"""
+        return (self.car_type, self.color)
+        
+    def collision_mask(self):
+        """Pixel mask of the car's full sprite, shared by every car with the same look"""
+        return sprite_cache.mask(self.sprite_key(), self.build_sprite)
+        
+    def build_sprite(self):
+        """Render the car once onto a transparent, padded surface"""
+        sprite = pygame.Surface((self.width + SPRITE_PADDING * 2, self.height + SPRITE_PADDING * 2),
+                                pygame.SRCALPHA)
+        self._draw_body(sprite, SPRITE_PADDING, SPRITE_PADDING)
+        return sprite
+        
+    def build_simple_sprite(self):
+        """Render the low-quality block version once, padded like the full sprite"""
+        sprite = pygame.Surface((self.width + SPRITE_PADDING * 2, self.height + SPRITE_PADDING * 2),
+                                pygame.SRCALPHA)
+        self._draw_simple(sprite, SPRITE_PADDING, SPRITE_PADDING)
+        return sprite
+        
+    def _draw_sedan(self, screen, x, y):
         """Draw a sedan style car"""
         # Main car body
-        pygame.draw.rect(screen, self.color, (self.x + 5, self.y + 5, self.width - 10, self.height - 25))
+        pygame.draw.rect(screen, self.color, (x + 5, y + 5, self.width - 10, self.height - 25))
         
         # Car rear (back bumper area)
         rear_points = [
-            (self.x + 10, self.y + self.height - 20),
-            (self.x + self.width - 10, self.y + self.height - 20),
-            (self.x + self.width - 5, self.y + self.height - 5),
-            (self.x + 5, self.y + self.height - 5)
+            (x + 10, y + self.height - 20),
+            (x + self.width - 10, y + self.height - 20),
+            (x + self.width - 5, y + self.height - 5),
+            (x + 5, y + self.height - 5)
         ]
         pygame.draw.polygon(screen, self.color, rear_points)
         
         # Rear window
         rear_window_points = [
-            (self.x + 10, self.y + self.height - 20),
-            (self.x + self.width - 10, self.y + self.height - 20),
-            (self.x + self.width - 15, self.y + self.height - 35),
-            (self.x + 15, self.y + self.height - 35)
+            (x + 10, y + self.height - 20),
+            (x + self.width - 10, y + self.height - 20),
+            (x + self.width - 15, y + self.height - 35),
+            (x + 15, y + self.height - 35)
         ]
         pygame.draw.polygon(screen, (100, 100, 150), rear_window_points)
         
         # Front windshield
-        pygame.draw.rect(screen, (100, 100, 150), (self.x + 12, self.y + 10, self.width - 24, 15))
+        pygame.draw.rect(screen, (100, 100, 150), (x + 12, y + 10, self.width - 24, 15))
         
         # Wheels
-        self._draw_wheels(screen)
+        self._draw_wheels(screen, x, y)
         
         # Brake lights
-        pygame.draw.rect(screen, (150, 0, 0), (self.x + 8, self.y + self.height - 8, 8, 3))
-        pygame.draw.rect(screen, (150, 0, 0), (self.x + self.width - 16, self.y + self.height - 8, 8, 3))
+        pygame.draw.rect(screen, (150, 0, 0), (x + 8, y + self.height - 8, 8, 3))
+        pygame.draw.rect(screen, (150, 0, 0), (x + self.width - 16, y + self.height - 8, 8, 3))
         
         # Roof detail
         darker_color = (max(0, self.color[0] - 30),
                        max(0, self.color[1] - 30),
                        max(0, self.color[2] - 30))
-        pygame.draw.rect(screen, darker_color, (self.x + 15, self.y + 30, self.width - 30, 20))
-    
-    def _draw_sports_car(self, screen):
+        pygame.draw.rect(screen, darker_color, (x + 15, y + 30, self.width - 30, 20))
+        
+    def _draw_sports_car(self, screen, x, y):
         """Draw a sports car style (lower, sleeker)"""
         # Main body - lower profile
-        pygame.draw.rect(screen, self.color, (self.x + 3, self.y + 10, self.width - 6, self.height - 30))
+        pygame.draw.rect(screen, self.color, (x + 3, y + 10, self.width - 6, self.height - 30))
         
         # Sloped rear
         rear_points = [
-            (self.x + 8, self.y + self.height - 20),
-            (self.x + self.width - 8, self.y + self.height - 20),
-            (self.x + self.width - 3, self.y + self.height - 5),
-            (self.x + 3, self.y + self.height - 5)
+            (x + 8, y + self.height - 20),
+            (x + self.width - 8, y + self.height - 20),
+            (x + self.width - 3, y + self.height - 5),
+            (x + 3, y + self.height - 5)
         ]
         pygame.draw.polygon(screen, self.color, rear_points)
         
         # Windshield - more angled
         pygame.draw.polygon(screen, (80, 80, 120), [
-            (self.x + 10, self.y + 15),
-            (self.x + self.width - 10, self.y + 15),
-            (self.x + self.width - 12, self.y + 25),
-            (self.x + 12, self.y + 25)
+            (x + 10, y + 15),
+            (x + self.width - 10, y + 15),
+            (x + self.width - 12, y + 25),
+            (x + 12, y + 25)
         ])
         
         # Spoiler
-        pygame.draw.rect(screen, BLACK, (self.x + 8, self.y + self.height - 22, self.width - 16, 2))
+        pygame.draw.rect(screen, BLACK, (x + 8, y + self.height - 22, self.width - 16, 2))
         
         # Wheels
-        self._draw_wheels(screen)
+        self._draw_wheels(screen, x, y)
         
         # Racing stripe
-        pygame.draw.rect(screen, WHITE, (self.x + self.width // 2 - 2, self.y + 8, 4, self.height - 18))
+        pygame.draw.rect(screen, WHITE, (x + self.width // 2 - 2, y + 8, 4, self.height - 18))
         
-    def _draw_suv(self, screen):
+    def _draw_suv(self, screen, x, y):
         """Draw an SUV style (taller, boxier)"""
         # Main body - taller
-        pygame.draw.rect(screen, self.color, (self.x + 5, self.y + 3, self.width - 10, self.height - 20))
+        pygame.draw.rect(screen, self.color, (x + 5, y + 3, self.width - 10, self.height - 20))
         
         # Rear
-        pygame.draw.rect(screen, self.color, (self.x + 5, self.y + self.height - 17, self.width - 10, 12))
+        pygame.draw.rect(screen, self.color, (x + 5, y + self.height - 17, self.width - 10, 12))
         
         # Windows
-        pygame.draw.rect(screen, (90, 90, 130), (self.x + 10, self.y + 8, self.width - 20, 15))
-        pygame.draw.rect(screen, (90, 90, 130), (self.x + 10, self.y + 35, self.width - 20, 20))
+        pygame.draw.rect(screen, (90, 90, 130), (x + 10, y + 8, self.width - 20, 15))
+        pygame.draw.rect(screen, (90, 90, 130), (x + 10, y + 35, self.width - 20, 20))
         
         # Wheels - larger for SUV
-        pygame.draw.ellipse(screen, BLACK, (self.x - 4, self.y + 8, 12, 22))
-        pygame.draw.ellipse(screen, GRAY, (self.x - 2, self.y + 10, 8, 18))
+        pygame.draw.ellipse(screen, BLACK, (x - 4, y + 8, 12, 22))
+        pygame.draw.ellipse(screen, GRAY, (x - 2, y + 10, 8, 18))
         
-        pygame.draw.ellipse(screen, BLACK, (self.x + self.width - 8, self.y + 8, 12, 22))
-        pygame.draw.ellipse(screen, GRAY, (self.x + self.width - 6, self.y + 10, 8, 18))
+        pygame.draw.ellipse(screen, BLACK, (x + self.width - 8, y + 8, 12, 22))
+        pygame.draw.ellipse(screen, GRAY, (x + self.width - 6, y + 10, 8, 18))
         
-        pygame.draw.ellipse(screen, BLACK, (self.x - 4, self.y + 50, 12, 22))
-        pygame.draw.ellipse(screen, GRAY, (self.x - 2, self.y + 52, 8, 18))
+        pygame.draw.ellipse(screen, BLACK, (x - 4, y + 50, 12, 22))
+        pygame.draw.ellipse(screen, GRAY, (x - 2, y + 52, 8, 18))
         
-        pygame.draw.ellipse(screen, BLACK, (self.x + self.width - 8, self.y + 50, 12, 22))
-        pygame.draw.ellipse(screen, GRAY, (self.x + self.width - 6, self.y + 52, 8, 18))
+        pygame.draw.ellipse(screen, BLACK, (x + self.width - 8, y + 50, 12, 22))
+        pygame.draw.ellipse(screen, GRAY, (x + self.width - 6, y + 52, 8, 18))
         
         # Roof rack
-        pygame.draw.rect(screen, DARK_GRAY, (self.x + 8, self.y + 5, self.width - 16, 2))
+        pygame.draw.rect(screen, DARK_GRAY, (x + 8, y + 5, self.width - 16, 2))
         
-    def _draw_wheels(self, screen):
+    def _draw_simple(self, screen, x, y):
+        """Draw a cheap silhouette: body, windshield and wheel blocks"""
+        pygame.draw.rect(screen, BLACK, (x - 3, y + 10, self.width + 6, self.height - 20))
+        pygame.draw.rect(screen, self.color, (x + 3, y + 3, self.width - 6, self.height - 6))
+        pygame.draw.rect(screen, (100, 100, 150), (x + 10, y + 10, self.width - 20, 12))
+        
+    def _draw_wheels(self, screen, x, y):
         """Draw standard wheels for sedan and sports cars"""
         # Front left
-        pygame.draw.rect(screen, BLACK, (self.x - 3, self.y + 10, 8, 18), border_radius=3)
-        pygame.draw.circle(screen, GRAY, (self.x + 1, self.y + 19), 3)
+        pygame.draw.rect(screen, BLACK, (x - 3, y + 10, 8, 18), border_radius=3)
+        pygame.draw.circle(screen, GRAY, (x + 1, y + 19), 3)
         # Front right
-        pygame.draw.rect(screen, BLACK, (self.x + self.width - 5, self.y + 10, 8, 18), border_radius=3)
-        pygame.draw.circle(screen, GRAY, (self.x + self.width - 1, self.y + 19), 3)
+        pygame.draw.rect(screen, BLACK, (x + self.width - 5, y + 10, 8, 18), border_radius=3)
+        pygame.draw.circle(screen, GRAY, (x + self.width - 1, y + 19), 3)
         # Rear left
-        pygame.draw.rect(screen, BLACK, (self.x - 3, self.y + 52, 8, 18), border_radius=3)
-        pygame.draw.circle(screen, GRAY, (self.x + 1, self.y + 61), 3)
+        pygame.draw.rect(screen, BLACK, (x - 3, y + 52, 8, 18), border_radius=3)
+        pygame.draw.circle(screen, GRAY, (x + 1, y + 61), 3)
         # Rear right
-        pygame.draw.rect(screen, BLACK, (self.x + self.width - 5, self.y + 52, 8, 18), border_radius=3)
-        pygame.draw.circle(screen, GRAY, (self.x + self.width - 1, self.y + 61), 3)
+        pygame.draw.rect(screen, BLACK, (x + self.width - 5, y + 52, 8, 18), border_radius=3)
+        pygame.draw.circle(screen, GRAY, (x + self.width - 1, y + 61), 3)
         
-    def move(self):
-        """Move the car down the screen"""
-        self.y += self.speed
+    def move(self, pace=1.0):
+        """Move the car down the screen at the difficulty's speed multiplier"""
+        self.y += self.speed * pace
+        self.rect.y = self.y
+        self.bounds.y = self.rect.y - SPRITE_PADDING
         
     def is_off_screen(self):
         """Check if car has moved off screen"""
         return self.y > SCREEN_HEIGHT
-    
-    def increase_speed(self, amount):
-        """Increase car speed for difficulty progression"""
-        self.speed += amount
         
     def get_rect(self):
-        """Get collision rectangle"""
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        """Get collision rectangle (the car's own rect, updated in place)"""
+        return self.rect
+        
+    def sync_rect(self):
+        """Move the collision rect and sprite bounds to the current position"""
+        self.rect.x = self.x
+        self.rect.y = self.y
+        self.bounds.x = self.rect.x - SPRITE_PADDING
+        self.bounds.y = self.rect.y - SPRITE_PADDING
@@ -5,6 +5,7 @@ Handles the player-controlled Formula 1 race car
 
 import pygame
 from config import *
+from utils.sprite_cache import sprite_cache
 
 
 class PlayerCar:
@@ -21,80 +22,116 @@ class PlayerCar:
         self.boost_active = False
         self.boost_timer = 0
         
+        # Collision rect, kept in step with x/y instead of rebuilt
+        self.rect = pygame.Rect(x, y, self.width, self.height)
+        # Sprite bounds, the area the collision mask covers, for the cheap box test before it
+        self.bounds = self.rect.inflate(SPRITE_PADDING * 2, SPRITE_PADDING * 2)
+        
+        # Where the current simulation step started, for swept collision tests
+        self.step_x = x
+        self.step_y = y
+        
     def draw(self, screen):
         """Draw the F1 car with all details"""
+        self._draw_body(screen, self.x, self.y)
         
+    def _draw_body(self, screen, x, y):
+        """Draw the F1 car with its top-left corner at (x, y)"""
         # Nose cone (pointed front)
         nose_points = [
-            (self.x + self.width // 2, self.y),  # tip
-            (self.x + 5, self.y + 15),
-            (self.x + self.width - 5, self.y + 15)
+            (x + self.width // 2, y),  # tip
+            (x + 5, y + 15),
+            (x + self.width - 5, y + 15)
         ]
         pygame.draw.polygon(screen, self.color, nose_points)
         
         # Front wing
-        pygame.draw.rect(screen, BLACK, (self.x - 5, self.y + 12, self.width + 10, 3))
-        pygame.draw.rect(screen, self.color, (self.x - 3, self.y + 10, self.width + 6, 2))
+        pygame.draw.rect(screen, BLACK, (x - 5, y + 12, self.width + 10, 3))
+        pygame.draw.rect(screen, self.color, (x - 3, y + 10, self.width + 6, 2))
         
         # Side pods (main body)
         # Left side pod
-        pygame.draw.rect(screen, self.color, (self.x + 3, self.y + 15, 15, 45))
-        pygame.draw.rect(screen, DARK_BLUE, (self.x + 5, self.y + 18, 11, 40))
+        pygame.draw.rect(screen, self.color, (x + 3, y + 15, 15, 45))
+        pygame.draw.rect(screen, DARK_BLUE, (x + 5, y + 18, 11, 40))
         # Right side pod
-        pygame.draw.rect(screen, self.color, (self.x + self.width - 18, self.y + 15, 15, 45))
-        pygame.draw.rect(screen, DARK_BLUE, (self.x + self.width - 16, self.y + 18, 11, 40))
+        pygame.draw.rect(screen, self.color, (x + self.width - 18, y + 15, 15, 45))
+        pygame.draw.rect(screen, DARK_BLUE, (x + self.width - 16, y + 18, 11, 40))
         
         # Center cockpit area
         cockpit_points = [
-            (self.x + 20, self.y + 20),
-            (self.x + self.width - 20, self.y + 20),
-            (self.x + self.width - 20, self.y + 45),
-            (self.x + 20, self.y + 45)
+            (x + 20, y + 20),
+            (x + self.width - 20, y + 20),
+            (x + self.width - 20, y + 45),
+            (x + 20, y + 45)
         ]
         pygame.draw.polygon(screen, DARKER_BLUE, cockpit_points)
         
         # Driver helmet/cockpit
-        pygame.draw.ellipse(screen, YELLOW, (self.x + 18, self.y + 25, 14, 14))
-        pygame.draw.rect(screen, (50, 50, 50), (self.x + 20, self.y + 28, 10, 6))  # visor
+        pygame.draw.ellipse(screen, YELLOW, (x + 18, y + 25, 14, 14))
+        pygame.draw.rect(screen, (50, 50, 50), (x + 20, y + 28, 10, 6))  # visor
         
         # Air intake
-        pygame.draw.rect(screen, BLACK, (self.x + self.width // 2 - 4, self.y + 22, 8, 18))
-        pygame.draw.rect(screen, (30, 30, 30), (self.x + self.width // 2 - 3, self.y + 23, 6, 16))
+        pygame.draw.rect(screen, BLACK, (x + self.width // 2 - 4, y + 22, 8, 18))
+        pygame.draw.rect(screen, (30, 30, 30), (x + self.width // 2 - 3, y + 23, 6, 16))
         
         # Rear wing support
-        pygame.draw.rect(screen, BLACK, (self.x + 12, self.y + 60, 3, 8))
-        pygame.draw.rect(screen, BLACK, (self.x + self.width - 15, self.y + 60, 3, 8))
+        pygame.draw.rect(screen, BLACK, (x + 12, y + 60, 3, 8))
+        pygame.draw.rect(screen, BLACK, (x + self.width - 15, y + 60, 3, 8))
         
         # Rear wing (changes color if boost active)
         wing_color = YELLOW if self.boost_active else RED
-        pygame.draw.rect(screen, wing_color, (self.x + 5, self.y + 66, self.width - 10, 4))
-        pygame.draw.rect(screen, wing_color, (self.x + 5, self.y + 72, self.width - 10, 3))
+        pygame.draw.rect(screen, wing_color, (x + 5, y + 66, self.width - 10, 4))
+        pygame.draw.rect(screen, wing_color, (x + 5, y + 72, self.width - 10, 3))
         
         # Rear body/engine cover
-        pygame.draw.rect(screen, self.color, (self.x + 10, self.y + 45, self.width - 20, 15))
-        pygame.draw.rect(screen, DARK_BLUE, (self.x + 12, self.y + 47, self.width - 24, 11))
+        pygame.draw.rect(screen, self.color, (x + 10, y + 45, self.width - 20, 15))
+        pygame.draw.rect(screen, DARK_BLUE, (x + 12, y + 47, self.width - 24, 11))
         
         # Exhaust pipes (glow if boost active)
         exhaust_color = ORANGE if self.boost_active else LIGHT_GRAY
-        pygame.draw.circle(screen, exhaust_color, (self.x + 15, self.y + 63), 3)
-        pygame.draw.circle(screen, exhaust_color, (self.x + self.width - 15, self.y + 63), 3)
-        pygame.draw.circle(screen, DARK_GRAY, (self.x + 15, self.y + 63), 2)
-        pygame.draw.circle(screen, DARK_GRAY, (self.x + self.width - 15, self.y + 63), 2)
+        pygame.draw.circle(screen, exhaust_color, (x + 15, y + 63), 3)
+        pygame.draw.circle(screen, exhaust_color, (x + self.width - 15, y + 63), 3)
+        pygame.draw.circle(screen, DARK_GRAY, (x + 15, y + 63), 2)
+        pygame.draw.circle(screen, DARK_GRAY, (x + self.width - 15, y + 63), 2)
         
         # F1 Wheels (larger, more exposed)
-        self._draw_wheel(screen, self.x - 8, self.y + 12, 14, 20)
-        self._draw_wheel(screen, self.x + self.width - 6, self.y + 12, 14, 20)
-        self._draw_wheel(screen, self.x - 8, self.y + 48, 14, 22)
-        self._draw_wheel(screen, self.x + self.width - 6, self.y + 48, 14, 22)
+        self._draw_wheel(screen, x - 8, y + 12, 14, 20)
+        self._draw_wheel(screen, x + self.width - 6, y + 12, 14, 20)
+        self._draw_wheel(screen, x - 8, y + 48, 14, 22)
+        self._draw_wheel(screen, x + self.width - 6, y + 48, 14, 22)
         
         # Racing number
         number_font = pygame.font.Font(None, 20)
         number = number_font.render("1", True, WHITE)
-        screen.blit(number, (self.x + self.width // 2 - 4, self.y + 30))
+        screen.blit(number, (x + self.width // 2 - 4, y + 30))
         
         # Sponsor decals
-        pygame.draw.rect(screen, RED, (self.x + 22, self.y + 50, 6, 3))
-        pygame.draw.rect(screen, WHITE, (self.x + self.width - 28, self.y + 50, 6, 3))
+        pygame.draw.rect(screen, RED, (x + 22, y + 50, 6, 3))
+        pygame.draw.rect(screen, WHITE, (x + self.width - 28, y + 50, 6, 3))
+        
+    def draw_scaled(self, screen, scale):
+        """Draw the car from its cached sprite onto a surface at the given (x, y) scale"""
+        screen.blit(self.sprite(scale), ((self.x - SPRITE_PADDING) * scale[0],
+                                         (self.y - SPRITE_PADDING) * scale[1]))
+                                         
+    def sprite(self, scale=(1.0, 1.0)):
+        """Cached sprite for the car's current look; its top-left is SPRITE_PADDING above-left of the car"""
+        return sprite_cache.get(self.sprite_key(), self.build_sprite, scale)
+        
+    def sprite_key(self):
+        """Key identifying the car's current look in the sprite cache"""
+        return ('player', self.color, self.boost_active)
+        
+    def collision_mask(self):
+        """Pixel mask of the car's sprite, shared by every car with the same look"""
+        return sprite_cache.mask(self.sprite_key(), self.build_sprite)
+        
+    def build_sprite(self):
+        """Render the car once onto a transparent, padded surface"""
+        sprite = pygame.Surface((self.width + SPRITE_PADDING * 2, self.height + SPRITE_PADDING * 2),
+                                pygame.SRCALPHA)
+        self._draw_body(sprite, SPRITE_PADDING, SPRITE_PADDING)
+        return sprite
         
     def _draw_wheel(self, screen, x, y, width, height):
         """Draw a single F1 wheel"""
@@ -104,18 +141,30 @@ class PlayerCar:
         center_y = y + height // 2
         pygame.draw.circle(screen, DARK_GRAY, (center_x, center_y), 3)
         
-    def move_left(self, road_left):
-        """Move the car left within road boundaries"""
-        self.x -= self.speed
+    def move_left(self, road_left, pace=1.0):
+        """Move the car left within road boundaries, at the difficulty's speed multiplier"""
+        self.x -= self.speed * pace
         if self.x < road_left:
             self.x = road_left
-            
-    def move_right(self, road_right):
-        """Move the car right within road boundaries"""
-        self.x += self.speed
+        self.sync_rect()
+        
+    def move_right(self, road_right, pace=1.0):
+        """Move the car right within road boundaries, at the difficulty's speed multiplier"""
+        self.x += self.speed * pace
         if self.x > road_right - self.width:
             self.x = road_right - self.width
-    
+        self.sync_rect()
+        
+    def keep_on_road(self, road_left, road_right):
+        """Push the car back inside the road edges (they move under it on a curving track)"""
+        if self.x < road_left:
+            self.x = road_left
+        elif self.x > road_right - self.width:
+            self.x = road_right - self.width
+        else:
+            return
+        self.sync_rect()
+        
     def activate_boost(self):
         """Activate temporary speed boost"""
         self.boost_active = True
@@ -130,22 +179,30 @@ class PlayerCar:
                 self.boost_active = False
                 self.speed = self.base_speed
                 
-    def increase_difficulty(self, amount):
-        """Increase car speed for difficulty progression"""
-        self.base_speed += amount
-        if not self.boost_active:
-            self.speed = self.base_speed
-            
     def get_rect(self):
-        """Get collision rectangle"""
-        return pygame.Rect(self.x, self.y, self.width, self.height)
-    
+        """Get collision rectangle (the car's own rect, updated in place)"""
+        return self.rect
+        
+    def sync_rect(self):
+        """Move the collision rect and sprite bounds to the current position"""
+        self.rect.x = self.x
+        self.rect.y = self.y
+        self.bounds.x = self.rect.x - SPRITE_PADDING
+        self.bounds.y = self.rect.y - SPRITE_PADDING
+        
+    def start_step(self):
+        """Remember the current position as the start of the next simulation step"""
+        self.step_x = self.x
+        self.step_y = self.y
+        
     def reset(self, x, y):
         """Reset car to initial position"""
         self.x = x
         self.y = y
+        self.sync_rect()
+        self.start_step()
         self.speed = PLAYER_CAR_SPEED
         self.base_speed = PLAYER_CAR_SPEED
         self.boost_active = False
         self.boost_timer = 0
-      
+
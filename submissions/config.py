@@ -9,6 +9,28 @@ SCREEN_HEIGHT = 600
 FPS = 60
 TITLE = "F1 Racing Challenge"
 
+# Outside gameplay (menu, pause, game over) the loop sleeps until input arrives
+# and only redraws when something visible changed
+IDLE_WAIT_MS = 250  # Longest sleep between checks for background changes
+
+# Presentation: the game always draws on a SCREEN_WIDTH x SCREEN_HEIGHT canvas
+# and is scaled to the window; the road and cars can render at a lower resolution
+RENDER_WIDTH = SCREEN_WIDTH  # e.g. 400 on weak machines
+RENDER_HEIGHT = SCREEN_HEIGHT  # e.g. 300 on weak machines
+PRESENT_MODE = "scaled"  # "scaled" (SDL scales on the GPU) or "smoothscale" (software)
+FULLSCREEN = False
+
+# Renderer backend: "software" (Surface blits) or "texture" (pygame._sdl2 textures,
+# falls back to software when unavailable)
+RENDERER_BACKEND = "software"
+TEXTURE_RENDERER_SOFTWARE = False  # Force SDL's software renderer, e.g. on machines without a GPU
+TEXTURE_TEXT_CACHE_SIZE = 64  # HUD text textures kept alive
+
+# Software rendering submits cached sprites in batches, one Surface.blits per layer
+RENDER_LAYERS = ('road', 'particles', 'obstacles', 'player', 'hud')  # Back to front
+RENDER_CULLING = True  # Skip sprites that are entirely off screen
+RENDER_THREADS = 0  # Worker threads drawing layers in parallel (0 = draw on the main thread)
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -35,6 +57,9 @@ OBSTACLE_CAR_WIDTH = 50
 OBSTACLE_CAR_HEIGHT = 80
 OBSTACLE_CAR_SPEED = 7
 OBSTACLE_CAR_COLORS = [RED, GREEN, YELLOW, ORANGE, (200, 0, 200), (0, 200, 200)]
+COLLISION_TOLERANCE = 5  # Pixels check_precise_collision trims off each rect to be forgiving
+COLLISION_SWEEP_STEP = 2  # Most pixels cars move against each other between mask tests in one step
+SPRITE_PADDING = 10  # Margin around cached car sprites for wheels and wings
 
 # Road settings
 ROAD_WIDTH = 400
@@ -48,12 +73,76 @@ INITIAL_SPAWN_DELAY = 60  # Frames between obstacle spawns
 MIN_SPAWN_DELAY = 30
 SPAWN_DELAY_DECREASE = 0.1
 
+# Traffic: cars start aligned to rows of a lane grid, so spawn checks are O(1)
+# and every row keeps an open lane the player can reach from the filled row below
+TRAFFIC_LANES = 3
+TRAFFIC_ROW_GAP = 60  # Clear road kept between cars in one lane
+TRAFFIC_LANE_JITTER = 20  # Random sideways offset of a car inside its lane
+TRAFFIC_STEER_RATIO = 1.0  # Sideways pixels the player covers per pixel the traffic scrolls (worst case)
+TRAFFIC_DENSITY = 0.35  # Stop spawning above this share of occupied lane slots
+TRAFFIC_WAVES = {  # Cars placed on each spawn while the wave lasts
+    'single': (1,),
+    'pair': (2,),
+    'convoy': (1, 1, 1),
+    'chicane': (2, 1, 2),
+}
+
+# Procedural track: a curving road generated in seeded chunks (off: the straight road)
+TRACK_ENABLED = False
+TRACK_SEED = None  # None: a different track every session (follows --seed)
+TRACK_CHUNK_LENGTH = 300  # Rows of track per generated chunk
+TRACK_CACHE_CHUNKS = 8  # Chunks kept (LRU): the screen, the lookahead and one behind
+TRACK_LOOKAHEAD_CHUNKS = 2  # Chunks prepared above the screen, at most one per frame
+TRACK_STRAIGHT_CHUNKS = 3  # Straight start before the first bend
+TRACK_LANES = (2, 3, 4)  # Lane counts a stretch can have; the road merges between them
+TRACK_LANE_WIDTH = ROAD_WIDTH / TRAFFIC_LANES
+TRACK_MAX_SHIFT = 80  # Furthest the road's centre strays from the screen's
+TRACK_VERGE = 20  # Grass always left at the screen edges
+TRACK_SAMPLE_ROWS = 10  # Rows between points of a chunk's drawn outline
+
+# Roadside scenery: parallax layers beside the straight road, each baked into one
+# wrapping strip per side so drawing it costs the same however many objects it holds
+SCENERY_ENABLED = True
+SCENERY_SEED = 7  # Same roadside every run
+SCENERY_LAYERS = [  # Back to front
+    # tile, fraction of the road's speed, (near, far) distance from the road edge,
+    # objects per side per screen height, 'scatter' at random or 'row' evenly spaced
+    {'tile': 'grandstand', 'speed': 0.5, 'band': (130, 200), 'count': 3, 'pattern': 'scatter'},
+    {'tile': 'tree', 'speed': 0.75, 'band': (24, 150), 'count': 10, 'pattern': 'scatter'},
+    {'tile': 'barrier', 'speed': 1.0, 'band': (4, 16), 'count': 20, 'pattern': 'row'},
+]
+
 # Difficulty progression
 SCORE_MILESTONES = [10, 25, 50, 100, 150, 200]
 SPEED_INCREASE_PER_MILESTONE = 0.5
+DIFFICULTY_CURVE = 'milestones'  # Name from game.difficulty.CURVES: 'milestones' (by score) or 'ramp' (by time)
+DIFFICULTY_RAMP_SECONDS = 180  # 'ramp' curve: seconds to reach full difficulty
+DIFFICULTY_RAMP_MAX_SPEED = 1.5  # 'ramp' curve: final speed multiplier
+DIFFICULTY_RAMP_STEP = 30  # 'ramp' curve: seconds per logged level
+
+# Sound
+SOUND_ENABLED = False  # Whether sound starts on (M toggles it in game)
+ENGINE_AUDIO = True  # Engine note that follows the car's speed
+ENGINE_SOUND_FILE = "sound_manager/car_engine.mp3"
+ENGINE_CACHE_DIR = "cache"  # Generated pitch bank, reused while the settings match
+ENGINE_PITCH_STEPS = 8  # Loops in the pitch bank, each playing on its own mixer channel
+ENGINE_PITCH_RANGE = (0.8, 1.8)  # Playback rate of the lowest and highest loop
+ENGINE_SPEED_RANGE = (PLAYER_CAR_SPEED, PLAYER_CAR_SPEED * 2)  # Car speeds mapped onto the bank
+ENGINE_FADE_RESOLUTION = 16  # Crossfade positions between neighbouring loops
+ENGINE_LOOP_SECONDS = 1.0  # Length of the recording each loop is made from
+ENGINE_LOOP_FADE_SECONDS = 0.05  # Overlap blended at the loop point
+ENGINE_VOLUME = 0.5
+ENGINE_BOOST_VOLUME = 0.8
+
+# Snapshots of the last seconds of play, for rewinding after a crash and bug reports
+SNAPSHOT_SECONDS = 10
+SNAPSHOT_MAX_OBSTACLES = 32  # Cars beyond this are left out of a snapshot
+SNAPSHOT_DIR = "snapshots"
+REWIND_SECONDS = 3  # How far R on the game over screen goes back
 
 # Particle effects
 PARTICLE_COUNT = 5
+PARTICLE_ALPHA_LEVELS = 16  # Fade steps for batched particle sprites
 PARTICLE_SPEED_RANGE = (2, 5)
 PARTICLE_SIZE_RANGE = (2, 4)
 PARTICLE_LIFETIME = 30
@@ -64,7 +153,102 @@ FONT_SIZE_MEDIUM = 36
 FONT_SIZE_LARGE = 72
 HUD_PADDING = 10
 
+# Glyph atlases: readouts are blitted from characters rasterized once per font size and color
+GLYPH_ATLAS_DIGITS = "0123456789 .,:-+%/"  # Numbers in the HUD
+GLYPH_ATLAS_TEXT = "".join(chr(code) for code in range(32, 127))  # Printable ASCII, for the debug overlay and leaderboard
+
 # Menu settings
 MENU_BUTTON_WIDTH = 200
 MENU_BUTTON_HEIGHT = 50
 MENU_BUTTON_SPACING = 20
+
+# Observation renderer (low-resolution view for bots and visual checks)
+OBSERVATION_WIDTH = 84
+OBSERVATION_HEIGHT = 84
+
+# Recording (F9 toggles capture of the rendered frames)
+RECORDING_DIR = "recordings"
+RECORDING_MODE = "ring"  # "ring" (memory-mapped raw frames) or "encoder" (pipe to ffmpeg)
+RECORDING_QUEUE_SIZE = 8  # Frames waiting for the writer before new ones are dropped
+RECORDING_SCALE = 0.5  # Recorded frame size relative to the screen
+RECORDING_FRAME_STEP = 2  # Record every Nth frame (2: 30 frames per second)
+RECORDING_RING_FRAMES = FPS * 10 // RECORDING_FRAME_STEP  # Last 10 seconds: about 108 MB at 400x300
+
+# Shared frame buffer (mirrors each frame to local spectator processes)
+SHARED_FRAME_ENABLED = False
+SHARED_FRAME_NAME = "f1racing_frames"
+
+# High score store (point SCORE_STORE_DIR at a shared folder to pool kiosks)
+SCORE_STORE_DIR = "scores"
+SCORE_INDEX_FILE = "high_scores.dat"
+SCORE_INDEX_SIZE = 1000  # Top runs kept in the compacted index
+SCORE_FLUSH_INTERVAL = 0.5  # Seconds the writer waits to batch runs before fsync
+SCORE_COMPACT_EVERY = 256  # Runs appended between index rewrites
+SCORE_REFRESH_INTERVAL = 5.0  # Seconds between picking up runs other kiosks appended
+KIOSK_ID = None  # Defaults to the host name
+
+# Leaderboard (shared by every kiosk; start one with `python -m utils.leaderboard`)
+LEADERBOARD_ENABLED = False
+LEADERBOARD_HOST = "127.0.0.1"
+LEADERBOARD_PORT = 8765
+LEADERBOARD_SIZE = 10  # Entries shown on the menu
+LEADERBOARD_BATCH_SIZE = 50  # Runs sent per request
+LEADERBOARD_RETRIES = 3
+LEADERBOARD_RETRY_DELAY = 0.5  # Seconds, doubled after each failed attempt
+LEADERBOARD_TIMEOUT = 2.0
+LEADERBOARD_REFRESH_INTERVAL = 30  # Seconds between background top list refreshes
+
+# Multiplayer (start a server with `python -m game.multiplayer serve`, join with
+# `python main.py --connect HOST:PORT`)
+MULTIPLAYER_HOST = "127.0.0.1"
+MULTIPLAYER_PORT = 8766
+MULTIPLAYER_TICK_RATE = FPS  # Server simulation ticks per second
+MULTIPLAYER_SEND_INTERVAL = 2  # Ticks between state updates sent to each client
+MULTIPLAYER_MAX_PLAYERS = 32
+MULTIPLAYER_INPUT_BUFFER = 4  # Inputs queued per player before the oldest are dropped
+MULTIPLAYER_MAX_BACKLOG = 64 * 1024  # Unsent bytes before a stalled client is dropped
+MULTIPLAYER_INTERPOLATION_DELAY = 0.1  # Seconds other cars are drawn behind the server
+MULTIPLAYER_RESTART_SECONDS = 3  # Pause after every car has crashed before a new round
+MULTIPLAYER_TIMEOUT = 2.0
+MULTIPLAYER_RIVAL_COLORS = [(220, 220, 220), (255, 105, 180), (120, 60, 200), (0, 120, 60)]
+
+# Adaptive quality (levels from best looking to cheapest)
+QUALITY_LEVELS = [
+    {'name': 'High', 'max_particles': 400, 'lane_dividers': True, 'simple_obstacles': False, 'hud_interval': 1,
+     'scenery': True},
+    {'name': 'Medium', 'max_particles': 150, 'lane_dividers': True, 'simple_obstacles': False, 'hud_interval': 2,
+     'scenery': True},
+    {'name': 'Low', 'max_particles': 60, 'lane_dividers': False, 'simple_obstacles': True, 'hud_interval': 4,
+     'scenery': False},
+    {'name': 'Minimum', 'max_particles': 20, 'lane_dividers': False, 'simple_obstacles': True, 'hud_interval': 8,
+     'scenery': False},
+]
+QUALITY_FRAME_BUDGET_MS = 1000 / FPS  # Update + render time allowed per frame
+QUALITY_HEADROOM = 0.6  # Step back up only when frames take under 60% of the budget
+QUALITY_SMOOTHING = 0.1  # Weight of the newest frame in the moving average
+QUALITY_DOWN_FRAMES = 30  # Over-budget frames in a row before stepping down
+QUALITY_UP_FRAMES = 180  # Frames with headroom in a row before stepping up
+QUALITY_COOLDOWN_FRAMES = 60  # Frames to settle after a change
+
+# Debug overlay (F3)
+DEBUG_OVERLAY_REFRESH_FRAMES = 15
+
+# Profiling (`python main.py --profile cprofile|sample`)
+PROFILE_DIR = "profiles"
+PROFILE_SAMPLE_INTERVAL = 0.001  # Seconds between stack samples in sampling mode
+
+# Allocation tracking (`python main.py --track-allocations`, `python -m utils.alloc_tracker`)
+ALLOCATION_TRACE_DEPTH = 25  # Stack frames kept per allocation, enough to reach the game loop
+ALLOCATION_HISTORY_FRAMES = 600  # Frames averaged in the report
+ALLOCATION_SNAPSHOT_FRAMES = 120  # Frames between call-site snapshots (they are slow)
+ALLOCATION_REPORT_SITES = 10
+ALLOCATION_BUDGETS = {  # Average peak bytes in flight per steady-state frame
+    'update_game': 4096,
+    'render': 8192,
+}
+
+# Gameplay telemetry (`python main.py --telemetry`, `python -m utils.telemetry <file>`)
+TELEMETRY_ENABLED = False  # Record every session without the command line flag
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_CHUNK_FRAMES = FPS * 10  # Frames per chunk handed to the writer thread
+TELEMETRY_CHUNKS = 4  # Preallocated chunks; a full chunk is dropped if none is free
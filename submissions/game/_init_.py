@@ -6,5 +6,19 @@ Contains game logic and rendering components
 from .road import Road
 from .particle_effects import ParticleSystem, Particle
 from .game_state import GameStateManager, GameState
+from .observation import ObservationRenderer
+from .quality import QualityGovernor
+from .texture_renderer import TextureRenderer
+from .render_queue import RenderQueue
+from .layer_renderer import LayerRenderer
+from .traffic import TrafficGenerator
+from .difficulty import DifficultyEngine, DifficultyCurve
+from .multiplayer import MultiplayerServer, MultiplayerClient
+from .track import Track
+from .scenery import Scenery
 
-__all__ = ['Road', 'ParticleSystem', 'Particle', 'GameStateManager', 'GameState']
+__all__ = ['Road', 'ParticleSystem', 'Particle', 'GameStateManager', 'GameState',
+           'ObservationRenderer', 'QualityGovernor', 'TextureRenderer',
+           'RenderQueue', 'LayerRenderer', 'TrafficGenerator',
+           'DifficultyEngine', 'DifficultyCurve', 'MultiplayerServer', 'MultiplayerClient',
+           'Track', 'Scenery']
@@ -0,0 +1,139 @@
+"""
+Difficulty Engine
+Looks difficulty up in a curve precomputed for every whole score (or second of
+play) instead of rewriting each car's speed at milestones. Cars, road and traffic
+keep their base speeds and are moved by the shared multipliers in `settings`.
+
+Curves are pluggable: build a DifficultyCurve from any function returning a level
+dictionary and hand it to DifficultyEngine.set_curve(), or name one from CURVES.
+"""
+
+import logging
+import logging.handlers
+import queue
+from bisect import bisect_right
+from config import *
+
+
+# Level changes are queued and written by a listener thread, never from the game loop
+logger = logging.getLogger("difficulty")
+_listener = None
+
+
+def _start_log_listener():
+    """Route the difficulty logger through a queue the first time an engine is made"""
+    global _listener
+    if _listener is None:
+        records = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _listener = logging.handlers.QueueListener(records, logging.StreamHandler())
+        _listener.start()
+
+
+def stop_log_listener():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logger.handlers.clear()
+
+
+class DifficultyCurve:
+    """
+    Difficulty levels precomputed for every value of the measure ('score' or 'seconds')
+    Each level is a dictionary with 'level' (a number for logging changes), the speed
+    multipliers 'player_speed', 'obstacle_speed', 'road_speed' and 'spawn_delay' in frames;
+    values past the end of the table get its last level
+    """
+    
+    def __init__(self, level_at, length, measure='score'):
+        if measure not in ('score', 'seconds'):
+            raise ValueError(f"Unknown difficulty measure: {measure}")
+        self.measure = measure
+        self.levels = [level_at(value) for value in range(length)]
+        
+    def level(self, value):
+        """Level for a score or number of seconds"""
+        return self.levels[min(int(value), len(self.levels) - 1)]
+
+
+def milestone_level(score):
+    """Classic progression: speeds step up at each of SCORE_MILESTONES, traffic thickens per point"""
+    reached = bisect_right(SCORE_MILESTONES, score)
+    step = SPEED_INCREASE_PER_MILESTONE * reached
+    return {
+        'level': reached,
+        'player_speed': (PLAYER_CAR_SPEED + step) / PLAYER_CAR_SPEED,
+        'obstacle_speed': (OBSTACLE_CAR_SPEED + step) / OBSTACLE_CAR_SPEED,
+        'road_speed': (ROAD_SPEED + step * 0.5) / ROAD_SPEED,
+        'spawn_delay': max(MIN_SPAWN_DELAY, INITIAL_SPAWN_DELAY - SPAWN_DELAY_DECREASE * score),
+    }
+
+
+def ramp_level(seconds):
+    """Steady ramp over DIFFICULTY_RAMP_SECONDS of play, one logged level per DIFFICULTY_RAMP_STEP"""
+    progress = min(seconds / DIFFICULTY_RAMP_SECONDS, 1.0)
+    speed = 1.0 + (DIFFICULTY_RAMP_MAX_SPEED - 1.0) * progress
+    return {
+        'level': min(seconds, DIFFICULTY_RAMP_SECONDS) // DIFFICULTY_RAMP_STEP,
+        'player_speed': speed,
+        'obstacle_speed': speed,
+        'road_speed': speed,
+        'spawn_delay': INITIAL_SPAWN_DELAY + (MIN_SPAWN_DELAY - INITIAL_SPAWN_DELAY) * progress,
+    }
+
+
+# Built-in curves by name, each long enough to reach its final level
+CURVES = {
+    'milestones': lambda: DifficultyCurve(
+        milestone_level,
+        max(SCORE_MILESTONES[-1], int((INITIAL_SPAWN_DELAY - MIN_SPAWN_DELAY) / SPAWN_DELAY_DECREASE)) + 1),
+    'ramp': lambda: DifficultyCurve(ramp_level, DIFFICULTY_RAMP_SECONDS + 1, measure='seconds'),
+}
+
+
+class DifficultyEngine:
+    """Tracks the current difficulty level; a level change is one table lookup"""
+    
+    def __init__(self, curve=DIFFICULTY_CURVE):
+        _start_log_listener()
+        self.set_curve(curve)
+        
+    def set_curve(self, curve):
+        """Swap in a DifficultyCurve, or the name of one in CURVES, and start it from the top"""
+        self.curve = CURVES[curve]() if isinstance(curve, str) else curve
+        self.reset()
+        
+    def reset(self):
+        """Back to the first level for a new run"""
+        self.frames = 0
+        self.settings = self.curve.levels[0]
+        # Score or seconds the current level was looked up for
+        self.value = 0
+        
+    def restore(self, frames, value):
+        """Jump to a saved position on the curve (snapshot rewind)"""
+        self.frames = frames
+        self.value = value
+        self.settings = self.curve.level(value)
+        
+    def update(self, score):
+        """
+        Advance one played frame at the given score
+        Returns True when the level number changed
+        """
+        self.frames += 1
+        value = score if self.curve.measure == 'score' else self.frames // FPS
+        if value == self.value:
+            return False
+            
+        self.value = value
+        level = self.curve.level(value)
+        changed = level['level'] != self.settings['level']
+        self.settings = level
+        if changed:
+            logger.info("Difficulty increased to level %d at %s %d", level['level'], self.curve.measure, value)
+        return changed
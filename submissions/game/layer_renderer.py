@@ -0,0 +1,75 @@
+"""
+Layer Renderer
+Optional multi-threaded flush for the render queue: the background layer is blitted
+straight onto the screen while worker threads draw the other layers into their own
+transparent surfaces (SDL blits run with the GIL released), then the main thread
+composites them back to front. A layer whose sprites did not change is not redrawn.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from config import *
+
+
+class Layer:
+    """Offscreen surface for one layer, with the entries and rects drawn into it last time"""
+    
+    def __init__(self, size):
+        # pygame's alpha blit onto a transparent pixel keeps the sprite's own colour
+        # and alpha, so the layer composites like an ordinary per-pixel alpha sprite
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, 0))
+        self.entries = []
+        self.composite = []
+        
+    def draw(self, entries):
+        """Worker: erase what the layer held last frame, then draw the new entries"""
+        surface = self.surface
+        for _, rect, _ in self.composite:
+            surface.fill((0, 0, 0, 0), rect)
+        self.entries = list(entries)
+        self.composite = [(surface, rect, rect) for rect in surface.blits(entries)]
+
+
+class LayerRenderer:
+    """Draws render-queue layers on a thread pool and composites them in order"""
+    
+    def __init__(self, threads=RENDER_THREADS, size=(SCREEN_WIDTH, SCREEN_HEIGHT), background='road'):
+        self.background = background
+        self._size = size
+        self._layers = {}
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="render")
+        
+        # Layers redrawn in the last flush (the rest were reused), for the debug overlay
+        self.redrawn = 0
+        
+    def flush(self, render_queue, target):
+        """Draw the queued layers onto target and empty the queue"""
+        jobs = []
+        background = None
+        for name, entries in render_queue.batches():
+            if name == self.background:
+                background = entries
+                continue
+            layer = self._layers.get(name)
+            if layer is None:
+                layer = self._layers[name] = Layer(self._size)
+            if entries == layer.entries:
+                jobs.append((name, layer, None))
+            else:
+                jobs.append((name, layer, self._pool.submit(layer.draw, entries)))
+                
+        if background:
+            render_queue.submit(self.background, target, background)
+            
+        self.redrawn = 0
+        for name, layer, job in jobs:
+            if job is not None:
+                job.result()
+                self.redrawn += 1
+            render_queue.submit(name, target, layer.composite)
+        render_queue.clear()
+        
+    def close(self):
+        """Stop the worker threads"""
+        self._pool.shutdown()
@@ -0,0 +1,758 @@
+"""
+Multiplayer Race
+Server-authoritative racing on one shared road: an asyncio server steps every
+player's car, the traffic and the difficulty at MULTIPLAYER_TICK_RATE and sends each
+client only what changed since the last update it sent that client (TCP delivers
+updates in order, so that update is always the client's baseline). Obstacle cars all
+move with the traffic, so each one is sent once when it spawns, as an offset from the
+traffic's travel, and once when it goes.
+
+Clients predict their own car from the inputs they send, replaying the ones the
+server has not applied yet on every update, and draw everything else interpolated
+MULTIPLAYER_INTERPOLATION_DELAY behind the server. Cars do not collide with each other.
+
+Run `python -m game.multiplayer serve` to host a race,
+`python -m game.multiplayer bench` to measure server tick time and bandwidth per
+client with 2, 8 and 32 bots on localhost, and `python -m game.multiplayer check`
+to step a race headless until a car crashes.
+Protocol: length-prefixed binary messages, the first byte of each is its type.
+"""
+
+import argparse
+import asyncio
+import collections
+import logging
+import random
+import statistics
+import struct
+import sys
+import threading
+import time
+import pygame
+from config import *
+from cars import PlayerCar, ObstacleCar
+from cars.obstacle_car import CAR_TYPES
+from game.road import Road
+from game.traffic import TrafficGenerator
+from game.difficulty import DifficultyEngine
+from utils.collision import CollisionDetector
+
+
+INPUT, WELCOME, STATE = 1, 2, 3
+MESSAGE_LENGTH = struct.Struct('<H')
+# Client input: type, sequence number, steering (-1, 0 or 1), boost pressed
+INPUT_MESSAGE = struct.Struct('<BIbB')
+# Server welcome: type, the client's player id, tick rate, ticks between updates
+WELCOME_MESSAGE = struct.Struct('<BBBB')
+# State update: type, tick, round, client's last applied input, difficulty frames and
+# value, traffic travel, road offset, then player records, spawned and removed cars
+STATE_HEADER = struct.Struct('<BIHIIIdfBHH')
+# Player record: id and a mask of the fields that follow, in this order: x in quarter
+# pixels, y, speed in hundredths, boost frames left, flags and score
+PLAYER_RECORD = struct.Struct('<BB')
+PLAYER_FIELDS = (struct.Struct('<h'), struct.Struct('<h'), struct.Struct('<H'),
+                 struct.Struct('<B'), struct.Struct('<B'), struct.Struct('<I'))
+ALL_FIELDS = (1 << len(PLAYER_FIELDS)) - 1
+FLAGS_FIELD = 4
+ALIVE, CONNECTED = 1, 2
+# Spawned car: id, x, y minus the traffic's travel, colour and car type indexes
+OBSTACLE_SPAWN = struct.Struct('<HhfBB')
+OBSTACLE_REMOVAL = struct.Struct('<H')
+
+logger = logging.getLogger("multiplayer")
+
+
+def parse_address(text):
+    """Parse HOST:PORT (or just HOST) into a (host, port) tuple"""
+    host, _, port = text.rpartition(':')
+    if not host:
+        return text, MULTIPLAYER_PORT
+    return host, int(port)
+
+
+def frame_message(message):
+    """Prefix a message with its length for the stream"""
+    return MESSAGE_LENGTH.pack(len(message)) + message
+
+
+async def read_message(reader):
+    """Read one length-prefixed message"""
+    length, = MESSAGE_LENGTH.unpack(await reader.readexactly(MESSAGE_LENGTH.size))
+    return await reader.readexactly(length)
+
+
+def start_position(player_id, road):
+    """Starting spot for a player: lanes in turn, the first player in the middle one"""
+    road_left, road_right = road.get_boundaries()
+    lane_width = (road_right - road_left) // TRAFFIC_LANES
+    lane = (player_id + TRAFFIC_LANES // 2) % TRAFFIC_LANES
+    x = road_left + lane * lane_width + (lane_width - PLAYER_CAR_WIDTH) // 2
+    return x, SCREEN_HEIGHT - PLAYER_CAR_HEIGHT - 20
+
+
+def step_car(car, steer, boost, pace, road_left, road_right):
+    """Apply one tick of input to a car, the same way on the server and in prediction"""
+    if boost:
+        car.activate_boost()
+    if steer < 0:
+        car.move_left(road_left, pace)
+    elif steer > 0:
+        car.move_right(road_right, pace)
+    car.update()
+
+
+class RacePlayer:
+    """A player on the server: car, queued inputs and score"""
+    
+    def __init__(self, player_id, road):
+        self.id = player_id
+        self.car = PlayerCar(*start_position(player_id, road))
+        self.inputs = collections.deque(maxlen=MULTIPLAYER_INPUT_BUFFER)
+        self.acked = 0
+        self.steer = 0
+        self.score = 0
+        self.alive = True
+        
+    def next_input(self):
+        """Input for this tick: the oldest queued one, or the last steering held"""
+        if self.inputs:
+            self.acked, self.steer, boost = self.inputs.popleft()
+            return self.steer, boost
+        return self.steer, False
+        
+    def fields(self):
+        """Field values as sent to clients"""
+        car = self.car
+        return (int(round(car.x * 4)), int(car.y), int(round(car.speed * 100)),
+                max(0, car.boost_timer), (ALIVE if self.alive else 0) | CONNECTED, self.score)
+
+
+class RaceWorld:
+    """Shared road, traffic and players, stepped one server tick at a time"""
+    
+    def __init__(self):
+        # Collision masks are built from the car sprites, and the F1 car's number is
+        # drawn with a font; a headless server never initialises pygame otherwise
+        pygame.font.init()
+        self.road = Road()
+        self.traffic = TrafficGenerator(*self.road.get_boundaries())
+        self.difficulty = DifficultyEngine()
+        self.collision_detector = CollisionDetector()
+        self.players = {}
+        self.obstacles = {}
+        self.next_obstacle_id = 0
+        self.tick = 0
+        self.round = 0
+        self.spawn_timer = 0
+        self.restart_timer = 0
+        
+    def add_player(self):
+        """Add a player with the lowest free id (None when the race is full)"""
+        free = [player_id for player_id in range(MULTIPLAYER_MAX_PLAYERS) if player_id not in self.players]
+        if not free:
+            return None
+        player = RacePlayer(free[0], self.road)
+        self.players[player.id] = player
+        return player
+        
+    def remove_player(self, player_id):
+        """Take a player out of the race"""
+        self.players.pop(player_id, None)
+        
+    def new_round(self):
+        """Clear the road and put every player back on the start"""
+        self.round = (self.round + 1) % 65536
+        self.road.reset()
+        self.traffic.reset()
+        self.obstacles.clear()
+        self.difficulty.reset()
+        self.spawn_timer = 0
+        self.restart_timer = 0
+        for player in self.players.values():
+            player.car.reset(*start_position(player.id, self.road))
+            player.inputs.clear()
+            player.steer = 0
+            player.score = 0
+            player.alive = True
+            
+    def step(self):
+        """One server tick: inputs, road, traffic, collisions and scoring"""
+        self.tick += 1
+        pace = self.difficulty.settings
+        road_left, road_right = self.road.get_boundaries()
+        self.road.update(pace['road_speed'])
+        
+        alive = []
+        for player in self.players.values():
+            steer, boost = player.next_input()
+            if player.alive:
+                step_car(player.car, steer, boost, pace['player_speed'], road_left, road_right)
+                alive.append(player)
+                
+        # Spawn obstacles on the shared lane grid
+        self.traffic.advance(pace['obstacle_speed'])
+        self.spawn_timer += 1
+        if self.spawn_timer >= pace['spawn_delay']:
+            for obstacle in self.traffic.spawn():
+                self.obstacles[self.next_obstacle_id] = obstacle
+                self.next_obstacle_id = (self.next_obstacle_id + 1) % 65536
+            self.spawn_timer = 0
+            
+        # Every car drives in one band near the bottom of the screen, so obstacles
+        # outside it skip the per-player swept tests
+        band_top = min((player.car.bounds.top for player in alive), default=0)
+        band_bottom = max((player.car.bounds.bottom for player in alive), default=0)
+        passed = []
+        for obstacle_id, obstacle in self.obstacles.items():
+            obstacle.move(pace['obstacle_speed'])
+            if obstacle.is_off_screen():
+                passed.append(obstacle_id)
+                continue
+            dy = obstacle.speed * pace['obstacle_speed']
+            if obstacle.bounds.bottom < band_top or obstacle.bounds.top - dy > band_bottom:
+                continue
+            for player in alive:
+                car = player.car
+                if player.alive and self.collision_detector.sweep_cars(
+                        car, car.x - car.step_x, car.y - car.step_y, obstacle, 0, dy):
+                    player.alive = False
+        for obstacle_id in passed:
+            del self.obstacles[obstacle_id]
+            for player in alive:
+                if player.alive:
+                    player.score += 1
+        for player in self.players.values():
+            player.car.start_step()
+            
+        # Difficulty follows the leader; a new round starts a while after the last crash
+        self.difficulty.update(max((player.score for player in self.players.values()), default=0))
+        if self.players and not any(player.alive for player in self.players.values()):
+            self.restart_timer += 1
+            if self.restart_timer >= MULTIPLAYER_RESTART_SECONDS * MULTIPLAYER_TICK_RATE:
+                self.new_round()
+
+
+class ClientConnection:
+    """Server side of one client: its player, stream and what it was last sent"""
+    
+    def __init__(self, player, writer):
+        self.player = player
+        self.writer = writer
+        self.players_sent = {}
+        self.obstacles_sent = set()
+        self.bytes_sent = 0
+        self.connected_at = time.perf_counter()
+        
+    def encode_update(self, world, fields):
+        """State update holding only what changed since the previous one sent"""
+        parts = []
+        records = 0
+        sent = self.players_sent
+        for player_id, values in fields.items():
+            previous = sent.get(player_id)
+            mask = ALL_FIELDS
+            if previous is not None:
+                mask = 0
+                for bit in range(len(values)):
+                    if values[bit] != previous[bit]:
+                        mask |= 1 << bit
+            if mask:
+                parts.append(PLAYER_RECORD.pack(player_id, mask))
+                for bit, field in enumerate(PLAYER_FIELDS):
+                    if mask & (1 << bit):
+                        parts.append(field.pack(values[bit]))
+                sent[player_id] = values
+                records += 1
+                
+        # Players that left get one last record with their flags cleared
+        for player_id in [player_id for player_id in sent if player_id not in fields]:
+            parts.append(PLAYER_RECORD.pack(player_id, 1 << FLAGS_FIELD))
+            parts.append(PLAYER_FIELDS[FLAGS_FIELD].pack(0))
+            del sent[player_id]
+            records += 1
+            
+        travel = world.traffic.travel
+        spawned = [obstacle_id for obstacle_id in world.obstacles if obstacle_id not in self.obstacles_sent]
+        removed = [obstacle_id for obstacle_id in self.obstacles_sent if obstacle_id not in world.obstacles]
+        for obstacle_id in spawned:
+            obstacle = world.obstacles[obstacle_id]
+            parts.append(OBSTACLE_SPAWN.pack(obstacle_id, int(obstacle.x), obstacle.y - travel,
+                                             OBSTACLE_CAR_COLORS.index(obstacle.color),
+                                             CAR_TYPES.index(obstacle.car_type)))
+        for obstacle_id in removed:
+            parts.append(OBSTACLE_REMOVAL.pack(obstacle_id))
+        self.obstacles_sent.update(spawned)
+        self.obstacles_sent.difference_update(removed)
+        
+        header = STATE_HEADER.pack(STATE, world.tick, world.round, self.player.acked,
+                                   world.difficulty.frames, world.difficulty.value, travel,
+                                   world.road.line_offset, records, len(spawned), len(removed))
+        return frame_message(header + b''.join(parts))
+
+
+class MultiplayerServer:
+    """Asyncio race server: fixed-tick simulation and per-client delta updates"""
+    
+    def __init__(self, host=MULTIPLAYER_HOST, port=MULTIPLAYER_PORT, tick_rate=MULTIPLAYER_TICK_RATE,
+                 send_interval=MULTIPLAYER_SEND_INTERVAL):
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.send_interval = send_interval
+        self.world = RaceWorld()
+        self.clients = {}
+        
+        # Seconds per tick (simulation and encoding), and (bytes, seconds) of finished clients
+        self.tick_times = collections.deque(maxlen=tick_rate * 10)
+        self.finished_clients = []
+        self._server = None
+        self._ticker = None
+        # Exception that stopped the simulation, if one did
+        self.error = None
+        
+    async def start(self):
+        """Start listening and ticking; returns once the socket is bound"""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ticker = asyncio.ensure_future(self._run_ticks())
+        self._ticker.add_done_callback(self._ticker_done)
+        return self
+        
+    async def serve_forever(self):
+        """Serve until cancelled; raises the exception that stopped the simulation, if one did"""
+        await self.start()
+        try:
+            await self._ticker
+        finally:
+            await self.close()
+            
+    def _ticker_done(self, ticker):
+        """A simulation that died must not look healthy: log why, then drop every client and stop listening"""
+        if ticker.cancelled() or ticker.exception() is None:
+            return
+        self.error = ticker.exception()
+        logger.error("Race simulation stopped at tick %d", self.world.tick, exc_info=self.error)
+        for client in list(self.clients.values()):
+            client.writer.close()
+        self._server.close()
+        
+    async def close(self):
+        """Stop ticking, disconnect every client and stop accepting new ones"""
+        self._ticker.cancel()
+        await asyncio.gather(self._ticker, return_exceptions=True)
+        for client in list(self.clients.values()):
+            client.writer.close()
+        self._server.close()
+        await self._server.wait_closed()
+        
+    def stats(self):
+        """Tick time in milliseconds and update bandwidth in bytes per second per client"""
+        now = time.perf_counter()
+        rates = [sent / seconds for sent, seconds in self.finished_clients if seconds > 0]
+        rates += [client.bytes_sent / (now - client.connected_at) for client in self.clients.values()]
+        ticks = sorted(self.tick_times)
+        return {
+            'players': len(self.clients),
+            'tick_ms': statistics.mean(ticks) * 1000 if ticks else 0.0,
+            'tick_p99_ms': ticks[int(len(ticks) * 0.99)] * 1000 if ticks else 0.0,
+            'bytes_per_client': statistics.mean(rates) if rates else 0.0,
+        }
+        
+    def broadcast(self):
+        """Send every client its update, dropping clients that stopped reading"""
+        fields = {player_id: player.fields() for player_id, player in self.world.players.items()}
+        for client in list(self.clients.values()):
+            if client.writer.transport.get_write_buffer_size() > MULTIPLAYER_MAX_BACKLOG:
+                client.writer.close()
+                continue
+            self._send(client, client.encode_update(self.world, fields))
+            
+    def _send(self, client, data):
+        """Queue bytes for one client"""
+        client.writer.write(data)
+        client.bytes_sent += len(data)
+        
+    async def _run_ticks(self):
+        """Step the world at the tick rate, sending updates every send_interval ticks"""
+        interval = 1.0 / self.tick_rate
+        next_tick = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            self.world.step()
+            if self.world.tick % self.send_interval == 0:
+                self.broadcast()
+            self.tick_times.append(time.perf_counter() - start)
+            
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay < -interval * 4:
+                # Far behind: carry on from now rather than rushing to catch up
+                next_tick = time.perf_counter()
+            await asyncio.sleep(max(0.0, delay))
+            
+    async def _handle_client(self, reader, writer):
+        """Add a player for the connection and queue its inputs until it disconnects"""
+        player = self.world.add_player()
+        if player is None:
+            writer.close()
+            return
+        client = ClientConnection(player, writer)
+        self.clients[player.id] = client
+        self._send(client, frame_message(WELCOME_MESSAGE.pack(WELCOME, player.id, self.tick_rate,
+                                                              self.send_interval)))
+        try:
+            while True:
+                message = await read_message(reader)
+                if not message:
+                    # Empty frames are not part of the protocol: drop the client
+                    break
+                if message[0] == INPUT:
+                    _, sequence, steer, boost = INPUT_MESSAGE.unpack(message)
+                    player.inputs.append((sequence, max(-1, min(1, steer)), bool(boost)))
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass
+        finally:
+            self.clients.pop(player.id, None)
+            self.world.remove_player(player.id)
+            self.finished_clients.append((client.bytes_sent, time.perf_counter() - client.connected_at))
+            writer.close()
+
+
+class MultiplayerClient:
+    """
+    Race client for the game thread: sends inputs, predicts the player's own car and
+    interpolates everything else. The network runs on its own event loop thread and
+    only queues the updates it receives; update() applies them on the game thread.
+    """
+    
+    def __init__(self, host, port, road, difficulty):
+        self.host = host
+        self.port = port
+        self.road = road
+        self.difficulty = difficulty
+        
+        # The player's own (predicted) car and the cars to draw, updated in place
+        self.car = PlayerCar(*start_position(0, road))
+        self.rivals = []
+        self.obstacles = []
+        self.player_id = None
+        self.score = 0
+        self.alive = True
+        self.connected = False
+        self.round = None
+        self.tick_rate = MULTIPLAYER_TICK_RATE
+        
+        self._players = {}
+        self._rival_cars = {}
+        self._obstacle_cars = {}
+        self._acked = 0
+        self._sequence = 0
+        self._boost = False
+        self._pending = collections.deque()
+        
+        # Received updates (arrival time, message) and the recent positions they gave:
+        # (tick, traffic travel, road offset, {rival id: x})
+        self._inbox = collections.deque()
+        self._history = collections.deque(maxlen=MULTIPLAYER_TICK_RATE)
+        self._newest = None
+        
+        self._loop = asyncio.new_event_loop()
+        self._thread = None
+        self._writer = None
+        self._receiving = None
+        
+    def start(self):
+        """Connect and wait for the server's welcome; raises ConnectionError on failure"""
+        self._thread = threading.Thread(target=self._loop.run_forever, name="multiplayer", daemon=True)
+        self._thread.start()
+        future = asyncio.run_coroutine_threadsafe(self._connect(), self._loop)
+        try:
+            future.result(MULTIPLAYER_TIMEOUT + 1.0)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+            self.stop()
+            raise ConnectionError(f"Could not join {self.host}:{self.port} ({error})") from error
+        return self
+        
+    def stop(self):
+        """Disconnect and stop the event loop"""
+        if self._thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._disconnect(), self._loop)
+        try:
+            future.result(MULTIPLAYER_TIMEOUT)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(MULTIPLAYER_TIMEOUT)
+        self._thread = None
+        self.connected = False
+        
+    def request_boost(self):
+        """Boost with the next input sent"""
+        self._boost = True
+        
+    def send_input(self, steer):
+        """Send this frame's steering (-1, 0 or 1) and apply it to the predicted car"""
+        if not (self.connected and self.alive):
+            return
+        self._sequence += 1
+        boost, self._boost = self._boost, False
+        road_left, road_right = self.road.get_boundaries()
+        step_car(self.car, steer, boost, self.difficulty.settings['player_speed'], road_left, road_right)
+        self._pending.append((self._sequence, steer, boost))
+        message = frame_message(INPUT_MESSAGE.pack(INPUT, self._sequence, steer, boost))
+        self._loop.call_soon_threadsafe(self._writer.write, message)
+        
+    def update(self):
+        """Apply received updates, correct the predicted car and place the other cars"""
+        received = False
+        while self._inbox:
+            arrival, message = self._inbox.popleft()
+            self._apply(message, arrival)
+            received = True
+        if received:
+            self._reconcile()
+        if self._history:
+            self._interpolate()
+            
+    async def _connect(self):
+        """Open the connection, read the welcome and start receiving updates"""
+        reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), MULTIPLAYER_TIMEOUT)
+        message = await asyncio.wait_for(read_message(reader), MULTIPLAYER_TIMEOUT)
+        _, self.player_id, self.tick_rate, _ = WELCOME_MESSAGE.unpack(message)
+        self.car.reset(*start_position(self.player_id, self.road))
+        self.connected = True
+        self._receiving = self._loop.create_task(self._receive(reader))
+        
+    async def _disconnect(self):
+        """Stop receiving and close the connection so the server drops the player"""
+        if self._receiving is not None:
+            self._receiving.cancel()
+            await asyncio.gather(self._receiving, return_exceptions=True)
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            
+    async def _receive(self, reader):
+        """Queue every update with its arrival time until the server goes away"""
+        try:
+            while True:
+                message = await read_message(reader)
+                self._inbox.append((time.perf_counter(), message))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.connected = False
+            
+    def _apply(self, message, arrival):
+        """Fold one state update into the known state"""
+        (_, tick, race_round, self._acked, frames, value, travel, road_offset,
+         records, spawned, removed) = STATE_HEADER.unpack_from(message)
+        offset = STATE_HEADER.size
+        if race_round != self.round:
+            # Nothing to interpolate from across rounds
+            self.round = race_round
+            self._history.clear()
+        if (frames, value) != (self.difficulty.frames, self.difficulty.value):
+            self.difficulty.restore(frames, value)
+            
+        for _ in range(records):
+            player_id, mask = PLAYER_RECORD.unpack_from(message, offset)
+            offset += PLAYER_RECORD.size
+            values = list(self._players.get(player_id, (0,) * len(PLAYER_FIELDS)))
+            for bit, field in enumerate(PLAYER_FIELDS):
+                if mask & (1 << bit):
+                    values[bit], = field.unpack_from(message, offset)
+                    offset += field.size
+            if values[FLAGS_FIELD] & CONNECTED:
+                self._players[player_id] = values
+            else:
+                self._players.pop(player_id, None)
+        self._update_rivals()
+        
+        road_left, road_right = self.road.get_boundaries()
+        for _ in range(spawned):
+            obstacle_id, x, y, color, car_type = OBSTACLE_SPAWN.unpack_from(message, offset)
+            offset += OBSTACLE_SPAWN.size
+            obstacle = ObstacleCar(road_left, road_right, x=x, y=y + travel, speed=0)
+            obstacle.color = OBSTACLE_CAR_COLORS[color]
+            obstacle.car_type = CAR_TYPES[car_type]
+            self._obstacle_cars[obstacle_id] = (obstacle, y)
+        for _ in range(removed):
+            obstacle_id, = OBSTACLE_REMOVAL.unpack_from(message, offset)
+            offset += OBSTACLE_REMOVAL.size
+            self._obstacle_cars.pop(obstacle_id, None)
+        if spawned or removed:
+            self.obstacles[:] = [obstacle for obstacle, _ in self._obstacle_cars.values()]
+            
+        positions = {player_id: values[0] / 4 for player_id, values in self._players.items()
+                     if player_id != self.player_id}
+        self._history.append((tick, travel, road_offset, positions))
+        self._newest = (tick, arrival)
+        
+    def _update_rivals(self):
+        """Keep a car for every other player and draw the ones still racing"""
+        for player_id in [player_id for player_id in self._rival_cars if player_id not in self._players]:
+            del self._rival_cars[player_id]
+        racing = []
+        for player_id, values in self._players.items():
+            if player_id == self.player_id:
+                continue
+            car = self._rival_cars.get(player_id)
+            if car is None:
+                car = self._rival_cars[player_id] = PlayerCar(values[0] / 4, values[1])
+                car.color = MULTIPLAYER_RIVAL_COLORS[player_id % len(MULTIPLAYER_RIVAL_COLORS)]
+            car.y = values[1]
+            car.boost_active = values[3] > 0
+            if values[FLAGS_FIELD] & ALIVE:
+                racing.append(car)
+        self.rivals[:] = racing
+        
+    def _reconcile(self):
+        """Reset the predicted car to the server's and replay the inputs it has not applied"""
+        values = self._players.get(self.player_id)
+        if values is None:
+            return
+        while self._pending and self._pending[0][0] <= self._acked:
+            self._pending.popleft()
+        x, y, speed, boost_timer, flags, self.score = values
+        self.alive = bool(flags & ALIVE)
+        if not self.alive:
+            self._pending.clear()
+            
+        car = self.car
+        car.x, car.y = x / 4, y
+        car.speed = speed / 100
+        car.boost_timer = boost_timer
+        car.boost_active = boost_timer > 0
+        car.sync_rect()
+        road_left, road_right = self.road.get_boundaries()
+        pace = self.difficulty.settings['player_speed']
+        for _, steer, boost in self._pending:
+            step_car(car, steer, boost, pace, road_left, road_right)
+        car.start_step()
+        
+    def _interpolate(self):
+        """Place the road, traffic and other cars MULTIPLAYER_INTERPOLATION_DELAY behind the server"""
+        newest_tick, arrival = self._newest
+        render_tick = min(newest_tick, newest_tick + (time.perf_counter() - arrival) * self.tick_rate
+                          - MULTIPLAYER_INTERPOLATION_DELAY * self.tick_rate)
+        before = after = self._history[0]
+        for snapshot in self._history:
+            after = snapshot
+            if snapshot[0] > render_tick:
+                break
+            before = snapshot
+        span = after[0] - before[0]
+        t = min(1.0, max(0.0, (render_tick - before[0]) / span)) if span else 0.0
+        
+        travel = before[1] + (after[1] - before[1]) * t
+        period = ROAD_LINE_HEIGHT + ROAD_LINE_GAP
+        road_end = after[2] if after[2] >= before[2] else after[2] + period
+        line_offset = (before[2] + (road_end - before[2]) * t) % period
+        self.road.distance += (line_offset - self.road.line_offset) % period
+        self.road.line_offset = line_offset
+        
+        for obstacle, offset in self._obstacle_cars.values():
+            obstacle.y = offset + travel
+        for player_id, car in self._rival_cars.items():
+            start = before[3].get(player_id)
+            end = after[3].get(player_id, start)
+            if start is None:
+                start = end
+            if start is not None:
+                car.x = start + (end - start) * t
+
+
+async def _bench_bot(host, port, seconds):
+    """Connect, steer at random once a tick for a while, and return the bytes received"""
+    reader, writer = await asyncio.open_connection(host, port)
+    received = 0
+    
+    async def read():
+        nonlocal received
+        while True:
+            received += MESSAGE_LENGTH.size + len(await read_message(reader))
+            
+    reading = asyncio.ensure_future(read())
+    sequence = steer = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sequence += 1
+        if random.random() < 0.05:
+            steer = random.choice((-1, 0, 1))
+        writer.write(frame_message(INPUT_MESSAGE.pack(INPUT, sequence, steer, random.random() < 0.01)))
+        await asyncio.sleep(1.0 / MULTIPLAYER_TICK_RATE)
+    reading.cancel()
+    await asyncio.gather(reading, return_exceptions=True)
+    writer.close()
+    return received
+
+
+async def _bench(counts, seconds):
+    """Run a localhost server with each number of bots and report tick time and bandwidth"""
+    for count in counts:
+        server = await MultiplayerServer(port=0).start()
+        await asyncio.gather(*(_bench_bot(server.host, server.port, seconds) for _ in range(count)))
+        stats = server.stats()
+        await server.close()
+        if server.error:
+            print(f"{count:3d} players: the simulation stopped with an error, no numbers")
+            continue
+        print(f"{count:3d} players: tick {stats['tick_ms']:.3f} ms mean, "
+              f"{stats['tick_p99_ms']:.3f} ms 99th percentile, "
+              f"{stats['bytes_per_client'] / 1024:.1f} KB/s per client")
+
+
+def _check(players, ticks):
+    """
+    Step a race with idle players until one crashes, without a display or a network
+    Returns True if a crash happened within the given number of ticks
+    """
+    world = RaceWorld()
+    for _ in range(players):
+        world.add_player()
+    for _ in range(ticks):
+        world.step()
+        crashed = [player.id for player in world.players.values() if not player.alive]
+        if crashed:
+            print(f"Player {crashed[0]} crashed at tick {world.tick}")
+            return True
+    print(f"No crash in {ticks} ticks")
+    return False
+
+
+def main():
+    """Host a race, benchmark the server with bot clients, or check a headless race"""
+    parser = argparse.ArgumentParser(description="F1 Racing multiplayer server")
+    commands = parser.add_subparsers(dest='command')
+    serve = commands.add_parser('serve', help="host a race")
+    serve.add_argument('--host', default=MULTIPLAYER_HOST)
+    serve.add_argument('--port', type=int, default=MULTIPLAYER_PORT)
+    bench = commands.add_parser('bench', help="measure tick time and bandwidth with bot clients")
+    bench.add_argument('--players', type=int, nargs='+', default=[2, 8, 32])
+    bench.add_argument('--seconds', type=float, default=5.0)
+    check = commands.add_parser('check', help="step a race headless until a car crashes")
+    check.add_argument('--players', type=int, default=MULTIPLAYER_MAX_PLAYERS)
+    check.add_argument('--ticks', type=int, default=MULTIPLAYER_TICK_RATE * 120)
+    args = parser.parse_args()
+    
+    if args.command == 'bench':
+        asyncio.run(_bench(args.players, args.seconds))
+        return
+    if args.command == 'check':
+        sys.exit(0 if _check(args.players, args.ticks) else 1)
+    if args.command != 'serve':
+        parser.error("choose serve, bench or check")
+        
+    server = MultiplayerServer(args.host, args.port)
+    print(f"Race server listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    except Exception as error:
+        sys.exit(f"Race server stopped: {error!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Observation Renderer
+Draws the game world straight into a small offscreen surface for bots and visual checks
+Works headless: set SDL_VIDEODRIVER=dummy before pygame.init()
+"""
+
+import pygame
+from config import *
+
+try:
+    import numpy
+except ImportError:  # NumPy is only needed for pixel observations
+    numpy = None
+
+
+class ObservationRenderer:
+    """Low-resolution render target exposing its pixels as NumPy arrays"""
+    
+    def __init__(self, width=OBSERVATION_WIDTH, height=OBSERVATION_HEIGHT,
+                 grayscale=True, simplified=False):
+        if numpy is None:
+            raise ImportError("ObservationRenderer requires NumPy (pip install numpy)")
+            
+        self.width = width
+        self.height = height
+        self.grayscale = grayscale
+        self.simplified = simplified
+        self.scale = (width / SCREEN_WIDTH, height / SCREEN_HEIGHT)
+        self.surface = pygame.Surface((width, height))
+        
+        # Preallocated buffers for the grayscale conversion
+        self._luma = numpy.empty((width, height), numpy.uint16)
+        self._channel = numpy.empty((width, height), numpy.uint16)
+        self._gray = numpy.empty((width, height), numpy.uint8)
+        
+    def render(self, road, player, obstacles, particles):
+        """Draw one frame from the given world objects and return the observation"""
+        road.draw_scaled(self.surface, self.scale, self.simplified)
+        particles.draw_scaled(self.surface, self.scale, self.simplified)
+        
+        for obstacle in obstacles:
+            obstacle.draw_scaled(self.surface, self.scale, self.simplified)
+            
+        player.draw_scaled(self.surface, self.scale)
+        return self.observe()
+        
+    def render_game(self, game):
+        """Draw one frame of a running F1RacingGame"""
+        return self.render(game.road, game.player, game.obstacles, game.particles)
+        
+    def observe(self):
+        """
+        Get the current pixels indexed [row, column]
+        RGB mode returns a live view of the surface (no copy) that locks it
+        until released; grayscale mode returns a reused uint8 buffer.
+        """
+        if not self.grayscale:
+            return pygame.surfarray.pixels3d(self.surface).transpose(1, 0, 2)
+            
+        # ITU-R 601 luma in fixed point: (77 R + 150 G + 29 B) / 256
+        rgb = pygame.surfarray.pixels3d(self.surface)
+        luma, channel = self._luma, self._channel
+        numpy.multiply(rgb[:, :, 0], 77, out=luma, dtype=numpy.uint16)
+        numpy.multiply(rgb[:, :, 1], 150, out=channel, dtype=numpy.uint16)
+        luma += channel
+        numpy.multiply(rgb[:, :, 2], 29, out=channel, dtype=numpy.uint16)
+        luma += channel
+        del rgb
+        
+        numpy.right_shift(luma, 8, out=luma)
+        numpy.copyto(self._gray, luma, casting='unsafe')
+        return self._gray.T
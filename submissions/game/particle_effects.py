@@ -6,6 +6,16 @@ Creates visual effects like exhaust smoke, sparks, and boost trails
 import pygame
 import random
 from config import *
+from utils.sprite_cache import sprite_cache
+
+
+def particle_sprite(color, radius, alpha=255):
+    """Cached circle sprite for a particle colour, radius and opacity"""
+    def build():
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+        return sprite
+    return sprite_cache.get(('particle', color, radius, alpha), build)
 
 
 class Particle:
@@ -43,7 +53,7 @@ class Particle:
                 pygame.draw.circle(particle_surface, fade_color, 
                                  (current_size, current_size), current_size)
                 screen.blit(particle_surface, (int(self.x - current_size), int(self.y - current_size)))
-    
+                
     def is_dead(self):
         """Check if particle should be removed"""
         return self.lifetime <= 0
@@ -54,21 +64,26 @@ class ParticleSystem:
     
     def __init__(self):
         self.particles = []
+        self.max_particles = QUALITY_LEVELS[0]['max_particles']
+        
+    def _room(self, count):
+        """Limit an emission so the live particle count stays under the cap"""
+        return max(0, min(count, self.max_particles - len(self.particles)))
         
     def emit_exhaust(self, x, y, boost=False):
         """Create exhaust particles from car"""
         color = ORANGE if boost else LIGHT_GRAY
         speed_range = (4, 8) if boost else PARTICLE_SPEED_RANGE
         
-        for _ in range(PARTICLE_COUNT if boost else 2):
+        for _ in range(self._room(PARTICLE_COUNT if boost else 2)):
             speed = random.uniform(*speed_range)
             lifetime = PARTICLE_LIFETIME if boost else PARTICLE_LIFETIME // 2
             particle = Particle(x, y, color, speed, lifetime)
             self.particles.append(particle)
-    
+            
     def emit_collision_sparks(self, x, y):
         """Create spark effect on collision"""
-        for _ in range(15):
+        for _ in range(self._room(15)):
             speed = random.uniform(3, 7)
             lifetime = random.randint(15, 30)
             color = random.choice([YELLOW, ORANGE, RED, WHITE])
@@ -76,10 +91,10 @@ class ParticleSystem:
             # More spread for sparks
             particle.dx = random.uniform(-3, 3)
             self.particles.append(particle)
-    
+            
     def emit_boost_trail(self, x, y):
         """Create continuous boost trail effect"""
-        for _ in range(3):
+        for _ in range(self._room(3)):
             speed = random.uniform(2, 5)
             lifetime = random.randint(20, 35)
             color = random.choice([BLUE, (0, 150, 255), WHITE])
@@ -98,6 +113,36 @@ class ParticleSystem:
         for particle in self.particles:
             particle.draw(screen)
             
+    def queue_sprites(self, render_queue):
+        """Queue every live particle's cached sprite, with the fade rounded to PARTICLE_ALPHA_LEVELS"""
+        for particle in self.particles:
+            if particle.lifetime <= 0:
+                continue
+            alpha_ratio = particle.lifetime / particle.max_lifetime
+            radius = int(particle.size * alpha_ratio)
+            if radius > 0:
+                alpha = round(alpha_ratio * PARTICLE_ALPHA_LEVELS) * 255 // PARTICLE_ALPHA_LEVELS
+                render_queue.add('particles', particle_sprite(particle.color[:3], radius, alpha),
+                                 int(particle.x - radius), int(particle.y - radius))
+                                 
+    def draw_scaled(self, screen, scale, simplified=False):
+        """
+        Draw all particles onto a surface at the given (x, y) scale
+        Skips the per-particle alpha surfaces; simplified mode plots single pixels
+        """
+        scale_x, scale_y = scale
+        if simplified:
+            for particle in self.particles:
+                screen.set_at((int(particle.x * scale_x), int(particle.y * scale_y)), particle.color)
+            return
+            
+        for particle in self.particles:
+            radius = particle.size * particle.lifetime / particle.max_lifetime * scale_x
+            if radius > 0:
+                pygame.draw.circle(screen, particle.color,
+                                   (int(particle.x * scale_x), int(particle.y * scale_y)),
+                                   max(1, int(radius)))
+                                   
     def clear(self):
         """Remove all particles"""
         self.particles.clear()
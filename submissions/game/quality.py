@@ -0,0 +1,63 @@
+"""
+Quality Governor
+Steps rendering quality down when frames run over budget and back up when
+there is headroom, with hysteresis so the level does not oscillate
+"""
+
+from config import *
+
+
+class QualityGovernor:
+    """Chooses a quality level from measured frame times"""
+    
+    def __init__(self, levels=QUALITY_LEVELS, budget_ms=QUALITY_FRAME_BUDGET_MS):
+        self.levels = levels
+        self.budget_ms = budget_ms
+        self.level = 0
+        self.frame_ms = 0.0
+        
+        self._over_frames = 0
+        self._under_frames = 0
+        self._cooldown = 0
+        
+    @property
+    def settings(self):
+        """Settings dictionary for the current level"""
+        return self.levels[self.level]
+        
+    def update(self, frame_ms):
+        """
+        Feed one frame's work time in milliseconds
+        Returns True when the level changed and settings must be re-applied
+        """
+        # Exponential moving average smooths out single slow frames
+        self.frame_ms += (frame_ms - self.frame_ms) * QUALITY_SMOOTHING
+        
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return False
+            
+        if self.frame_ms > self.budget_ms:
+            self._over_frames += 1
+            self._under_frames = 0
+        elif self.frame_ms < self.budget_ms * QUALITY_HEADROOM:
+            self._under_frames += 1
+            self._over_frames = 0
+        else:
+            # Inside the hysteresis band: hold the current level
+            self._over_frames = 0
+            self._under_frames = 0
+            
+        if self._over_frames >= QUALITY_DOWN_FRAMES and self.level < len(self.levels) - 1:
+            return self._set_level(self.level + 1)
+        if self._under_frames >= QUALITY_UP_FRAMES and self.level > 0:
+            return self._set_level(self.level - 1)
+        return False
+        
+    def _set_level(self, level):
+        """Switch level and wait before judging the new one"""
+        self.level = level
+        self._over_frames = 0
+        self._under_frames = 0
+        self._cooldown = QUALITY_COOLDOWN_FRAMES
+        return True
@@ -0,0 +1,113 @@
+"""
+Render Queue
+Collects cached sprites per layer during a frame and submits each layer with a
+single Surface.blits call, instead of one Python-level blit or draw per object
+"""
+
+import pygame
+from config import *
+
+
+# Each layer is submitted through the function of the subsystem it draws, so
+# profiles charge its blits to that subsystem (see utils.profiler.SUBSYSTEMS)
+def blit_road(target, entries):
+    """Submit the road layer"""
+    target.blits(entries, doreturn=False)
+
+
+def blit_particles(target, entries):
+    """Submit the particle layer"""
+    target.blits(entries, doreturn=False)
+
+
+def blit_cars(target, entries):
+    """Submit a layer of cars"""
+    target.blits(entries, doreturn=False)
+
+
+def blit_hud(target, entries):
+    """Submit the HUD layer"""
+    target.blits(entries, doreturn=False)
+
+
+def blit_layer(target, entries):
+    """Submit a layer no subsystem claims"""
+    target.blits(entries, doreturn=False)
+
+
+LAYER_BLITS = {
+    'road': blit_road,
+    'particles': blit_particles,
+    'obstacles': blit_cars,
+    'player': blit_cars,
+    'hud': blit_hud,
+}
+
+
+class QueueLayer:
+    """Surface-like front for one layer, so UI code written against blit() can queue into it"""
+    
+    def __init__(self, entries):
+        self._entries = entries
+        
+    def blit(self, source, dest, area=None):
+        """Queue a blit instead of performing it"""
+        if area is None:
+            self._entries.append((source, dest))
+        else:
+            self._entries.append((source, dest, area))
+
+
+class RenderQueue:
+    """Per-layer sprite batches, drawn back to front in RENDER_LAYERS order"""
+    
+    def __init__(self, layers=RENDER_LAYERS, size=(SCREEN_WIDTH, SCREEN_HEIGHT), cull=RENDER_CULLING):
+        self.layers = layers
+        self.cull = cull
+        self._right, self._bottom = size
+        self._entries = {name: [] for name in layers}
+        self._fronts = {name: QueueLayer(entries) for name, entries in self._entries.items()}
+        self._blits = {name: LAYER_BLITS.get(name, blit_layer) for name in layers}
+        
+        # Counters for the last frame, shown in the debug overlay
+        self.submitted = 0
+        self.culled = 0
+        self._submitted = 0
+        self._culled = 0
+        
+    def add(self, layer, surface, x, y):
+        """Queue a sprite with its top-left at (x, y), dropping it if it is entirely off screen"""
+        if self.cull and (x >= self._right or y >= self._bottom
+                          or x + surface.get_width() <= 0 or y + surface.get_height() <= 0):
+            self._culled += 1
+            return
+        self._entries[layer].append((surface, (x, y)))
+        
+    def layer(self, name):
+        """Surface-like object whose blit() queues into the named layer"""
+        return self._fronts[name]
+        
+    def flush(self, target):
+        """Draw every queued layer onto target, one blits call per layer, and empty the queue"""
+        for name, entries in self.batches():
+            self.submit(name, target, entries)
+        self.clear()
+        
+    def submit(self, name, target, entries):
+        """Blit entries onto target with the named layer's blit function"""
+        self._blits[name](target, entries)
+        
+    def batches(self):
+        """Non-empty layers as (name, entries) pairs, back to front"""
+        return [(name, self._entries[name]) for name in self.layers if self._entries[name]]
+        
+    def clear(self):
+        """Empty the queue, counting what it held as submitted"""
+        for entries in self._entries.values():
+            self._submitted += len(entries)
+            entries.clear()
+            
+    def begin_frame(self):
+        """Publish the previous frame's counters and start counting a new frame"""
+        self.submitted, self._submitted = self._submitted, 0
+        self.culled, self._culled = self._culled, 0
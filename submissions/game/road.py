@@ -1,81 +1,162 @@
 """
 Road Class
 Handles the racing track rendering and animation
+With a Track the road curves: its edges are looked up per screen row and it is
+drawn from the track's cached chunks instead of the straight tile. The straight
+road is lined with parallax scenery.
 """
 
 import pygame
 from config import *
+from utils.sprite_cache import sprite_cache
+from game.scenery import Scenery
+
+
+# Screen row through the middle of the player's car, where get_boundaries() looks by default
+DRIVING_ROW = SCREEN_HEIGHT - 20 - PLAYER_CAR_HEIGHT // 2
 
 
 class Road:
     """Animated racing road/track"""
     
-    def __init__(self):
+    def __init__(self, track=None):
         self.width = ROAD_WIDTH
         self.speed = ROAD_SPEED
         self.line_offset = 0
         self.left_boundary = (SCREEN_WIDTH - self.width) // 2
         self.right_boundary = (SCREEN_WIDTH + self.width) // 2
+        self.lane_dividers = True
+        self.scenery = Scenery(self.left_boundary, self.right_boundary)
+        self.show_scenery = SCENERY_ENABLED
+        
+        # Optional procedural track, and the rows the road has scrolled along it
+        self.track = track
+        self.distance = 0.0
         
     def draw(self, screen):
         """Draw the road with animated lane markings"""
+        if self.track:
+            for tile, y in self.tiles():
+                screen.blit(tile, (0, y))
+            return
+        self._draw_track(screen, self.line_offset, SCREEN_HEIGHT, self.lane_dividers)
+        for strip, x, y in self.scenery_tiles():
+            screen.blit(strip, (x, y))
+            
+    def draw_scaled(self, screen, scale, simplified=False):
+        """
+        Draw the road onto a surface at the given (x, y) scale
+        Uses a cached pre-scaled tile one line period taller than the screen (or
+        the track's chunks), so scrolling is a blit per tile. Simplified mode
+        drops the lane dividers and the scenery.
+        """
+        for tile, y in self.tiles(simplified, scale):
+            screen.blit(tile, (0, y))
+        if not simplified:
+            for strip, x, y in self.scenery_tiles(scale):
+                screen.blit(strip, (x, y))
+                
+    def tiles(self, simplified=False, scale=(1.0, 1.0)):
+        """(surface, y) of each cached tile covering the screen at the given (x, y) scale"""
+        if self.track:
+            return self.track.tiles(self.distance, simplified, scale)
+        period = ROAD_LINE_HEIGHT + ROAD_LINE_GAP
+        return [(self.tile(scale, simplified), (self.line_offset - period) * scale[1])]
+        
+    def scenery_tiles(self, scale=(1.0, 1.0)):
+        """(surface, x, y) of the scenery strips to draw over the road tiles (none beside the track)"""
+        if self.track or not self.show_scenery:
+            return []
+        return self.scenery.tiles(self.distance, scale)
+        
+    def tile(self, scale=(1.0, 1.0), simplified=False):
+        """Cached road tile; draw it one line period above the current line offset"""
+        return sprite_cache.get(('road', self.left_boundary, self.width, simplified),
+                                lambda: self._build_tile(simplified), scale)
+                                
+    def _build_tile(self, simplified):
+        """Render a full-width road tile with markings starting at the top"""
+        height = SCREEN_HEIGHT + ROAD_LINE_HEIGHT + ROAD_LINE_GAP
+        tile = pygame.Surface((SCREEN_WIDTH, height))
+        self._draw_track(tile, 0, height, lane_dividers=not simplified)
+        return tile
+        
+    def _draw_track(self, screen, line_offset, height, lane_dividers=True):
+        """Draw grass, road surface and markings down to the given height"""
         # Grass background
         screen.fill(GRASS_GREEN)
         
         # Road surface
         pygame.draw.rect(screen, ROAD_GRAY, 
-                        (self.left_boundary, 0, self.width, SCREEN_HEIGHT))
-        
+                        (self.left_boundary, 0, self.width, height))
+                        
         # Road edges (white lines)
         pygame.draw.rect(screen, WHITE, 
-                        (self.left_boundary, 0, ROAD_EDGE_WIDTH, SCREEN_HEIGHT))
+                        (self.left_boundary, 0, ROAD_EDGE_WIDTH, height))
         pygame.draw.rect(screen, WHITE, 
-                        (self.right_boundary - ROAD_EDGE_WIDTH, 0, ROAD_EDGE_WIDTH, SCREEN_HEIGHT))
-        
+                        (self.right_boundary - ROAD_EDGE_WIDTH, 0, ROAD_EDGE_WIDTH, height))
+                        
         # Center line (animated dashed line)
-        self._draw_center_line(screen)
+        self._draw_center_line(screen, line_offset, height)
         
         # Optional: Lane dividers
-        self._draw_lane_dividers(screen)
-        
-    def _draw_center_line(self, screen):
+        if lane_dividers:
+            self._draw_lane_dividers(screen, line_offset, height)
+            
+    def _draw_center_line(self, screen, line_offset, height):
         """Draw animated center line"""
         center_x = SCREEN_WIDTH // 2 - 5
         
-        for y in range(int(self.line_offset), SCREEN_HEIGHT, ROAD_LINE_HEIGHT + ROAD_LINE_GAP):
+        for y in range(int(line_offset), height, ROAD_LINE_HEIGHT + ROAD_LINE_GAP):
             pygame.draw.rect(screen, YELLOW, 
                            (center_x, y, 10, ROAD_LINE_HEIGHT))
-    
-    def _draw_lane_dividers(self, screen):
+                           
+    def _draw_lane_dividers(self, screen, line_offset, height):
         """Draw additional lane dividers for realism"""
         # Left lane divider
         left_divider_x = self.left_boundary + self.width // 3
         # Right lane divider
         right_divider_x = self.left_boundary + 2 * self.width // 3
         
-        for y in range(int(self.line_offset), SCREEN_HEIGHT, ROAD_LINE_HEIGHT + ROAD_LINE_GAP):
+        for y in range(int(line_offset), height, ROAD_LINE_HEIGHT + ROAD_LINE_GAP):
             # Left divider
             pygame.draw.rect(screen, WHITE, 
                            (left_divider_x, y, 6, ROAD_LINE_HEIGHT // 2))
             # Right divider
             pygame.draw.rect(screen, WHITE, 
                            (right_divider_x, y, 6, ROAD_LINE_HEIGHT // 2))
-            
-    def update(self):
-        """Update road animation"""
-        self.line_offset += self.speed
+                           
+    def update(self, pace=1.0):
+        """Update road animation, scrolling at the difficulty's speed multiplier"""
+        self.line_offset += self.speed * pace
         if self.line_offset >= ROAD_LINE_HEIGHT + ROAD_LINE_GAP:
             self.line_offset = 0
-            
-    def increase_speed(self, amount):
-        """Increase road speed for difficulty progression"""
-        self.speed += amount
+        self.distance += self.speed * pace
         
-    def get_boundaries(self):
-        """Get left and right road boundaries"""
+        # Build the track ahead a chunk at a time, before it scrolls into view
+        if self.track:
+            self.track.prepare(self.distance)
+            
+    def get_boundaries(self, y=DRIVING_ROW):
+        """Get left and right road boundaries (on screen row y when the road curves)"""
+        if self.track:
+            return self.track.boundaries(self.distance + SCREEN_HEIGHT - y)
         return self.left_boundary, self.right_boundary
-    
+        
+    def place_on_track(self, car):
+        """
+        Move a car sideways so its lane on the straight road (car.lane_x) follows the track
+        Returns how far it moved
+        """
+        left, right = self.get_boundaries(car.y + car.height // 2)
+        share = (car.lane_x - self.left_boundary) / (self.width - car.width)
+        x = left + share * (right - left - car.width)
+        shift, car.x = x - car.x, x
+        car.sync_rect()
+        return shift
+        
     def reset(self):
         """Reset road to initial state"""
         self.speed = ROAD_SPEED
         self.line_offset = 0
+        self.distance = 0.0
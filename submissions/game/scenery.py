@@ -0,0 +1,154 @@
+"""
+Roadside Scenery
+Parallax layers of trees, grandstands and barriers on the grass beside the road.
+Each layer places a few pre-rendered tiles at seeded offsets and bakes them into one
+strip per side, SCREEN_HEIGHT rows tall, that wraps as it scrolls. Drawing a layer
+is then at most two blits per side however many objects it holds, strip copies
+that are entirely off screen are skipped, and the strips are run-length encoded so
+their transparent pixels cost next to nothing.
+
+Layers scroll at their own fraction of the road's speed, worked out from the
+distance the road has travelled, so they need no state of their own and follow
+snapshot rewinds.
+"""
+
+import random
+import pygame
+from config import *
+from utils.sprite_cache import sprite_cache
+
+
+def build_tree(rng):
+    """Tree seen from above: a shadow and a canopy of overlapping leaf clumps"""
+    size = 40
+    tile = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(tile, (0, 60, 0, 110), (size // 2 + 3, size // 2 + 3), size // 2 - 3)
+    pygame.draw.circle(tile, (0, 100, 0), (size // 2, size // 2), size // 2 - 4)
+    for _ in range(5):
+        center = (size // 2 + rng.randint(-7, 7), size // 2 + rng.randint(-7, 7))
+        pygame.draw.circle(tile, (20, 125, 20), center, rng.randint(6, 9))
+    pygame.draw.circle(tile, (70, 165, 60), (size // 2 - 4, size // 2 - 5), 5)
+    return tile
+
+
+def build_grandstand(rng):
+    """Grandstand facing the road on its left: tiers of spectators under a roof"""
+    width, height = 56, 120
+    tile = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.rect(tile, LIGHT_GRAY, (0, 0, width, height))
+    for tier in range(4):
+        x = 3 + tier * 10
+        pygame.draw.rect(tile, GRAY, (x, 2, 8, height - 4))
+        for y in range(5, height - 5, 6):
+            color = rng.choice((RED, YELLOW, WHITE, BLUE, ORANGE, DARK_GRAY))
+            pygame.draw.circle(tile, color, (x + 4, y), 2)
+    pygame.draw.rect(tile, (170, 30, 30), (width - 12, 0, 12, height))
+    pygame.draw.line(tile, (120, 20, 20), (width - 12, 0), (width - 12, height), 2)
+    return tile
+
+
+def build_barrier(rng):
+    """One block of the red and white tyre barrier along the road edge"""
+    tile = pygame.Surface((12, 30), pygame.SRCALPHA)
+    pygame.draw.rect(tile, RED, (0, 0, 12, 15), border_radius=3)
+    pygame.draw.rect(tile, WHITE, (0, 15, 12, 15), border_radius=3)
+    return tile
+
+
+# Tile builders by name; each draws a tile for the right-hand verge (road on its left)
+TILE_BUILDERS = {
+    'tree': build_tree,
+    'grandstand': build_grandstand,
+    'barrier': build_barrier,
+}
+
+
+class SceneryLayer:
+    """One parallax layer: where its tiles sit in the strip on each side of the road"""
+    
+    def __init__(self, index, tile, speed, band, count, pattern, rng):
+        self.index = index
+        self.speed = speed
+        self.band = band
+        
+        # A few variations of the tile, shared by every object in the layer
+        variants = [TILE_BUILDERS[tile](rng) for _ in range(3 if pattern == 'scatter' else 1)]
+        self.tiles = (variants, [pygame.transform.flip(variant, True, False) for variant in variants])
+        
+        # (variant, distance from the road edge, y in the strip) per side
+        self.placements = (self._place(variants, count, pattern, rng),
+                           self._place(variants, count, pattern, rng))
+                           
+    def _place(self, variants, count, pattern, rng):
+        """Lay the layer's objects out along one side, evenly ('row') or at random without overlaps ('scatter')"""
+        inner, outer = self.band
+        if pattern == 'row':
+            return [(0, inner, index * SCREEN_HEIGHT // count) for index in range(count)]
+            
+        placed = []
+        taken = []
+        for _ in range(count):
+            for _ in range(20):
+                variant = rng.randrange(len(variants))
+                width, height = variants[variant].get_size()
+                rect = pygame.Rect(rng.randint(inner, outer - width), rng.randrange(SCREEN_HEIGHT), width, height)
+                # Check against the copies one strip up and down as well, as the strip wraps
+                if not any(rect.move(0, shift).colliderect(other)
+                           for other in taken for shift in (-SCREEN_HEIGHT, 0, SCREEN_HEIGHT)):
+                    taken.append(rect)
+                    placed.append((variant, rect.x, rect.y))
+                    break
+        return placed
+
+
+class Scenery:
+    """Roadside layers baked into wrapping strips, drawn back to front"""
+    
+    def __init__(self, road_left, road_right, layers=SCENERY_LAYERS, seed=SCENERY_SEED):
+        self.road_left = road_left
+        self.road_right = road_right
+        self.seed = seed
+        rng = random.Random(seed)
+        self.layers = [SceneryLayer(index, rng=rng, **layer) for index, layer in enumerate(layers)]
+        
+    @property
+    def objects(self):
+        """Number of scenery objects on both sides"""
+        return sum(len(placements) for layer in self.layers for placements in layer.placements)
+        
+    def tiles(self, distance, scale=(1.0, 1.0)):
+        """(surface, x, y) of every strip copy on screen once the road has travelled distance rows"""
+        tiles = []
+        for layer in self.layers:
+            offset = distance * layer.speed % SCREEN_HEIGHT
+            inner, outer = layer.band
+            for side, x in enumerate((self.road_left - outer, self.road_right + inner)):
+                strip = self.strip(layer, side, scale)
+                # The copy above only shows once the strip has scrolled down
+                if offset > 0:
+                    tiles.append((strip, x * scale[0], (offset - SCREEN_HEIGHT) * scale[1]))
+                tiles.append((strip, x * scale[0], offset * scale[1]))
+        return tiles
+        
+    def strip(self, layer, side, scale=(1.0, 1.0)):
+        """Cached strip of one layer on one side (0 left, 1 right) at the given (x, y) scale"""
+        return sprite_cache.get(('scenery', self.seed, layer.index, side, self.road_left, self.road_right),
+                                lambda: self._build_strip(layer, side), scale)
+                                
+    def _build_strip(self, layer, side):
+        """Bake a layer's objects on one side into a transparent strip that wraps top to bottom"""
+        inner, outer = layer.band
+        width = outer - inner
+        strip = pygame.Surface((width, SCREEN_HEIGHT), pygame.SRCALPHA)
+        tiles = layer.tiles[side]
+        for variant, gap, y in layer.placements[side]:
+            tile = tiles[variant]
+            # Left of the road the strip is mirrored, so the gap counts from its right edge
+            x = gap - inner if side else outer - gap - tile.get_width()
+            strip.blit(tile, (x, y))
+            if y + tile.get_height() > SCREEN_HEIGHT:
+                strip.blit(tile, (x, y - SCREEN_HEIGHT))
+                
+        # Strips are mostly transparent: run-length encoding lets blits skip the empty runs
+        strip.set_alpha(255, pygame.RLEACCEL)
+        return strip
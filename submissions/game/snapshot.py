@@ -0,0 +1,185 @@
+"""
+Snapshot Ring
+Keeps the last SNAPSHOT_SECONDS of game state (player, traffic, road offset, spawn
+timer, difficulty, score and the random generator) packed with struct.pack_into into
+one preallocated buffer, one slot per frame. Used to rewind after a crash and to dump
+the final seconds of a run for bug reports. Particles are cosmetic and not saved.
+"""
+
+import json
+import os
+import random
+import struct
+import time
+from config import *
+from cars import ObstacleCar
+from cars.obstacle_car import CAR_TYPES
+
+
+def default_snapshot_path():
+    """Build a timestamped dump path inside SNAPSHOT_DIR"""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    return os.path.join(SNAPSHOT_DIR, time.strftime('snapshots_%Y%m%d_%H%M%S.json'))
+
+
+class SnapshotRing:
+    """Fixed-size ring of packed game-state snapshots, newest overwriting oldest"""
+    
+    def __init__(self, traffic, frames=SNAPSHOT_SECONDS * FPS, max_obstacles=SNAPSHOT_MAX_OBSTACLES):
+        self.capacity = frames
+        self.max_obstacles = max_obstacles
+        self._wave_slots = max(len(wave) for wave in traffic.waves.values())
+        self._traffic_slots = len(traffic.slots)
+        
+        # Score, spawn timer, road offset and distance, difficulty frames and value,
+        # traffic travel, row, occupied count, wave length and counts, row slots, then
+        # player x, y, speed, base speed, boost flag and timer, and the number of obstacles
+        self._header = struct.Struct(
+            f'<iiddiidiiB{self._wave_slots}B{self._traffic_slots}IddddBiH')
+        # Mersenne Twister state words and the cached gauss value with its flag
+        self._rng = struct.Struct('<625Id?')
+        # Obstacle lane x (its x on the straight road), y, speed, colour and car type indexes
+        self._obstacle = struct.Struct('<dddBB')
+        
+        self._slot_size = self._header.size + self._rng.size + self._obstacle.size * max_obstacles
+        self._buffer = bytearray(self._slot_size * frames)
+        self._head = 0
+        self.count = 0
+        
+    def clear(self):
+        """Forget every snapshot (the buffer is kept)"""
+        self._head = 0
+        self.count = 0
+        
+    def capture(self, game):
+        """Pack the game's current state into the next slot"""
+        buffer = self._buffer
+        offset = self._head * self._slot_size
+        traffic = game.traffic
+        player = game.player
+        obstacles = game.obstacles
+        count = min(len(obstacles), self.max_obstacles)
+        
+        wave = traffic.wave + (0,) * (self._wave_slots - len(traffic.wave))
+        self._header.pack_into(
+            buffer, offset,
+            game.score, game.spawn_timer, game.road.line_offset, game.road.distance,
+            game.difficulty.frames, game.difficulty.value,
+            traffic.travel, traffic.row, traffic.occupied, len(traffic.wave), *wave, *traffic.slots,
+            player.x, player.y, player.speed, player.base_speed, player.boost_active, player.boost_timer,
+            count)
+        offset += self._header.size
+        
+        _, words, gauss = random.getstate()
+        self._rng.pack_into(buffer, offset, *words, gauss or 0.0, gauss is not None)
+        offset += self._rng.size
+        
+        for index in range(count):
+            obstacle = obstacles[index]
+            self._obstacle.pack_into(buffer, offset, obstacle.lane_x, obstacle.y, obstacle.speed,
+                                     OBSTACLE_CAR_COLORS.index(obstacle.color),
+                                     CAR_TYPES.index(obstacle.car_type))
+            offset += self._obstacle.size
+            
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        
+    def restore(self, game, frames_back):
+        """
+        Put the game back to the snapshot taken frames_back frames ago (1 = the newest),
+        or the oldest one kept; later snapshots are dropped. Returns False if there are none.
+        """
+        frames_back = min(frames_back, self.count)
+        if frames_back < 1:
+            return False
+        slot = (self._head - frames_back) % self.capacity
+        state = self._unpack(slot)
+        
+        game.score = state['score']
+        game.spawn_timer = state['spawn_timer']
+        game.road.line_offset = state['road_offset']
+        game.road.distance = state['road_distance']
+        game.difficulty.restore(state['difficulty_frames'], state['difficulty_value'])
+        
+        traffic = game.traffic
+        traffic.travel = state['travel']
+        traffic.row = state['row']
+        traffic.occupied = state['occupied']
+        traffic.wave = state['wave']
+        traffic.slots[:] = state['slots']
+        
+        player = game.player
+        player.x, player.y = state['player_x'], state['player_y']
+        player.speed, player.base_speed = state['player_speed'], state['player_base_speed']
+        player.boost_active, player.boost_timer = state['boost_active'], state['boost_timer']
+        player.sync_rect()
+        player.start_step()
+        
+        road_left, road_right = game.road.get_boundaries()
+        game.obstacles.clear()
+        for x, y, speed, color, car_type in state['obstacles']:
+            obstacle = ObstacleCar(road_left, road_right, x=x, y=y, speed=speed)
+            obstacle.color = OBSTACLE_CAR_COLORS[color]
+            obstacle.car_type = CAR_TYPES[car_type]
+            if game.road.track:
+                game.road.place_on_track(obstacle)
+            game.obstacles.append(obstacle)
+        game.particles.clear()
+        
+        # Last, since building the cars above draws random numbers
+        random.setstate(self._unpack_rng(slot))
+        
+        # The restored snapshot is retaken on the next frame
+        self._head = slot
+        self.count -= frames_back
+        return True
+        
+    def dump(self, path):
+        """Write the kept snapshots, oldest first, as JSON for a bug report; returns the path"""
+        slots = [(self._head - self.count + index) % self.capacity for index in range(self.count)]
+        report = {
+            'fps': FPS,
+            'random_state': list(self._unpack_rng(slots[0])[1]) if slots else None,
+            'frames': [self._unpack(slot) for slot in slots],
+        }
+        with open(path, 'w') as f:
+            json.dump(report, f)
+        return path
+        
+    def _unpack(self, slot):
+        """Decode one slot's game state (everything but the random generator)"""
+        buffer = self._buffer
+        offset = slot * self._slot_size
+        values = self._header.unpack_from(buffer, offset)
+        wave_end = 10 + self._wave_slots
+        slots_end = wave_end + self._traffic_slots
+        (x, y, speed, base_speed, boost_active, boost_timer, count) = values[slots_end:]
+        
+        offset += self._header.size + self._rng.size
+        size = self._obstacle.size
+        obstacles = [self._obstacle.unpack_from(buffer, offset + index * size) for index in range(count)]
+        return {
+            'score': values[0],
+            'spawn_timer': values[1],
+            'road_offset': values[2],
+            'road_distance': values[3],
+            'difficulty_frames': values[4],
+            'difficulty_value': values[5],
+            'travel': values[6],
+            'row': values[7],
+            'occupied': values[8],
+            'wave': values[10:10 + values[9]],
+            'slots': values[wave_end:slots_end],
+            'player_x': x,
+            'player_y': y,
+            'player_speed': speed,
+            'player_base_speed': base_speed,
+            'boost_active': bool(boost_active),
+            'boost_timer': boost_timer,
+            'obstacles': obstacles,
+        }
+        
+    def _unpack_rng(self, slot):
+        """Decode one slot's random generator state in random.setstate() form"""
+        values = self._rng.unpack_from(self._buffer, slot * self._slot_size + self._header.size)
+        return (3, values[:625], values[625] if values[626] else None)
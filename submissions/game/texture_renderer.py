@@ -0,0 +1,162 @@
+"""
+Texture Renderer
+Alternative gameplay backend: cached road, car, particle and text sprites are
+uploaded as SDL textures once and each frame is drawn with Renderer copy calls
+Works with the software SDL renderer too, so it runs on machines without a GPU
+"""
+
+from collections import OrderedDict
+import pygame
+from config import *
+from game.particle_effects import particle_sprite
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+    from pygame._sdl2.sdl2 import error as SDLError
+except ImportError:  # pygame built without the SDL2 video module
+    Window = Renderer = Texture = None
+    SDLError = pygame.error
+
+
+class TextureRenderer:
+    """
+    Draws gameplay frames from textures
+    Also accepts blit() and fill() like a Surface, so HUD code can draw on it
+    """
+    
+    def __init__(self, software=TEXTURE_RENDERER_SOFTWARE, fullscreen=False):
+        if Renderer is None:
+            raise pygame.error("pygame._sdl2 is not available")
+            
+        self.window = Window(TITLE, (SCREEN_WIDTH, SCREEN_HEIGHT), resizable=True)
+        self.renderer = None
+        if not software:
+            try:
+                self.renderer = Renderer(self.window, accelerated=1)
+            except SDLError:
+                pass
+        if self.renderer is None:
+            try:
+                self.renderer = Renderer(self.window, accelerated=0)
+            except SDLError as error:
+                # Report it the way the rest of pygame does so callers can fall back
+                self.window.destroy()
+                raise pygame.error(str(error)) from error
+                
+        # The renderer scales the 800x600 logical frame to the window
+        self.renderer.logical_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        if fullscreen:
+            self.set_fullscreen(True)
+            
+        # Sprites from the sprite cache live all session; text and track chunks come and go
+        self._textures = {}
+        self._text_textures = OrderedDict()
+        self._track_textures = OrderedDict()
+        self._canvas_texture = None
+        
+    def set_fullscreen(self, fullscreen):
+        """Switch the window between fullscreen and windowed"""
+        if fullscreen:
+            self.window.set_fullscreen(desktop=True)
+        else:
+            self.window.set_windowed()
+            
+    def window_size(self):
+        """Current window size in pixels"""
+        return self.window.size
+        
+    def texture_for(self, sprite):
+        """Texture for a cached sprite, uploaded on first use"""
+        texture = self._textures.get(sprite)
+        if texture is None:
+            texture = Texture.from_surface(self.renderer, sprite)
+            self._textures[sprite] = texture
+        return texture
+        
+    def _text_texture(self, surface):
+        """Texture for a short-lived surface such as HUD text, kept in a bounded cache"""
+        texture = self._text_textures.get(surface)
+        if texture is None:
+            texture = Texture.from_surface(self.renderer, surface)
+            self._text_textures[surface] = texture
+            if len(self._text_textures) > TEXTURE_TEXT_CACHE_SIZE:
+                self._text_textures.popitem(last=False)
+        else:
+            self._text_textures.move_to_end(surface)
+        return texture
+        
+    def draw_road(self, road):
+        """Copy the road tiles and the scenery strips at the current scroll offset"""
+        for tile, y in road.tiles(simplified=not road.lane_dividers):
+            texture = self._track_texture(tile) if road.track else self.texture_for(tile)
+            texture.draw(dstrect=(0, int(y)))
+        for strip, x, y in road.scenery_tiles():
+            self.texture_for(strip).draw(dstrect=(int(x), int(y)))
+            
+    def _track_texture(self, chunk):
+        """Texture for a track chunk, kept as long as the track keeps the chunk"""
+        texture = self._track_textures.get(chunk)
+        if texture is None:
+            texture = Texture.from_surface(self.renderer, chunk)
+            self._track_textures[chunk] = texture
+            if len(self._track_textures) > TRACK_CACHE_CHUNKS:
+                self._track_textures.popitem(last=False)
+        else:
+            self._track_textures.move_to_end(chunk)
+        return texture
+        
+    def draw_car(self, car, simplified=False):
+        """Copy a car's cached sprite (an obstacle's plain block when simplified)"""
+        sprite = car.sprite(simplified=True) if simplified else car.sprite()
+        self.texture_for(sprite).draw(
+            dstrect=(int(car.x - SPRITE_PADDING), int(car.y - SPRITE_PADDING)))
+            
+    def draw_particles(self, particles):
+        """Copy one circle texture per particle, fading it with alpha modulation"""
+        for particle in particles.particles:
+            if particle.lifetime <= 0:
+                continue
+            alpha_ratio = particle.lifetime / particle.max_lifetime
+            radius = int(particle.size * alpha_ratio)
+            if radius > 0:
+                texture = self.texture_for(particle_sprite(particle.color[:3], radius))
+                texture.alpha = int(255 * alpha_ratio)
+                texture.draw(dstrect=(int(particle.x - radius), int(particle.y - radius)))
+                
+    def draw_canvas(self, surface):
+        """Upload a whole software-rendered frame (menus and overlays) and copy it"""
+        if self._canvas_texture is None:
+            self._canvas_texture = Texture(self.renderer, surface.get_size(), streaming=True)
+        self._canvas_texture.update(surface)
+        self._canvas_texture.draw()
+        
+    def blit(self, source, dest, area=None):
+        """Surface.blit stand-in for UI code"""
+        texture = self._text_texture(source)
+        if isinstance(dest, pygame.Rect):
+            dest = dest.topleft
+        if area is None:
+            texture.draw(dstrect=dest)
+        else:
+            area = pygame.Rect(area)
+            texture.draw(srcrect=area, dstrect=(dest[0], dest[1], area.width, area.height))
+            
+    def fill(self, color, rect=None):
+        """Surface.fill stand-in for UI code"""
+        self.renderer.draw_color = (*color[:3], 255)
+        if rect is None:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(rect)
+            
+    def get_size(self):
+        """Logical frame size, like Surface.get_size"""
+        return SCREEN_WIDTH, SCREEN_HEIGHT
+        
+    def present(self):
+        """Show the frame"""
+        self.renderer.present()
+        
+    def read_pixels(self, surface):
+        """Copy the last frame back into a surface (for recording and mirroring)"""
+        return self.renderer.to_surface(surface)
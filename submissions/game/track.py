@@ -0,0 +1,189 @@
+"""
+Procedural Track
+Generates a curving road in seeded chunks of TRACK_CHUNK_LENGTH rows, with bends,
+width changes and lane merges. Each chunk blends between two control points that
+depend only on the seed and the chunk's index, so any chunk can be built on its own
+and neighbouring chunks always join up. Chunks are prepared just above the screen,
+at most one render per frame, and kept in an LRU cache of TRACK_CACHE_CHUNKS, so
+memory stays bounded however long the run and the road's edges at any row are a
+dictionary and an array lookup.
+
+Track rows are counted from the start line: the road has scrolled `distance` rows
+when row `distance` is at the bottom of the screen.
+"""
+
+import random
+from array import array
+from collections import OrderedDict
+import pygame
+from config import *
+
+
+def blend(t):
+    """Smoothstep from 0 to 1, flat at both ends so chunks join without a kink"""
+    return t * t * (3 - 2 * t)
+
+
+class TrackChunk:
+    """One stretch of track: its edges on every row and its rendered surfaces"""
+    
+    def __init__(self, index, left, right, lanes):
+        self.index = index
+        self.left = left
+        self.right = right
+        # Lanes at the start and at the end of the chunk
+        self.lanes = lanes
+        # Rendered surfaces by (simplified, scale)
+        self.surfaces = {}
+
+
+class Track:
+    """Seeded chunk generator with an LRU cache of built chunks"""
+    
+    def __init__(self, seed=TRACK_SEED, chunk_length=TRACK_CHUNK_LENGTH, cache_chunks=TRACK_CACHE_CHUNKS):
+        self.seed = random.randrange(1 << 30) if seed is None else seed
+        self.chunk_length = chunk_length
+        self.cache_chunks = cache_chunks
+        self._chunks = OrderedDict()
+        # Look the last frame was drawn with, which prepare() builds ahead in
+        self._variant = (False, (1.0, 1.0))
+        
+        # Counters for the debug overlay
+        self.built = 0
+        self.rendered = 0
+        
+    @property
+    def cached(self):
+        """Number of chunks currently held"""
+        return len(self._chunks)
+        
+    def control_point(self, index):
+        """Road centre and lane count where chunk index starts"""
+        if index < TRACK_STRAIGHT_CHUNKS:
+            return SCREEN_WIDTH / 2, TRAFFIC_LANES
+        rng = random.Random(f"{self.seed}:{index}")
+        lanes = rng.choice(TRACK_LANES)
+        shift = min(TRACK_MAX_SHIFT, (SCREEN_WIDTH - lanes * TRACK_LANE_WIDTH) / 2 - TRACK_VERGE)
+        return SCREEN_WIDTH / 2 + rng.uniform(-shift, shift), lanes
+        
+    def chunk(self, index):
+        """Chunk by index, generated if it is not cached; marks it recently used"""
+        chunk = self._chunks.get(index)
+        if chunk is None:
+            chunk = self._generate(index)
+            self._chunks[index] = chunk
+            if len(self._chunks) > self.cache_chunks:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(index)
+        return chunk
+        
+    def boundaries(self, row):
+        """Left and right road edges on a track row"""
+        index, offset = divmod(int(row), self.chunk_length)
+        chunk = self.chunk(index)
+        return chunk.left[offset], chunk.right[offset]
+        
+    def tiles(self, distance, simplified=False, scale=(1.0, 1.0)):
+        """(surface, y) of each chunk on screen once the road has scrolled distance rows"""
+        self._variant = (simplified, scale)
+        length = self.chunk_length
+        first = int(distance) // length
+        last = int(distance + SCREEN_HEIGHT - 1) // length
+        return [(self.surface(index, simplified, scale),
+                 (distance + SCREEN_HEIGHT - (index + 1) * length) * scale[1])
+                for index in range(first, last + 1)]
+                
+    def prepare(self, distance):
+        """Render the nearest chunk, on screen or just above it, that is not ready yet (at most one)"""
+        simplified, scale = self._variant
+        first = int(distance) // self.chunk_length
+        last = int(distance + SCREEN_HEIGHT - 1) // self.chunk_length + TRACK_LOOKAHEAD_CHUNKS
+        for index in range(first, last + 1):
+            chunk = self._chunks.get(index)
+            if chunk is None or (simplified, scale) not in chunk.surfaces:
+                self.surface(index, simplified, scale)
+                return
+                
+    def surface(self, index, simplified=False, scale=(1.0, 1.0)):
+        """Rendered chunk, its far end at the top, built on first use"""
+        chunk = self.chunk(index)
+        key = (simplified, scale)
+        surface = chunk.surfaces.get(key)
+        if surface is None:
+            surface = self._render(chunk, simplified)
+            if scale != (1.0, 1.0):
+                size = (max(1, round(SCREEN_WIDTH * scale[0])), max(1, round(self.chunk_length * scale[1])))
+                surface = pygame.transform.smoothscale(surface, size)
+            chunk.surfaces[key] = surface
+            self.rendered += 1
+        return surface
+        
+    def _generate(self, index):
+        """Edges of every row of a chunk, blended between its two control points"""
+        length = self.chunk_length
+        centre_start, lanes_start = self.control_point(index)
+        centre_end, lanes_end = self.control_point(index + 1)
+        width_start = lanes_start * TRACK_LANE_WIDTH
+        width_end = lanes_end * TRACK_LANE_WIDTH
+        
+        left = array('h', bytes(2 * length))
+        right = array('h', bytes(2 * length))
+        for row in range(length):
+            t = blend(row / length)
+            centre = centre_start + (centre_end - centre_start) * t
+            half = (width_start + (width_end - width_start) * t) / 2
+            left[row] = int(round(centre - half))
+            right[row] = int(round(centre + half))
+        self.built += 1
+        return TrackChunk(index, left, right, (lanes_start, lanes_end))
+        
+    def _render(self, chunk, simplified):
+        """Draw grass, road, edges and markings for a chunk (track rows run up the surface)"""
+        length = self.chunk_length
+        surface = pygame.Surface((SCREEN_WIDTH, length))
+        surface.fill(GRASS_GREEN)
+        
+        rows = list(range(0, length, TRACK_SAMPLE_ROWS)) + [length - 1]
+        left_edge = [(chunk.left[row], length - 1 - row) for row in rows]
+        right_edge = [(chunk.right[row], length - 1 - row) for row in rows]
+        pygame.draw.polygon(surface, ROAD_GRAY, left_edge + right_edge[::-1])
+        
+        # Road edges (white bands inside the edges)
+        pygame.draw.polygon(surface, WHITE, left_edge + [(x + ROAD_EDGE_WIDTH, y) for x, y in reversed(left_edge)])
+        pygame.draw.polygon(surface, WHITE, right_edge + [(x - ROAD_EDGE_WIDTH, y) for x, y in reversed(right_edge)])
+        
+        # Lane dividers: the lane that ends in a merge narrows into the right edge
+        if not simplified:
+            lanes_start, lanes_end = chunk.lanes
+            for divider in range(1, max(lanes_start, lanes_end)):
+                share_start = min(divider / lanes_start, 1.0)
+                share_end = min(divider / lanes_end, 1.0)
+                self._draw_dashes(surface, chunk, WHITE, 6, ROAD_LINE_HEIGHT // 2,
+                                  lambda row: self._lane_x(chunk, row, share_start, share_end))
+                                  
+        # Centre line
+        self._draw_dashes(surface, chunk, YELLOW, 10, ROAD_LINE_HEIGHT,
+                          lambda row: (chunk.left[row] + chunk.right[row]) / 2)
+        return surface
+        
+    def _lane_x(self, chunk, row, share_start, share_end):
+        """x of a lane divider that moves from one share of the road's width to another"""
+        share = share_start + (share_end - share_start) * blend(row / self.chunk_length)
+        return chunk.left[row] + (chunk.right[row] - chunk.left[row]) * share
+        
+    def _draw_dashes(self, surface, chunk, color, width, dash, x_at):
+        """Dashed line along the track, dashes every ROAD_LINE_HEIGHT + ROAD_LINE_GAP rows"""
+        length = self.chunk_length
+        period = ROAD_LINE_HEIGHT + ROAD_LINE_GAP
+        base = chunk.index * length
+        for start in range(base - base % period, base + length, period):
+            first = max(start, base) - base
+            last = min(start + dash, base + length) - base - 1
+            if last < first:
+                continue
+            x_first, x_last = x_at(first), x_at(last)
+            y_first, y_last = length - 1 - first, length - 1 - last
+            pygame.draw.polygon(surface, color, [
+                (x_first - width / 2, y_first), (x_first + width / 2, y_first),
+                (x_last + width / 2, y_last), (x_last - width / 2, y_last)])
@@ -0,0 +1,200 @@
+"""
+Traffic Generator
+Spawns obstacle cars on a lane grid. Every car starts aligned to a row of the grid
+and all traffic moves at one speed, so a ring of per-row lane bitmasks stays exact
+as the cars move: spawn checks are a few bit operations, never a scan of the cars.
+
+Run `python -m game.traffic` to generate a long stretch of traffic and check that
+every pair of consecutive filled rows can be driven through.
+"""
+
+import argparse
+import random
+import sys
+from config import *
+from cars import ObstacleCar
+
+
+class TrafficGenerator:
+    """
+    Lane and row occupancy index plus the spawner built on it
+    Rows are counted along the distance the traffic has travelled: a car in row n
+    reaches the top of the screen once the traffic has travelled n * row_height
+    pixels, so new cars go in the first row still above the screen
+    """
+    
+    def __init__(self, road_left, road_right, lanes=TRAFFIC_LANES, row_gap=TRAFFIC_ROW_GAP,
+                 density=TRAFFIC_DENSITY, waves=TRAFFIC_WAVES):
+        self.road_left = road_left
+        self.road_right = road_right
+        self.lanes = lanes
+        self.lane_width = (road_right - road_left) // lanes
+        self.row_height = OBSTACLE_CAR_HEIGHT + row_gap
+        self.density = density
+        self.waves = waves
+        self.speed = OBSTACLE_CAR_SPEED
+        self.full_mask = (1 << lanes) - 1
+        self._popcount = [bin(mask).count('1') for mask in range(1 << lanes)]
+        
+        # Lane bitmask of each row in a ring of slots indexed by row number: the rows
+        # that can be on screen at once, plus the one being filled above the screen
+        # and one that has just left, so a recycled slot is always off screen
+        self.visible_rows = (SCREEN_HEIGHT + OBSTACLE_CAR_HEIGHT) // self.row_height + 1
+        self.slots = [0] * (self.visible_rows + 2)
+        # Lanes the player can cross between cars 0, 1, 2... rows apart
+        self._shifts = [self.lane_shift(rows) for rows in range(len(self.slots) + 1)]
+        self.reset()
+        
+    def reset(self):
+        """Clear the road"""
+        for index in range(len(self.slots)):
+            self.slots[index] = 0
+        self.travel = 0
+        self.row = 1
+        self.occupied = 0
+        self.wave = ()
+        
+    def advance(self, pace=1.0):
+        """Move the traffic one frame along at the difficulty's speed multiplier, recycling rows"""
+        self.travel += self.speed * pace
+        row = int(self.travel // self.row_height) + 1
+        while self.row < row:
+            self.row += 1
+            # The new row's slot last held a row that is now off the bottom of the screen
+            slot = self.row % len(self.slots)
+            self.occupied -= self._popcount[self.slots[slot]]
+            self.slots[slot] = 0
+            
+    @property
+    def occupancy(self):
+        """Share of on-screen lane slots that hold a car"""
+        return self.occupied / (self.visible_rows * self.lanes)
+        
+    def lanes_taken(self, row):
+        """Bitmask of the lanes holding a car in the given row"""
+        return self.slots[row % len(self.slots)]
+        
+    def is_free(self, lane, row=None):
+        """True if a car can go in this lane of the row (default: the row being filled)"""
+        if row is None:
+            row = self.row
+        return not self.lanes_taken(row) & (1 << lane)
+        
+    def lane_shift(self, rows):
+        """
+        Lanes the player can move across between the cars of two rows this far apart
+        It can only steer while clear of both rows' cars, in the road left between
+        them once its own length is taken off; rows one apart leave it none
+        """
+        gap = rows * self.row_height - OBSTACLE_CAR_HEIGHT - PLAYER_CAR_HEIGHT
+        if gap <= 0:
+            return 0
+        return int(gap * TRAFFIC_STEER_RATIO // self.lane_width)
+        
+    def previous_row(self):
+        """(rows back, lanes taken) of the nearest row below the one being filled that has cars"""
+        for back in range(1, len(self.slots)):
+            taken = self.lanes_taken(self.row - back)
+            if taken:
+                return back, taken
+        return len(self.slots), 0
+        
+    def leaves_way_through(self, mask, below, rows=1):
+        """
+        True if a row with these lanes taken keeps a free lane the player can reach
+        from a free lane of a row the given number of rows below it
+        """
+        free = ~mask & self.full_mask
+        reach = ~below & self.full_mask
+        for _ in range(self._shifts[min(rows, len(self._shifts) - 1)]):
+            reach |= (reach << 1) | (reach >> 1)
+        return bool(reach & free)
+        
+    def can_place(self, lane):
+        """Free slot in the row being filled that does not close off the road"""
+        taken = self.lanes_taken(self.row)
+        bit = 1 << lane
+        if taken & bit:
+            return False
+        rows, below = self.previous_row()
+        return self.leaves_way_through(taken | bit, below, rows)
+        
+    def lane_x(self, lane):
+        """Random x for a car inside the lane, kept clear of the lane edges"""
+        centre = self.road_left + lane * self.lane_width + (self.lane_width - OBSTACLE_CAR_WIDTH) // 2
+        return centre + random.randint(-TRAFFIC_LANE_JITTER, TRAFFIC_LANE_JITTER)
+        
+    def spawn(self):
+        """
+        Place the next step of the current wave in the row being filled
+        Returns the new cars (empty when the road is at its density target)
+        """
+        if self.occupancy >= self.density:
+            return []
+        if not self.wave:
+            self.wave = self.waves[random.choice(sorted(self.waves))]
+        count, self.wave = self.wave[0], self.wave[1:]
+        
+        # Align the car with its row, which is still above the screen
+        y = -OBSTACLE_CAR_HEIGHT + self.travel - self.row * self.row_height
+        cars = []
+        lanes = list(range(self.lanes))
+        random.shuffle(lanes)
+        for lane in lanes:
+            if len(cars) == count:
+                break
+            if self.can_place(lane):
+                self.slots[self.row % len(self.slots)] |= 1 << lane
+                self.occupied += 1
+                cars.append(ObstacleCar(self.road_left, self.road_right,
+                                        x=self.lane_x(lane), y=y, speed=self.speed))
+        return cars
+
+
+def _drivable(traffic, lower, upper, rows):
+    """Lane by lane: a free lane of the upper row is within the player's reach of one in the lower row"""
+    shift = traffic.lane_shift(rows)
+    return any(not lower & (1 << below) and not upper & (1 << above)
+               for below in range(traffic.lanes) for above in range(traffic.lanes)
+               if abs(above - below) <= shift)
+
+
+def main():
+    """Generate traffic headless and check that every pair of consecutive filled rows is drivable"""
+    parser = argparse.ArgumentParser(description="Traffic way-through check")
+    parser.add_argument('--rows', type=int, default=20000, help="rows of traffic to generate")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    random.seed(args.seed)
+    road_left = (SCREEN_WIDTH - ROAD_WIDTH) // 2
+    failures = 0
+    # The game's fastest spawn rate, then a spawn every frame at full density, which
+    # fills far more consecutive rows than the game ever does
+    for density, spawn_delay in ((TRAFFIC_DENSITY, MIN_SPAWN_DELAY), (1.0, 1)):
+        traffic = TrafficGenerator(road_left, road_left + ROAD_WIDTH, density=density)
+        filled = []
+        frame = 0
+        while traffic.row < args.rows:
+            row = traffic.row
+            if frame % spawn_delay == 0:
+                traffic.spawn()
+            frame += 1
+            traffic.advance(random.choice((1.0, 1.5)))
+            if traffic.row != row and traffic.lanes_taken(row):
+                filled.append((row, traffic.lanes_taken(row)))
+                
+        pairs = list(zip(filled, filled[1:]))
+        blocked = [(lower, upper) for lower, upper in pairs
+                   if not _drivable(traffic, lower[1], upper[1], upper[0] - lower[0])]
+        adjacent = sum(1 for lower, upper in pairs if upper[0] - lower[0] == 1)
+        print(f"Density {density}: {len(filled)} filled rows, {adjacent} directly above another, "
+              f"{len(blocked)} not drivable")
+        for (lower_row, lower), (upper_row, upper) in blocked[:5]:
+            print(f"  rows {lower_row} {lower:0{traffic.lanes}b} -> {upper_row} {upper:0{traffic.lanes}b}")
+        failures += len(blocked)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,35 +3,77 @@ F1 Racing Challenge - Main Game File
 A high-speed Formula 1 racing game built with Pygame
 """
 
+import argparse
+import contextlib
 import pygame
+import random
 import sys
+import time
 from config import *
-from cars import PlayerCar, ObstacleCar
-from game import Road, ParticleSystem, GameStateManager, GameState
-from ui import HUD, MainMenu
-from utils import CollisionDetector, SoundManager
+from cars import PlayerCar
+from game import (Road, ParticleSystem, GameStateManager, GameState, QualityGovernor, RenderQueue,
+                  TrafficGenerator, DifficultyEngine)
+from game.difficulty import stop_log_listener
+from game.layer_renderer import LayerRenderer
+from game.multiplayer import MultiplayerClient, parse_address
+from game.track import Track
+from game.snapshot import SnapshotRing, default_snapshot_path
+from game.texture_renderer import TextureRenderer
+from ui import HUD, MainMenu, DebugOverlay
+from utils import CollisionDetector, SoundManager, FrameRecorder
+from utils.frame_recorder import default_recording_path
+from utils.frame_share import SharedFrameBuffer
+from utils.score_store import ScoreStore
+from utils.leaderboard import LeaderboardClient
+from utils.sprite_cache import sprite_cache
+from utils.profiler import SessionProfiler, parse_frame_range
+from utils.alloc_tracker import AllocationTracker
+from utils.telemetry import TelemetryRecorder, default_telemetry_path
 
 
 class F1RacingGame:
     """Main game class that orchestrates all components"""
     
-    def __init__(self):
+    def __init__(self, profiler=None, alloc_tracker=None, telemetry=None, connect=None, track=TRACK_ENABLED):
         # Initialize Pygame
         pygame.init()
         
-        # Setup display
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Setup display: everything draws on an 800x600 canvas (self.screen)
+        # that is presented scaled to whatever size the window is
+        self.fullscreen = FULLSCREEN
+        self.present_mode = PRESENT_MODE
+        self.texture_renderer = None
+        if RENDERER_BACKEND == "texture":
+            try:
+                self.texture_renderer = TextureRenderer(fullscreen=FULLSCREEN)
+            except pygame.error as error:
+                print(f"Texture renderer unavailable ({error}), using software rendering")
+        self._open_display()
         pygame.display.set_caption(TITLE)
         self.clock = pygame.time.Clock()
         
+        # Optional lower internal resolution for the road and cars
+        self.world_surface = None
+        self.world_scale = (1.0, 1.0)
+        self.set_render_size(RENDER_WIDTH, RENDER_HEIGHT)
+        
+        # Batched sprite submission for the full-resolution canvas
+        self.render_queue = RenderQueue()
+        self.layer_renderer = LayerRenderer() if RENDER_THREADS else None
+        
         # Game state management
         self.state_manager = GameStateManager()
         
         # Initialize game components
-        self.road = Road()
+        self.track = Track() if track else None
+        self.road = Road(self.track)
         self.particles = ParticleSystem()
-        self.hud = HUD()
-        self.menu = MainMenu()
+        self.score_store = ScoreStore(kiosk_id=KIOSK_ID).load()
+        self.hud = HUD(self.score_store)
+        self.leaderboard = None
+        if LEADERBOARD_ENABLED:
+            self.leaderboard = LeaderboardClient(kiosk_id=KIOSK_ID).start()
+        self.menu = MainMenu(self.leaderboard)
         self.sound_manager = SoundManager()
         self.collision_detector = CollisionDetector()
         
@@ -41,18 +83,130 @@ class F1RacingGame:
         start_y = SCREEN_HEIGHT - PLAYER_CAR_HEIGHT - 20
         self.player = PlayerCar(start_x, start_y)
         
-        # Obstacles
+        # Obstacles, spawned on the traffic generator's lane grid
         self.obstacles = []
+        self.traffic = TrafficGenerator(*self.road.get_boundaries())
         
         # Game variables
         self.score = 0
         self.spawn_timer = 0
-        self.spawn_delay = INITIAL_SPAWN_DELAY
-        self.last_milestone = 0
         self.running = True
         
+        # Speeds and spawn rate come from the difficulty curve, by score
+        self.difficulty = DifficultyEngine()
+        
+        # Packed state of the last seconds of play, for rewind and bug reports
+        self.snapshots = SnapshotRing(self.traffic)
+        # A crashed run is saved once it is left without rewinding
+        self.run_ended = False
+        
+        # Multiplayer race client (None in single player) and the other players' cars
+        self.multiplayer = None
+        self.rivals = []
+        
+        # Optional session profiler, fed one loop iteration at a time
+        self.profiler = profiler
+        self.frame_number = 0
+        
+        # Optional per-frame allocation tracking
+        self.alloc_tracker = alloc_tracker
+        
+        # Optional per-frame gameplay telemetry
+        self.telemetry = telemetry
+        
+        # Last gameplay frame, reused under the pause and game over overlays
+        self.frozen_frame = None
+        self._idle_state = None
+        
+        # Adaptive quality and the F3 debug overlay
+        self.quality = QualityGovernor()
+        self.debug_overlay = DebugOverlay()
+        self.apply_quality()
+        
+        # Frame recording (off until toggled)
+        self.recorder = None
+        
+        # Shared-memory frame mirror for local spectator screens
+        self.frame_share = None
+        if SHARED_FRAME_ENABLED:
+            try:
+                self.frame_share = SharedFrameBuffer(self.screen)
+            except FileExistsError as error:
+                print(f"Not mirroring frames: {error}")
+                
+        # Straight into a race when a server was given
+        if connect:
+            self.join_multiplayer(*connect)
+            
+    def _open_display(self):
+        """Create the window and the canvas it presents"""
+        if self.texture_renderer:
+            # The texture renderer owns the window; menus still draw on a canvas
+            self.window = None
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            return
+            
+        if self.present_mode == "scaled":
+            # SDL scales the canvas to the window on the GPU and maps mouse coordinates back
+            flags = pygame.SCALED | pygame.RESIZABLE
+            if self.fullscreen:
+                flags |= pygame.FULLSCREEN
+            try:
+                self.window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags)
+                self.screen = self.window
+                return
+            except pygame.error:
+                # Some drivers cannot (re)create the scaling renderer
+                self.present_mode = "smoothscale"
+                self.screen = None
+                
+        if self.present_mode == "smoothscale":
+            # Software path: smoothscale the canvas straight into the window surface
+            if self.fullscreen:
+                self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            else:
+                self.window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+            if getattr(self, 'screen', None) is None:
+                self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+                
+    def set_render_size(self, width, height):
+        """Render the road and cars at width x height and upscale them onto the canvas"""
+        sprite_cache.drop_scale(self.world_scale)
+        if (width, height) == (SCREEN_WIDTH, SCREEN_HEIGHT):
+            self.world_surface = None
+            self.world_scale = (1.0, 1.0)
+        else:
+            self.world_surface = pygame.Surface((width, height))
+            self.world_scale = (width / SCREEN_WIDTH, height / SCREEN_HEIGHT)
+            
+    def toggle_fullscreen(self):
+        """Switch between windowed and fullscreen presentation"""
+        self.fullscreen = not self.fullscreen
+        if self.texture_renderer:
+            self.texture_renderer.set_fullscreen(self.fullscreen)
+            return
+        try:
+            if self.present_mode != "scaled":
+                raise pygame.error("Software presentation reopens the window")
+            pygame.display.toggle_fullscreen()
+        except pygame.error:
+            self._open_display()
+            
+    def mouse_pos(self):
+        """Mouse position in canvas coordinates"""
+        x, y = pygame.mouse.get_pos()
+        if self.window is self.screen:
+            return x, y
+        if self.texture_renderer:
+            window_width, window_height = self.texture_renderer.window_size()
+        else:
+            window_width, window_height = self.window.get_size()
+        return x * SCREEN_WIDTH // window_width, y * SCREEN_HEIGHT // window_height
+        
     def reset_game(self):
         """Reset game to initial state"""
+        self.save_run()
+        
         # Reset player
         road_left, road_right = self.road.get_boundaries()
         start_x = SCREEN_WIDTH // 2 - PLAYER_CAR_WIDTH // 2
@@ -61,50 +215,111 @@ class F1RacingGame:
         
         # Clear obstacles and particles
         self.obstacles.clear()
+        self.traffic.reset()
         self.particles.clear()
         
         # Reset game variables
         self.score = 0
         self.spawn_timer = 0
-        self.spawn_delay = INITIAL_SPAWN_DELAY
-        self.last_milestone = 0
+        self.difficulty.reset()
+        self.snapshots.clear()
         
         # Reset road
         self.road.reset()
         
     def spawn_obstacle(self):
-        """Spawn a new obstacle car"""
-        road_left, road_right = self.road.get_boundaries()
-        obstacle = ObstacleCar(road_left, road_right)
-        self.obstacles.append(obstacle)
-        
-    def handle_difficulty_progression(self):
-        """Increase difficulty as score increases"""
-        for milestone in SCORE_MILESTONES:
-            if self.score >= milestone and self.last_milestone < milestone:
-                self.last_milestone = milestone
-                
-                # Increase speeds
-                self.player.increase_difficulty(SPEED_INCREASE_PER_MILESTONE)
-                self.road.increase_speed(SPEED_INCREASE_PER_MILESTONE * 0.5)
-                
-                # Increase obstacle speed
-                for obstacle in self.obstacles:
-                    obstacle.increase_speed(SPEED_INCREASE_PER_MILESTONE)
-                
-                print(f"Difficulty increased at score {milestone}!")
-                
+        """Spawn the next obstacle cars of the current traffic wave"""
+        self.obstacles.extend(self.traffic.spawn())
+        
+    def apply_quality(self):
+        """Push the governor's current settings into the subsystems it controls"""
+        settings = self.quality.settings
+        self.particles.max_particles = settings['max_particles']
+        self.road.lane_dividers = settings['lane_dividers']
+        self.road.show_scenery = SCENERY_ENABLED and settings['scenery']
+        self.hud.refresh_interval = settings['hud_interval']
+        
+    def rewind(self):
+        """Go back REWIND_SECONDS from the crash and carry on playing"""
+        if self.snapshots.restore(self, REWIND_SECONDS * FPS):
+            # The run goes on, so the crash is not saved
+            self.run_ended = False
+            self.state_manager.change_state(GameState.PLAYING)
+            
+    def save_run(self):
+        """Record the crashed run, unless it was already saved or rewound"""
+        if not self.run_ended:
+            return
+        self.run_ended = False
+        self.hud.record_score(self.score)
+        if self.leaderboard:
+            self.leaderboard.submit(self.score)
+            
+    def dump_snapshots(self):
+        """Write the last seconds of play to a file for a bug report"""
+        if self.snapshots.count:
+            path = self.snapshots.dump(default_snapshot_path())
+            print(f"Snapshots saved to {path}")
+            
+    def join_multiplayer(self, host, port):
+        """Race on a multiplayer server; stays in single player if it cannot be reached"""
+        try:
+            client = MultiplayerClient(host, port, self.road, self.difficulty).start()
+        except ConnectionError as error:
+            print(error)
+            return
+        self.multiplayer = client
+        # Races are run on the server's straight road
+        self.road.track = None
+        self.player = client.car
+        self.obstacles = client.obstacles
+        self.rivals = client.rivals
+        self.particles.clear()
+        self.state_manager.change_state(GameState.PLAYING)
+        print(f"Joined {host}:{port} as player {client.player_id + 1}")
+        
+    def leave_multiplayer(self):
+        """Disconnect from the race and go back to single player"""
+        self.multiplayer.stop()
+        self.multiplayer = None
+        self.road.track = self.track
+        self.obstacles = []
+        self.rivals = []
+        self.reset_game()
+        
+    def toggle_recording(self):
+        """Start or stop recording the rendered frames"""
+        if self.recorder:
+            self.recorder.stop()
+            self.recorder = None
+        else:
+            self.recorder = FrameRecorder(self.screen.get_size(),
+                                          default_recording_path(RECORDING_MODE),
+                                          mode=RECORDING_MODE)
+            self.recorder.start()
+            print(f"Recording to {self.recorder.path}")
+            
     def update_game(self):
         """Update game logic"""
         if not self.state_manager.is_playing():
             return
+        if self.multiplayer:
+            self.update_multiplayer()
+            return
             
-        # Update road animation
-        self.road.update()
+        # Shared speed multipliers for this frame
+        pace = self.difficulty.settings
         
-        # Update player
+        # Update road animation; a curving road can push the car along
+        self.road.update(pace['road_speed'])
+        if self.road.track:
+            self.player.keep_on_road(*self.road.get_boundaries())
+            
+        # Update player; the engine note follows its speed
         self.player.update()
-        
+        self.sound_manager.update_engine(self.player.speed * pace['player_speed'],
+                                         self.player.boost_active)
+                                         
         # Emit exhaust particles
         exhaust_x = self.player.x + self.player.width // 2
         exhaust_y = self.player.y + self.player.height
@@ -113,61 +328,111 @@ class F1RacingGame:
         if self.player.boost_active:
             self.particles.emit_boost_trail(exhaust_x - 10, exhaust_y)
             self.particles.emit_boost_trail(exhaust_x + 10, exhaust_y)
-        
+            
         # Spawn obstacles
+        self.traffic.advance(pace['obstacle_speed'])
         self.spawn_timer += 1
-        if self.spawn_timer >= self.spawn_delay:
+        if self.spawn_timer >= pace['spawn_delay']:
             self.spawn_obstacle()
             self.spawn_timer = 0
             
-            # Gradually decrease spawn delay (increase difficulty)
-            if self.spawn_delay > MIN_SPAWN_DELAY:
-                self.spawn_delay -= SPAWN_DELAY_DECREASE
-        
-        # Update obstacles
-        road_left, road_right = self.road.get_boundaries()
-        for obstacle in self.obstacles[:]:
-            obstacle.move()
+        # Update obstacles, compacting the list in place as cars leave the screen
+        player_dx = self.player.x - self.player.step_x
+        player_dy = self.player.y - self.player.step_y
+        kept = 0
+        for obstacle in self.obstacles:
+            obstacle.move(pace['obstacle_speed'])
+            obstacle_dx = self.road.place_on_track(obstacle) if self.road.track else 0
             
             # Remove off-screen obstacles
             if obstacle.is_off_screen():
-                self.obstacles.remove(obstacle)
                 self.score += 1
                 self.sound_manager.play_score()
-                
-            # Check collision
-            if self.collision_detector.check_precise_collision(
-                self.player.get_rect(), 
-                obstacle.get_rect()
-            ):
+                continue
+            self.obstacles[kept] = obstacle
+            kept += 1
+            
+            # Swept test on the cars' persistent sprite bounds, then their cached masks:
+            # pixel-perfect, and cars cannot pass through each other within one step
+            hit = self.collision_detector.sweep_cars(
+                self.player, player_dx, player_dy,
+                obstacle, obstacle_dx, obstacle.speed * pace['obstacle_speed']
+            )
+            if hit:
                 # Game over
-                collision_point = self.collision_detector.get_collision_point(
-                    self.player.get_rect(),
-                    obstacle.get_rect()
-                )
-                if collision_point:
-                    self.particles.emit_collision_sparks(*collision_point)
-                
+                _, contact_x, contact_y = hit
+                self.particles.emit_collision_sparks(int(contact_x), int(contact_y))
                 self.sound_manager.play_collision()
                 self.state_manager.change_state(GameState.GAME_OVER)
+        del self.obstacles[kept:]
+        self.player.start_step()
         
         # Update particles
         self.particles.update()
         
-        # Handle difficulty progression
-        self.handle_difficulty_progression()
+        # Difficulty follows the score
+        self.difficulty.update(self.score)
+        
+        # The run is saved when the game over screen is left, as it may be rewound
+        if self.state_manager.is_game_over():
+            self.run_ended = True
+            
+    def update_multiplayer(self):
+        """Follow the server's race: own car predicted, everything else from the server"""
+        client = self.multiplayer
+        was_alive = client.alive
+        client.update()
+        if not client.connected:
+            print("Lost the connection to the race server")
+            self.leave_multiplayer()
+            self.state_manager.change_state(GameState.MENU)
+            return
+        self.score = client.score
+        
+        self.sound_manager.update_engine(self.player.speed * self.difficulty.settings['player_speed'],
+                                         self.player.boost_active)
+        if client.alive:
+            exhaust_x = self.player.x + self.player.width // 2
+            exhaust_y = self.player.y + self.player.height
+            self.particles.emit_exhaust(exhaust_x, exhaust_y, self.player.boost_active)
+            if self.player.boost_active:
+                self.particles.emit_boost_trail(exhaust_x - 10, exhaust_y)
+                self.particles.emit_boost_trail(exhaust_x + 10, exhaust_y)
+        elif was_alive:
+            # Crashed: the race carries on until the server starts the next round
+            self.particles.emit_collision_sparks(int(self.player.x + self.player.width // 2), int(self.player.y))
+            self.sound_manager.play_collision()
+            self.hud.record_score(self.score)
+            if self.leaderboard:
+                self.leaderboard.submit(self.score)
+        self.particles.update()
         
-    def handle_events(self):
-        """Handle input events"""
-        for event in pygame.event.get():
+    def handle_events(self, events=None):
+        """Handle input events (pending ones unless a list is given)"""
+        if events is None:
+            events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
                 
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                self.toggle_recording()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.debug_overlay.toggle()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+                self.toggle_fullscreen()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F7:
+                self.dump_snapshots()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                self.sound_manager.toggle()
+            if event.type == pygame.VIDEORESIZE and self.window not in (None, self.screen):
+                self.window = pygame.display.get_surface()
+                
             # Menu state events
             if self.state_manager.is_menu():
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     action = self.menu.handle_click(
-                        pygame.mouse.get_pos(),
+                        self.mouse_pos(),
                         pygame.mouse.get_pressed()
                     )
                     if action == "start":
@@ -180,11 +445,16 @@ class F1RacingGame:
             elif self.state_manager.is_playing():
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
-                        self.player.activate_boost()
+                        if self.multiplayer:
+                            self.multiplayer.request_boost()
+                        else:
+                            self.player.activate_boost()
                         self.sound_manager.play_boost()
-                    elif event.key == pygame.K_p:
+                    elif event.key == pygame.K_p and not self.multiplayer:
                         self.state_manager.toggle_pause()
                     elif event.key == pygame.K_ESCAPE:
+                        if self.multiplayer:
+                            self.leave_multiplayer()
                         self.state_manager.change_state(GameState.MENU)
                         
             # Paused state events
@@ -201,48 +471,172 @@ class F1RacingGame:
                     if event.key == pygame.K_SPACE:
                         self.reset_game()
                         self.state_manager.change_state(GameState.PLAYING)
+                    elif event.key == pygame.K_r:
+                        self.rewind()
                     elif event.key == pygame.K_ESCAPE:
+                        self.save_run()
                         self.state_manager.change_state(GameState.MENU)
-        
+                        
         # Continuous key presses (for smooth movement)
         if self.state_manager.is_playing():
             keys = pygame.key.get_pressed()
             road_left, road_right = self.road.get_boundaries()
             
-            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                self.player.move_left(road_left)
-            if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                self.player.move_right(road_right)
+            pace = self.difficulty.settings['player_speed']
+            left = keys[pygame.K_LEFT] or keys[pygame.K_a]
+            right = keys[pygame.K_RIGHT] or keys[pygame.K_d]
+            
+            # In a race the input goes to the server and moves the predicted car
+            if self.multiplayer:
+                self.multiplayer.send_input(int(bool(right)) - int(bool(left)))
+                return
                 
+            if left:
+                self.player.move_left(road_left, pace)
+            if right:
+                self.player.move_right(road_right, pace)
+                
+    def draw_world(self, flush=True):
+        """Draw the road, particles and cars onto the canvas (flush=False leaves them queued)"""
+        if self.world_surface is None:
+            # Cached sprites, submitted with one Surface.blits call per layer
+            queue = self.render_queue
+            for tile, y in self.road.tiles(simplified=not self.road.lane_dividers):
+                queue.add('road', tile, 0, y)
+            for strip, x, y in self.road.scenery_tiles():
+                queue.add('road', strip, x, y)
+            self.particles.queue_sprites(queue)
+            
+            simple_obstacles = self.quality.settings['simple_obstacles']
+            for obstacle in self.obstacles:
+                queue.add('obstacles', obstacle.sprite(simplified=simple_obstacles),
+                          obstacle.x - SPRITE_PADDING, obstacle.y - SPRITE_PADDING)
+                          
+            for rival in self.rivals:
+                queue.add('player', rival.sprite(), rival.x - SPRITE_PADDING, rival.y - SPRITE_PADDING)
+            queue.add('player', self.player.sprite(),
+                      self.player.x - SPRITE_PADDING, self.player.y - SPRITE_PADDING)
+            if flush:
+                self.flush_queue()
+            return
+            
+        # Low internal resolution: cached sprites at this scale, then one upscale
+        world = self.world_surface
+        self.road.draw_scaled(world, self.world_scale, not self.road.lane_dividers)
+        self.particles.draw_scaled(world, self.world_scale)
+        simple_obstacles = self.quality.settings['simple_obstacles']
+        for obstacle in self.obstacles:
+            obstacle.draw_scaled(world, self.world_scale, simple_obstacles)
+        for rival in self.rivals:
+            rival.draw_scaled(world, self.world_scale)
+        self.player.draw_scaled(world, self.world_scale)
+        pygame.transform.scale(world, (SCREEN_WIDTH, SCREEN_HEIGHT), self.screen)
+        
+    def flush_queue(self):
+        """Submit the queued sprites to the canvas, on the layer threads when enabled"""
+        if self.layer_renderer:
+            self.layer_renderer.flush(self.render_queue, self.screen)
+        else:
+            self.render_queue.flush(self.screen)
+            
+    def render_textured(self):
+        """Draw a gameplay frame with the texture renderer"""
+        renderer = self.texture_renderer
+        renderer.fill(BLACK)
+        renderer.draw_road(self.road)
+        renderer.draw_particles(self.particles)
+        simple_obstacles = self.quality.settings['simple_obstacles']
+        for obstacle in self.obstacles:
+            renderer.draw_car(obstacle, simple_obstacles)
+        for rival in self.rivals:
+            renderer.draw_car(rival)
+        renderer.draw_car(self.player)
+        
+        # HUD text goes through the renderer's blit()
+        self.hud.draw_playing_hud(
+            renderer,
+            self.score,
+            self.player.speed * self.difficulty.settings['player_speed'],
+            self.player.boost_active
+        )
+        self.draw_debug_overlay(renderer)
+        
+        # Read back only when something consumes the canvas
+        if self.recorder or self.frame_share:
+            renderer.read_pixels(self.screen)
+        renderer.present()
+        
+    def draw_frozen_frame(self):
+        """Draw the last gameplay frame, composing it only once per pause or game over"""
+        if self.frozen_frame is None:
+            self.draw_world()
+            self.frozen_frame = self.screen.copy()
+        else:
+            self.screen.blit(self.frozen_frame, (0, 0))
+            
+    def draw_debug_overlay(self, target):
+        """Draw the performance readouts when the overlay is shown"""
+        if self.debug_overlay.visible:
+            stats = {
+                'FPS': f"{self.clock.get_fps():.0f}",
+                'Frame': f"{self.quality.frame_ms:.1f} ms",
+                'Quality': self.quality.settings['name'],
+                'Particles': len(self.particles.particles),
+                'Obstacles': len(self.obstacles),
+                'Blits': f"{self.render_queue.submitted} ({self.render_queue.culled} culled)",
+            }
+            if self.layer_renderer:
+                stats['Layers redrawn'] = self.layer_renderer.redrawn
+            if self.road.show_scenery and not self.road.track:
+                stats['Scenery'] = f"{self.road.scenery.objects} objects in {len(self.road.scenery.layers)} layers"
+            if self.road.track:
+                stats['Track chunks'] = f"{self.road.track.cached} cached, {self.road.track.built} built"
+            if self.alloc_tracker:
+                stats.update(self.alloc_tracker.stats())
+            self.debug_overlay.draw(target, stats)
+            
+    def present(self):
+        """Show the canvas in the window, scaling it when the two differ"""
+        if self.texture_renderer:
+            self.texture_renderer.draw_canvas(self.screen)
+            self.texture_renderer.present()
+            return
+        if self.window is not self.screen:
+            if self.window.get_size() == self.screen.get_size():
+                self.window.blit(self.screen, (0, 0))
+            else:
+                pygame.transform.smoothscale(self.screen, self.window.get_size(), self.window)
+        pygame.display.flip()
+        
     def render(self):
         """Render all game objects"""
+        self.render_queue.begin_frame()
+        
+        # Gameplay frames on the texture backend never touch the canvas
+        textured = self.texture_renderer is not None and self.state_manager.is_playing()
+        if textured:
+            self.render_textured()
+            
         # Menu state
-        if self.state_manager.is_menu():
+        elif self.state_manager.is_menu():
             self.menu.draw(self.screen)
-            self.menu.update(pygame.mouse.get_pos())
             
         # Playing or paused state
         elif self.state_manager.is_playing() or self.state_manager.is_paused():
-            # Draw road
-            self.road.draw(self.screen)
-            
-            # Draw particles (background layer)
-            self.particles.draw(self.screen)
-            
-            # Draw obstacles
-            for obstacle in self.obstacles:
-                obstacle.draw(self.screen)
-            
-            # Draw player
-            self.player.draw(self.screen)
-            
-            # Draw HUD
+            # Draw road, particles and cars (frozen while paused)
+            if self.state_manager.is_paused():
+                self.draw_frozen_frame()
+            else:
+                self.draw_world(flush=False)
+                
+            # Draw HUD (queued, then submitted with the world in one flush)
             self.hud.draw_playing_hud(
-                self.screen,
+                self.render_queue.layer('hud'),
                 self.score,
-                self.player.speed,
+                self.player.speed * self.difficulty.settings['player_speed'],
                 self.player.boost_active
             )
+            self.flush_queue()
             
             # Draw pause overlay if paused
             if self.state_manager.is_paused():
@@ -251,43 +645,195 @@ class F1RacingGame:
         # Game over state
         elif self.state_manager.is_game_over():
             # Draw final frame
-            self.road.draw(self.screen)
-            self.particles.draw(self.screen)
-            
-            for obstacle in self.obstacles:
-                obstacle.draw(self.screen)
-            
-            self.player.draw(self.screen)
+            self.draw_frozen_frame()
             
             # Draw game over overlay
             self.hud.draw_game_over(self.screen, self.score)
+            
+        # The frozen frame only lives while gameplay is stopped
+        if not (self.state_manager.is_paused() or self.state_manager.is_game_over()):
+            self.frozen_frame = None
+            
+        # Software-rendered frames: readouts, then show the canvas
+        if not textured:
+            self.draw_debug_overlay(self.screen)
+            self.present()
+            
+        # Hand the finished frame to the recorder
+        if self.recorder:
+            self.recorder.capture(self.screen)
+        if self.frame_share:
+            self.frame_share.publish(self.screen)
+            
+    def wait_for_frame(self):
+        """
+        Wait until the next iteration is due: hold FPS during gameplay, otherwise
+        sleep until input arrives or IDLE_WAIT_MS passes
+        Returns the events that ended an idle wait (None during gameplay)
+        """
+        if self.state_manager.is_playing():
+            self.clock.tick(FPS)
+            return None
+        event = pygame.event.wait(IDLE_WAIT_MS)
+        return [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
         
-        # Update display
-        pygame.display.flip()
+    def run_idle(self, events):
+        """One loop iteration outside gameplay: redraw only when something visible changed"""
+        self.handle_events(events)
+        self.sound_manager.silence_engine()
         
-    def run(self):
-        """Main game loop"""
-        while self.running:
-            # Limit frame rate
-            self.clock.tick(FPS)
+        state = self.state_manager.current_state
+        redraw = state != self._idle_state or self.debug_overlay.visible
+        # Pointer movement alone only matters if it changes a button's hover state
+        redraw = redraw or any(event.type != pygame.MOUSEMOTION for event in events)
+        if self.state_manager.is_menu():
+            redraw = self.menu.update(self.mouse_pos()) or redraw
             
-            # Handle events
-            self.handle_events()
+        if redraw and not self.state_manager.is_playing():
+            self.render()
+            self._idle_state = state
             
-            # Update game state
+    def run_frame(self, events=None):
+        """One iteration of the main loop, after wait_for_frame"""
+        # Menus and overlays are event driven
+        if events is not None:
+            self.run_idle(events)
+            return
+        self._idle_state = None
+        frame_start = time.perf_counter()
+        playing = self.state_manager.is_playing()
+        
+        # Snapshot the state this frame starts from (a race's state lives on its server)
+        if playing and not self.multiplayer:
+            with self.tracked('snapshot'):
+                self.snapshots.capture(self)
+                
+        # Handle events
+        self.handle_events()
+        
+        # Update game state
+        with self.tracked('update_game'):
             self.update_game()
             
-            # Render everything
+        # Render everything
+        with self.tracked('render'):
             self.render()
+        if self.alloc_tracker:
+            self.alloc_tracker.end_frame()
+            
+        # Adjust quality from the time spent on this frame
+        frame_ms = (time.perf_counter() - frame_start) * 1000
+        if self.quality.update(frame_ms):
+            self.apply_quality()
+            
+        # Telemetry for every played frame, including the one that crashed
+        if self.telemetry and playing:
+            player = self.player
+            self.telemetry.record(frame_ms, self.score, player.speed * self.difficulty.settings['player_speed'],
+                                  player.boost_active, len(self.obstacles), len(self.particles.particles),
+                                  self.difficulty.settings['spawn_delay'], player.x,
+                                  self.state_manager.is_game_over())
+                                  
+    def tracked(self, name):
+        """Allocation tracking section (does nothing unless tracking is on)"""
+        if self.alloc_tracker:
+            return self.alloc_tracker.section(name)
+        return contextlib.nullcontext()
         
+    def run(self):
+        """Main game loop"""
+        if self.profiler:
+            self.profiler.start()
+        while self.running:
+            events = self.wait_for_frame()
+            
+            # Waiting is left out of the profile; only the frame's work is measured
+            profiling = self.profiler and self.profiler.begin_frame(
+                self.frame_number, self.state_manager.current_state)
+            self.run_frame(events)
+            if profiling:
+                self.profiler.end_frame()
+            self.frame_number += 1
+            
         # Cleanup
+        self.save_run()
+        if self.profiler:
+            self.profiler.finish()
+        if self.alloc_tracker:
+            self.alloc_tracker.report()
+            self.alloc_tracker.stop()
+        self.score_store.close()
+        if self.layer_renderer:
+            self.layer_renderer.close()
+        stop_log_listener()
+        self.sound_manager.stop_all()
+        if self.leaderboard:
+            self.leaderboard.stop()
+        if self.recorder:
+            self.recorder.stop()
+        if self.telemetry:
+            self.telemetry.stop()
+        if self.multiplayer:
+            self.multiplayer.stop()
+        if self.frame_share:
+            self.frame_share.close()
         pygame.quit()
         sys.exit()
 
 
+def parse_states(text):
+    """Parse comma-separated state names into a list of GameState"""
+    states = []
+    for name in text.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        try:
+            states.append(GameState(name))
+        except ValueError:
+            valid = ', '.join(state.value for state in GameState)
+            raise argparse.ArgumentTypeError(f"unknown state {name!r} (choose from {valid})")
+    return states
+
+
 def main():
     """Entry point for the game"""
-    game = F1RacingGame()
+    parser = argparse.ArgumentParser(description="F1 Racing Challenge")
+    parser.add_argument('--seed', type=int, help="seed traffic and effects for repeatable runs")
+    parser.add_argument('--profile', choices=('cprofile', 'sample'),
+                        help="profile the session deterministically or by sampling")
+    parser.add_argument('--profile-states', default='playing', type=parse_states,
+                        help="comma-separated states to profile (menu, playing, paused, game_over)")
+    parser.add_argument('--profile-frames', default=':', type=parse_frame_range,
+                        help="loop iterations to profile as START:END, e.g. 300:1200")
+    parser.add_argument('--profile-out', help="output path prefix (default: profiles/session_*)")
+    parser.add_argument('--track-allocations', action='store_true',
+                        help="measure allocations and GC pauses per gameplay frame")
+    parser.add_argument('--telemetry', action='store_true', default=TELEMETRY_ENABLED,
+                        help="record per-frame gameplay telemetry to telemetry/")
+    parser.add_argument('--track', action='store_true', default=TRACK_ENABLED,
+                        help="race on the procedurally generated curving track instead of the straight road")
+    parser.add_argument('--connect', metavar='HOST:PORT', type=parse_address,
+                        help="join a multiplayer race (start one with `python -m game.multiplayer serve`)")
+    args = parser.parse_args()
+    
+    if args.seed is not None:
+        random.seed(args.seed)
+        
+    profiler = None
+    if args.profile:
+        profiler = SessionProfiler(args.profile, args.profile_states, args.profile_frames, args.profile_out)
+        
+    alloc_tracker = None
+    if args.track_allocations:
+        alloc_tracker = AllocationTracker({'update_game': F1RacingGame.update_game,
+                                           'render': F1RacingGame.render}).start()
+                                           
+    telemetry = None
+    if args.telemetry:
+        telemetry = TelemetryRecorder(default_telemetry_path()).start()
+        
+    game = F1RacingGame(profiler, alloc_tracker, telemetry, args.connect, args.track)
     game.run()
 
 
@@ -6,5 +6,8 @@ Contains user interface components
 from .hud import HUD
 from .menu import MainMenu, Button
 from .toggle_button import ToggleButton, MusicToggleButton, SoundToggleButton
+from .debug_overlay import DebugOverlay
+from .glyph_atlas import GlyphAtlas, glyph_atlas
 
-__all__ = ['HUD', 'MainMenu', 'Button', 'ToggleButton', 'MusicToggleButton', 'SoundToggleButton']
+__all__ = ['HUD', 'MainMenu', 'Button', 'ToggleButton', 'MusicToggleButton', 'SoundToggleButton',
+           'DebugOverlay', 'GlyphAtlas', 'glyph_atlas']
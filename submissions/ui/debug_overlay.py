@@ -0,0 +1,49 @@
+"""
+Debug Overlay
+Shows frame timing and engine internals on top of the game (toggle with F3)
+Lines are drawn from a glyph atlas, so refreshing them renders nothing
+"""
+
+import pygame
+from config import *
+from ui.glyph_atlas import glyph_atlas
+
+
+class DebugOverlay:
+    """Small text panel with performance readouts"""
+    
+    def __init__(self):
+        self.atlas = glyph_atlas(FONT_SIZE_SMALL, WHITE, GLYPH_ATLAS_TEXT)
+        self.visible = False
+        self._lines = []
+        self._width = 0
+        self._frames_until_refresh = 0
+        
+    def toggle(self):
+        """Show or hide the overlay"""
+        self.visible = not self.visible
+        self._frames_until_refresh = 0
+        
+    def draw(self, screen, stats):
+        """
+        Draw the overlay from a dict of label -> value
+        Text is only updated a few times per second
+        """
+        if not self.visible:
+            return
+            
+        if self._frames_until_refresh <= 0:
+            self._lines = [f"{label}: {value}" for label, value in stats.items()]
+            self._width = max(self.atlas.width(line) for line in self._lines)
+            self._frames_until_refresh = DEBUG_OVERLAY_REFRESH_FRAMES
+        self._frames_until_refresh -= 1
+        
+        width = self._width + HUD_PADDING * 2
+        height = len(self._lines) * 20 + HUD_PADDING
+        panel = pygame.Rect(HUD_PADDING, SCREEN_HEIGHT - height - 40, width, height)
+        screen.fill(BLACK, panel)
+        
+        y = panel.y + HUD_PADDING // 2
+        for line in self._lines:
+            self.atlas.draw(screen, line, panel.x + HUD_PADDING, y)
+            y += 20
@@ -0,0 +1,72 @@
+"""
+Glyph Atlas
+Characters of one font size and color rasterized once and packed side by side on
+a single surface. Text is drawn by blitting slices of it, so readouts that change
+every frame need no font rendering and no new surfaces. Anything with
+blit(source, dest, area) can be drawn on: surfaces, render-queue layers and the
+texture renderer (which uploads the atlas once, like any other text).
+"""
+
+import pygame
+from config import *
+
+
+class GlyphAtlas:
+    """Pre-rasterized glyphs on one surface, with the slice each character occupies"""
+    
+    def __init__(self, font, color, characters=GLYPH_ATLAS_DIGITS):
+        glyphs = [(character, font.render(character, True, color)) for character in dict.fromkeys(characters)]
+        self.height = max(glyph.get_height() for _, glyph in glyphs)
+        self.surface = pygame.Surface((sum(glyph.get_width() for _, glyph in glyphs), self.height),
+                                      pygame.SRCALPHA)
+        self._areas = {}
+        x = 0
+        for character, glyph in glyphs:
+            self.surface.blit(glyph, (x, 0))
+            self._areas[character] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            x += glyph.get_width()
+            
+        # Characters missing from the atlas are drawn as '?' (or a gap)
+        self._fallback = self._areas.get('?') or self._areas.get(' ') or pygame.Rect(0, 0, 0, 0)
+        
+    def width(self, text):
+        """Width text takes when drawn from this atlas"""
+        areas = self._areas
+        fallback = self._fallback
+        return sum(areas.get(character, fallback).width for character in text)
+        
+    def draw(self, target, text, x, y):
+        """
+        Blit text with its top-left at (x, y), one glyph slice per character
+        Returns the x where the text ends; a surface target gets a single blits call
+        """
+        areas = self._areas
+        fallback = self._fallback
+        surface = self.surface
+        if isinstance(target, pygame.Surface):
+            entries = []
+            for character in text:
+                area = areas.get(character, fallback)
+                entries.append((surface, (x, y), area))
+                x += area.width
+            target.blits(entries, doreturn=False)
+            return x
+        for character in text:
+            area = areas.get(character, fallback)
+            target.blit(surface, (x, y), area)
+            x += area.width
+        return x
+
+
+# Built atlases by (font size, color, characters), shared by every view
+_atlases = {}
+
+
+def glyph_atlas(size, color, characters=GLYPH_ATLAS_DIGITS):
+    """Shared atlas for the default font at size in color, built on first use"""
+    key = (size, color, characters)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = GlyphAtlas(pygame.font.Font(None, size), color, characters)
+        _atlases[key] = atlas
+    return atlas
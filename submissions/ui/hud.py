@@ -5,45 +5,83 @@ Displays game information like score, speed, and status
 
 import pygame
 from config import *
+from ui.glyph_atlas import glyph_atlas
 
 
 class HUD:
     """Heads-up display for game information"""
     
-    def __init__(self):
+    def __init__(self, score_store=None):
         self.font_small = pygame.font.Font(None, FONT_SIZE_SMALL)
         self.font_medium = pygame.font.Font(None, FONT_SIZE_MEDIUM)
         self.font_large = pygame.font.Font(None, FONT_SIZE_LARGE)
-        self.high_score = 0
+        self.score_store = score_store
+        self.high_score = score_store.best() if score_store else 0
+        
+        # Cached text; the readouts refresh every refresh_interval frames
+        self.refresh_interval = 1
+        self._frames_until_refresh = 0
+        self._readout_values = None
+        self._readouts = ("0", "0", "0")
         
+        # Readout labels are rendered once; the numbers are blitted from glyph atlases
+        self._score_label = self.font_medium.render("Score: ", True, WHITE)
+        self._high_score_label = self.font_small.render("Best: ", True, YELLOW)
+        self._speed_label = self.font_small.render("Speed: ", True, WHITE)
+        self._speed_unit = self.font_small.render(" km/h", True, WHITE)
+        self._score_digits = glyph_atlas(FONT_SIZE_MEDIUM, WHITE)
+        self._high_score_digits = glyph_atlas(FONT_SIZE_SMALL, YELLOW)
+        self._speed_digits = glyph_atlas(FONT_SIZE_SMALL, WHITE)
+        self._boost_badge, self._boost_badge_pos = self._render_boost_badge()
+        self._controls_text = self.font_small.render("← → : Move  |  SPACE: Boost  |  P: Pause", 
+                                                     True, LIGHT_GRAY)
+                                                     
     def draw_playing_hud(self, screen, score, speed, boost_active):
         """Draw HUD during gameplay"""
-        # Score display
-        score_text = self.font_medium.render(f"Score: {score}", True, WHITE)
-        screen.blit(score_text, (HUD_PADDING, HUD_PADDING))
-        
         # High score
         if score > self.high_score:
             self.high_score = score
-        high_score_text = self.font_small.render(f"Best: {self.high_score}", True, YELLOW)
-        screen.blit(high_score_text, (HUD_PADDING, HUD_PADDING + 40))
+            
+        # Readouts are updated every refresh_interval frames and only when changed
+        self._frames_until_refresh -= 1
+        if self._frames_until_refresh <= 0:
+            self._frames_until_refresh = self.refresh_interval
+            values = (score, self.high_score, int(speed * 10))
+            if values != self._readout_values:
+                self._readout_values = values
+                self._readouts = (str(score), str(self.high_score), str(values[2]))
+        score_text, high_score_text, speed_text = self._readouts
         
+        # Score display
+        screen.blit(self._score_label, (HUD_PADDING, HUD_PADDING))
+        self._score_digits.draw(screen, score_text, HUD_PADDING + self._score_label.get_width(), HUD_PADDING)
+        screen.blit(self._high_score_label, (HUD_PADDING, HUD_PADDING + 40))
+        self._high_score_digits.draw(screen, high_score_text, HUD_PADDING + self._high_score_label.get_width(),
+                                     HUD_PADDING + 40)
+                                     
         # Speed indicator
-        speed_text = self.font_small.render(f"Speed: {int(speed * 10)} km/h", True, WHITE)
-        screen.blit(speed_text, (SCREEN_WIDTH - 150, HUD_PADDING))
+        x = SCREEN_WIDTH - 150
+        screen.blit(self._speed_label, (x, HUD_PADDING))
+        x = self._speed_digits.draw(screen, speed_text, x + self._speed_label.get_width(), HUD_PADDING)
+        screen.blit(self._speed_unit, (x, HUD_PADDING))
         
         # Boost indicator
         if boost_active:
-            boost_text = self.font_medium.render("BOOST!", True, YELLOW)
-            text_rect = boost_text.get_rect(center=(SCREEN_WIDTH // 2, 50))
-            # Pulsing effect
-            pygame.draw.rect(screen, (255, 255, 0, 100), text_rect.inflate(20, 10))
-            screen.blit(boost_text, text_rect)
-        
+            screen.blit(self._boost_badge, self._boost_badge_pos)
+            
         # Controls hint (small)
-        controls_text = self.font_small.render("← → : Move  |  SPACE: Boost  |  P: Pause", 
-                                               True, LIGHT_GRAY)
-        screen.blit(controls_text, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT - 25))
+        screen.blit(self._controls_text, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT - 25))
+        
+    def _render_boost_badge(self):
+        """Pre-render the BOOST! label on its highlight box"""
+        boost_text = self.font_medium.render("BOOST!", True, YELLOW)
+        text_rect = boost_text.get_rect(center=(SCREEN_WIDTH // 2, 50))
+        box_rect = text_rect.inflate(20, 10)
+        
+        badge = pygame.Surface(box_rect.size)
+        badge.fill((255, 255, 0))
+        badge.blit(boost_text, (text_rect.x - box_rect.x, text_rect.y - box_rect.y))
+        return badge, box_rect.topleft
         
     def draw_game_over(self, screen, final_score):
         """Draw game over screen"""
@@ -68,9 +106,9 @@ class HUD:
             new_record_text = self.font_medium.render("NEW RECORD!", True, YELLOW)
             new_record_rect = new_record_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
             screen.blit(new_record_text, new_record_rect)
-        
+            
         # Restart instructions
-        restart_text = self.font_small.render("Press SPACE to restart  |  ESC for menu", True, WHITE)
+        restart_text = self.font_small.render("Press SPACE to restart  |  R to rewind  |  ESC for menu", True, WHITE)
         restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100))
         screen.blit(restart_text, restart_rect)
         
@@ -96,7 +134,14 @@ class HUD:
         menu_text = self.font_small.render("Press ESC for main menu", True, LIGHT_GRAY)
         menu_rect = menu_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 60))
         screen.blit(menu_text, menu_rect)
-    
+        
+    def record_score(self, final_score):
+        """Persist a finished run (non-blocking) and keep the best score current"""
+        if final_score > self.high_score:
+            self.high_score = final_score
+        if self.score_store:
+            self.score_store.record(final_score)
+            
     def reset_high_score(self):
-        """Reset high score (for testing)"""
+        """Reset the displayed high score (the persisted runs are kept)"""
         self.high_score = 0
@@ -5,6 +5,7 @@ Main menu and menu components
 
 import pygame
 from config import *
+from ui.glyph_atlas import glyph_atlas
 
 
 class Button:
@@ -17,23 +18,25 @@ class Button:
         self.hover_color = hover_color
         self.current_color = color
         self.font = pygame.font.Font(None, FONT_SIZE_MEDIUM)
+        self._text_surface = self.font.render(self.text, True, WHITE)
+        self._text_rect = self._text_surface.get_rect(center=self.rect.center)
         
     def draw(self, screen):
         """Draw the button"""
         pygame.draw.rect(screen, self.current_color, self.rect, border_radius=10)
         pygame.draw.rect(screen, WHITE, self.rect, 3, border_radius=10)
-        
-        text_surface = self.font.render(self.text, True, WHITE)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        screen.blit(self._text_surface, self._text_rect)
         
     def is_hovered(self, mouse_pos):
         """Check if mouse is hovering over button"""
         return self.rect.collidepoint(mouse_pos)
-    
+        
     def update(self, mouse_pos):
-        """Update button appearance based on hover"""
-        self.current_color = self.hover_color if self.is_hovered(mouse_pos) else self.color
+        """Update button appearance based on hover; returns True if it changed"""
+        color = self.hover_color if self.is_hovered(mouse_pos) else self.color
+        changed = color != self.current_color
+        self.current_color = color
+        return changed
         
     def is_clicked(self, mouse_pos, mouse_pressed):
         """Check if button is clicked"""
@@ -43,9 +46,19 @@ class Button:
 class MainMenu:
     """Main menu screen"""
     
-    def __init__(self):
+    def __init__(self, leaderboard=None):
         self.title_font = pygame.font.Font(None, 80)
         self.subtitle_font = pygame.font.Font(None, FONT_SIZE_MEDIUM)
+        self.leaderboard_font = pygame.font.Font(None, FONT_SIZE_SMALL)
+        
+        # Leaderboard client whose cached top list is shown beside the road; the
+        # entries are drawn from a glyph atlas, so a new list renders nothing
+        self.leaderboard = leaderboard
+        self._leaderboard_source = None
+        self._leaderboard_lines = []
+        self._leaderboard_atlas = glyph_atlas(FONT_SIZE_SMALL, WHITE, GLYPH_ATLAS_TEXT)
+        self._leaderboard_title = self.leaderboard_font.render("TOP 10", True, YELLOW)
+        self._leaderboard_empty = self.leaderboard_font.render("No scores yet", True, LIGHT_GRAY)
         
         # Create buttons
         button_x = SCREEN_WIDTH // 2 - MENU_BUTTON_WIDTH // 2
@@ -72,14 +85,17 @@ class MainMenu:
         self.buttons = [self.start_button, self.instructions_button, self.quit_button]
         self.show_instructions = False
         
-    def draw(self, screen):
-        """Draw the main menu"""
-        # Background
-        screen.fill(GRASS_GREEN)
+        # Background, road and title never change, so they are drawn once
+        self._background = self._render_background()
+        
+    def _render_background(self):
+        """Pre-render the static part of the menu"""
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background.fill(GRASS_GREEN)
         
         # Draw road in background
         road_left = (SCREEN_WIDTH - ROAD_WIDTH) // 2
-        pygame.draw.rect(screen, ROAD_GRAY, (road_left, 0, ROAD_WIDTH, SCREEN_HEIGHT))
+        pygame.draw.rect(background, ROAD_GRAY, (road_left, 0, ROAD_WIDTH, SCREEN_HEIGHT))
         
         # Title
         title_text = self.title_font.render("F1 RACING", True, YELLOW)
@@ -87,22 +103,49 @@ class MainMenu:
         
         # Title shadow
         shadow_text = self.title_font.render("F1 RACING", True, BLACK)
-        screen.blit(shadow_text, (title_rect.x + 3, title_rect.y + 3))
-        screen.blit(title_text, title_rect)
+        background.blit(shadow_text, (title_rect.x + 3, title_rect.y + 3))
+        background.blit(title_text, title_rect)
         
         # Subtitle
         subtitle_text = self.subtitle_font.render("Challenge Edition", True, WHITE)
         subtitle_rect = subtitle_text.get_rect(center=(SCREEN_WIDTH // 2, 220))
-        screen.blit(subtitle_text, subtitle_rect)
+        background.blit(subtitle_text, subtitle_rect)
+        return background
+        
+    def draw(self, screen):
+        """Draw the main menu"""
+        screen.blit(self._background, (0, 0))
         
         # Draw buttons
         for button in self.buttons:
             button.draw(screen)
             
+        # Top runs across all kiosks
+        if self.leaderboard:
+            self._draw_leaderboard(screen)
+            
         # Show instructions if toggled
         if self.show_instructions:
             self._draw_instructions_overlay(screen)
             
+    def _draw_leaderboard(self, screen):
+        """Draw the cached top-10 list in the grass left of the road"""
+        top = self.leaderboard.cached_top
+        
+        # Re-format only when the client has swapped in a new list
+        if top is not self._leaderboard_source:
+            self._leaderboard_source = top
+            self._leaderboard_lines = [f"{rank:>2}. {entry['score']:>5}  {entry['kiosk'][:8]}"
+                                       for rank, entry in enumerate(top[:LEADERBOARD_SIZE], start=1)]
+                                       
+        y = SCREEN_HEIGHT // 2
+        screen.blit(self._leaderboard_title, (HUD_PADDING * 2, y))
+        if not self._leaderboard_lines:
+            screen.blit(self._leaderboard_empty, (HUD_PADDING * 2, y + 24))
+        for line in self._leaderboard_lines:
+            y += 24
+            self._leaderboard_atlas.draw(screen, line, HUD_PADDING * 2, y)
+            
     def _draw_instructions_overlay(self, screen):
         """Draw instructions overlay"""
         # Semi-transparent background
@@ -152,10 +195,17 @@ class MainMenu:
         screen.blit(close_text, close_rect)
         
     def update(self, mouse_pos):
-        """Update menu buttons"""
+        """
+        Update menu buttons
+        Returns True when hover or the leaderboard changed and the menu needs redrawing
+        """
+        changed = False
         for button in self.buttons:
-            button.update(mouse_pos)
-            
+            changed = button.update(mouse_pos) or changed
+        if self.leaderboard and self.leaderboard.cached_top is not self._leaderboard_source:
+            changed = True
+        return changed
+        
     def handle_click(self, mouse_pos, mouse_pressed):
         """Handle button clicks and return action"""
         if self.show_instructions:
@@ -171,19 +221,19 @@ class MainMenu:
             return None
         elif self.quit_button.is_clicked(mouse_pos, mouse_pressed):
             return "quit"
-        
+            
         return None
-
+        
  self.music_toggle = MusicToggleButton(
     x=SCREEN_WIDTH - 150,
     y=20,
     width=120,
     height=50
  )
-
+ 
  # In draw():
  self.music_toggle.draw(screen)
-
+ 
  # In handle_click():
  if self.music_toggle.handle_click(mouse_pos, mouse_pressed):
     sound_manager.enabled = self.music_toggle.get_state()
@@ -5,5 +5,17 @@ Contains helper classes and functions
 
 from .collision import CollisionDetector
 from .sound_manager import SoundManager
+from .sprite_cache import SpriteCache, sprite_cache
+from .frame_recorder import FrameRecorder, read_ring
+from .frame_share import SharedFrameBuffer, SharedFrameReader
+from .score_store import ScoreStore
+from .leaderboard import LeaderboardClient, LeaderboardServer
+from .profiler import SessionProfiler
+from .alloc_tracker import AllocationTracker
+from .telemetry import TelemetryRecorder, read_session
 
-__all__ = ['CollisionDetector', 'SoundManager']
+__all__ = ['CollisionDetector', 'SoundManager', 'SpriteCache', 'sprite_cache',
+           'FrameRecorder', 'read_ring',
+           'SharedFrameBuffer', 'SharedFrameReader', 'ScoreStore',
+           'LeaderboardClient', 'LeaderboardServer', 'SessionProfiler',
+           'AllocationTracker', 'TelemetryRecorder', 'read_session']
@@ -0,0 +1,232 @@
+"""
+Allocation Tracker
+Instrumentation mode that measures Python-heap allocations per frame with tracemalloc,
+GC pauses with gc callbacks, and which lines of the game loop kept memory comes from
+(SDL pixel buffers are allocated outside the Python heap and are not counted)
+
+Run `python -m utils.alloc_tracker` to play scripted steady-state scenarios headless
+and check them against ALLOCATION_BUDGETS (exits non-zero when one is exceeded).
+"""
+
+import argparse
+import contextlib
+import gc
+import inspect
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter, deque
+from config import *
+
+
+class AllocationTracker:
+    """
+    Per-frame allocation and GC statistics for named sections of the frame
+    (update_game and render in the game loop)
+    """
+    
+    def __init__(self, sites=None, depth=ALLOCATION_TRACE_DEPTH, history=ALLOCATION_HISTORY_FRAMES):
+        self.depth = depth
+        self.frames = 0
+        
+        # Per-frame numbers for each section: bytes kept, peak bytes in flight, blocks kept
+        self.history = {}
+        self._history_size = history
+        self._frame = {}
+        
+        # GC pauses as (generation, milliseconds)
+        self.gc_pauses = deque(maxlen=history)
+        self._gc_start = None
+        
+        # Call sites: function name -> (filename, first line, last line)
+        self._sites = {}
+        for name, function in (sites or {}).items():
+            lines, first = inspect.getsourcelines(function)
+            self._sites[name] = (inspect.getsourcefile(function), first, first + len(lines) - 1)
+        self.site_growth = Counter()
+        self._snapshot = None
+        
+    def start(self):
+        """Start tracing allocations and timing collections"""
+        tracemalloc.start(self.depth)
+        gc.callbacks.append(self._on_gc)
+        return self
+        
+    def stop(self):
+        """Stop tracing"""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        tracemalloc.stop()
+        
+    @contextlib.contextmanager
+    def section(self, name):
+        """Measure the allocations made inside the with-block"""
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        blocks = sys.getallocatedblocks()
+        yield
+        current, peak = tracemalloc.get_traced_memory()
+        self._frame[name] = (current - start, peak - start, sys.getallocatedblocks() - blocks)
+        
+    def end_frame(self):
+        """Close the frame: file its sections and, every so often, attribute growth to call sites"""
+        self.frames += 1
+        for name, numbers in self._frame.items():
+            if name not in self.history:
+                self.history[name] = deque(maxlen=self._history_size)
+            self.history[name].append(numbers)
+        self._frame.clear()
+        
+        if self._sites and self.frames % ALLOCATION_SNAPSHOT_FRAMES == 0:
+            self._compare_snapshots()
+            
+    def stats(self):
+        """Averages over the recent history, for the debug overlay"""
+        stats = {}
+        for name, frames in self.history.items():
+            peak = sum(numbers[1] for numbers in frames) / len(frames)
+            blocks = sum(numbers[2] for numbers in frames) / len(frames)
+            stats[f"{name} alloc"] = f"{peak / 1024:.1f} KB, {blocks:+.0f} blocks"
+        if self.gc_pauses:
+            stats['GC max'] = f"{max(ms for _, ms in self.gc_pauses):.2f} ms"
+        return stats
+        
+    def check_budgets(self, budgets=ALLOCATION_BUDGETS):
+        """List the sections whose average peak bytes per frame exceed their budget"""
+        failures = []
+        for name, budget in budgets.items():
+            frames = self.history.get(name)
+            if not frames:
+                continue
+            average = sum(numbers[1] for numbers in frames) / len(frames)
+            if average > budget:
+                failures.append(f"{name}: {average:.0f} bytes/frame over budget of {budget}")
+        return failures
+        
+    def report(self):
+        """Print a summary of allocations, GC pauses and the biggest growing call sites"""
+        print(f"Allocation report over the last {min(self.frames, self._history_size)} frames:")
+        for name, frames in self.history.items():
+            kept = [numbers[0] for numbers in frames]
+            peaks = [numbers[1] for numbers in frames]
+            blocks = [numbers[2] for numbers in frames]
+            print(f"  {name:<12} peak {sum(peaks) / len(peaks):9.0f} B/frame (max {max(peaks)})"
+                  f"  kept {sum(kept) / len(kept):+8.1f} B/frame"
+                  f"  blocks {sum(blocks) / len(blocks):+6.1f}/frame")
+                  
+        for generation in range(3):
+            pauses = [ms for gen, ms in self.gc_pauses if gen == generation]
+            if pauses:
+                print(f"  gc gen {generation}     {len(pauses)} pauses, "
+                      f"mean {sum(pauses) / len(pauses):.3f} ms, max {max(pauses):.3f} ms")
+                      
+        if self.site_growth:
+            print("  Memory kept, by call site:")
+            for site, size in self.site_growth.most_common(ALLOCATION_REPORT_SITES):
+                if size > 0:
+                    print(f"    {site:<24} {size:+d} B")
+                    
+    def _on_gc(self, phase, info):
+        """gc callback: time each collection"""
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            pause = (time.perf_counter() - self._gc_start) * 1000
+            self.gc_pauses.append((info['generation'], pause))
+            self._gc_start = None
+            
+    def _site_of(self, traceback):
+        """Name of the tracked function line the allocation came through, or None"""
+        for frame in traceback:
+            for name, (filename, first, last) in self._sites.items():
+                if frame.filename == filename and first <= frame.lineno <= last:
+                    return f"{name}:{frame.lineno}"
+        return None
+        
+    def _compare_snapshots(self):
+        """Add the memory each call site kept since the previous snapshot"""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),))
+        if self._snapshot is not None:
+            for diff in snapshot.compare_to(self._snapshot, 'traceback'):
+                site = self._site_of(diff.traceback)
+                if site and diff.size_diff:
+                    self.site_growth[site] += diff.size_diff
+        self._snapshot = snapshot
+
+
+def _run_scenario(game, name, frames, warmup):
+    """Play one scripted scenario headless and return its tracker"""
+    import pygame
+    from game import GameState
+    from main import F1RacingGame
+    
+    tracker = AllocationTracker({'update_game': F1RacingGame.update_game,
+                                 'render': F1RacingGame.render})
+    game.alloc_tracker = None
+    game.reset_game()
+    game.state_manager.change_state(GameState.PLAYING)
+    # Open road for the cruise scenario: no traffic ever spawns
+    game.traffic.density = 0 if name == 'cruise' else TRAFFIC_DENSITY
+        
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            game.alloc_tracker = tracker.start()
+        pygame.event.pump()
+        # Weave across the road so the car and particles keep moving
+        road_left, road_right = game.road.get_boundaries()
+        if (frame // 60) % 2:
+            game.player.move_left(road_left)
+        else:
+            game.player.move_right(road_right)
+        if frame % 180 == 0:
+            game.player.activate_boost()
+            
+        with game.tracked('update_game'):
+            game.update_game()
+        with game.tracked('render'):
+            game.render()
+        if game.alloc_tracker:
+            game.alloc_tracker.end_frame()
+            
+        # Traffic scenario: crashes are part of steady state, so drive straight on
+        if game.state_manager.is_game_over():
+            game.state_manager.change_state(GameState.PLAYING)
+            game.obstacles.clear()
+            
+    tracker.stop()
+    game.alloc_tracker = None
+    return tracker
+
+
+def main():
+    """Check steady-state allocation budgets headless"""
+    parser = argparse.ArgumentParser(description="Per-frame allocation budget check")
+    parser.add_argument('--frames', type=int, default=600, help="measured frames per scenario")
+    parser.add_argument('--warmup', type=int, default=300, help="frames before measuring")
+    parser.add_argument('--scenario', action='append', choices=('cruise', 'traffic'),
+                        help="scenario to run (default: all)")
+    args = parser.parse_args()
+    
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import random
+    from main import F1RacingGame
+    
+    random.seed(0)
+    game = F1RacingGame()
+    failed = False
+    for name in args.scenario or ('cruise', 'traffic'):
+        print(f"Scenario {name}")
+        tracker = _run_scenario(game, name, args.frames, args.warmup)
+        tracker.report()
+        for failure in tracker.check_budgets():
+            print(f"  OVER BUDGET {failure}")
+            failed = True
+    game.score_store.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
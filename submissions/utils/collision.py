@@ -1,9 +1,13 @@
 """
 Collision Detection Utilities
 Advanced collision detection and handling
+Cars collide pixel-perfectly: a cheap box test on their sprite bounds runs first,
+and only boxes that meet compare the cars' cached sprite masks
 """
 
+import math
 import pygame
+from config import *
 
 
 class CollisionDetector:
@@ -13,19 +17,116 @@ class CollisionDetector:
     def check_collision(rect1, rect2):
         """Basic rectangle collision detection"""
         return rect1.colliderect(rect2)
-    
+        
+    @staticmethod
+    def sweep_aabb(box1, dx1, dy1, box2, dx2, dy2):
+        """
+        Continuous collision test for two boxes that moved by (dx, dy) during the
+        step and now sit at box1 and box2, so fast cars cannot pass through
+        each other between frames
+        Returns (t, x, y): the fraction of the step at first contact and the contact
+        point, or None if the boxes never overlapped during the step
+        """
+        # Work in box 1's frame of reference, from the start of the step
+        x1 = box1.x - dx1
+        y1 = box1.y - dy1
+        x2 = box2.x - dx2
+        y2 = box2.y - dy2
+        vx = dx1 - dx2
+        vy = dy1 - dy2
+        
+        # Interval of the step during which the boxes overlap on each axis
+        entry_x, exit_x = CollisionDetector._sweep_axis(x1, box1.width, x2, box2.width, vx)
+        entry_y, exit_y = CollisionDetector._sweep_axis(y1, box1.height, y2, box2.height, vy)
+        entry = max(entry_x, entry_y)
+        leave = min(exit_x, exit_y)
+        if entry >= leave or entry >= 1.0 or leave <= 0.0:
+            return None
+        # Boxes already overlapping at the start of the step touch at t = 0
+        t = max(entry, 0.0)
+        
+        # Contact point: middle of the touching faces (or of the overlap at t = 0)
+        ax = x1 + dx1 * t
+        ay = y1 + dy1 * t
+        bx = x2 + dx2 * t
+        by = y2 + dy2 * t
+        contact_x = (max(ax, bx) + min(ax + box1.width, bx + box2.width)) / 2
+        contact_y = (max(ay, by) + min(ay + box1.height, by + box2.height)) / 2
+        return t, contact_x, contact_y
+        
+    @staticmethod
+    def _sweep_axis(start1, size1, start2, size2, velocity):
+        """Times (in steps) when box 1 starts and stops overlapping box 2 along one axis"""
+        if velocity > 0:
+            return (start2 - start1 - size1) / velocity, (start2 + size2 - start1) / velocity
+        if velocity < 0:
+            return (start2 + size2 - start1) / velocity, (start2 - start1 - size1) / velocity
+        if start1 + size1 <= start2 or start2 + size2 <= start1:
+            return 1.0, 0.0  # Never overlap on this axis
+        return float('-inf'), float('inf')
+        
+    @staticmethod
+    def sweep_cars(car1, dx1, dy1, car2, dx2, dy2):
+        """
+        Pixel-perfect swept test for two cars that moved by (dx, dy) during the step
+        Their sprite bounds are swept first; only when those meet are the cars' masks
+        compared, from the moment the bounds touch to the end of the step
+        Returns (t, x, y): the fraction of the step at first contact and the first
+        overlapping pixel, or None if the cars never touched
+        """
+        hit = CollisionDetector.sweep_aabb(car1.bounds, dx1, dy1, car2.bounds, dx2, dy2)
+        if hit is None:
+            return None
+        return CollisionDetector.sweep_masks(car1.collision_mask(), car1.bounds.x, car1.bounds.y, dx1, dy1,
+                                             car2.collision_mask(), car2.bounds.x, car2.bounds.y, dx2, dy2,
+                                             hit[0])
+                                             
     @staticmethod
-    def check_precise_collision(car1_rect, car2_rect, tolerance=5):
+    def sweep_masks(mask1, x1, y1, dx1, dy1, mask2, x2, y2, dx2, dy2, start=0.0):
+        """
+        Test two masks that moved by (dx, dy) and now have their top-left corners at
+        (x1, y1) and (x2, y2), at positions from `start` to the end of the step no more
+        than COLLISION_SWEEP_STEP pixels of relative movement apart
+        Returns (t, x, y) at the first overlapping pixel, or None
+        """
+        travel = max(abs(dx1 - dx2), abs(dy1 - dy2)) * (1.0 - start)
+        samples = max(1, math.ceil(travel / COLLISION_SWEEP_STEP))
+        for sample in range(samples + 1):
+            t = start + (1.0 - start) * sample / samples
+            ax = x1 - dx1 * (1.0 - t)
+            ay = y1 - dy1 * (1.0 - t)
+            point = mask1.overlap(mask2, (round(x2 - dx2 * (1.0 - t) - ax), round(y2 - dy2 * (1.0 - t) - ay)))
+            if point:
+                return t, ax + point[0], ay + point[1]
+        return None
+        
+    @staticmethod
+    def check_mask_collision(car1, car2):
+        """
+        Pixel-perfect test between two cars where they stand, box test first
+        Returns the first overlapping pixel, or None
+        """
+        if not car1.bounds.colliderect(car2.bounds):
+            return None
+        point = car1.collision_mask().overlap(car2.collision_mask(),
+                                              (car2.bounds.x - car1.bounds.x, car2.bounds.y - car1.bounds.y))
+        if point is None:
+            return None
+        return car1.bounds.x + point[0], car1.bounds.y + point[1]
+        
+    @staticmethod
+    def check_precise_collision(car1_rect, car2_rect, tolerance=COLLISION_TOLERANCE):
         """
         More precise collision detection with tolerance
-        Reduces the hitbox slightly to make gameplay more forgiving
+        Reduces the hitbox slightly to make gameplay more forgiving (the game itself
+        uses the pixel-perfect sweep_cars)
         """
         # Shrink rectangles slightly for more forgiving collision
         adjusted_rect1 = car1_rect.inflate(-tolerance, -tolerance)
         adjusted_rect2 = car2_rect.inflate(-tolerance, -tolerance)
         
         return adjusted_rect1.colliderect(adjusted_rect2)
-    
+        
     @staticmethod
     def get_collision_point(rect1, rect2):
         """Get the approximate collision point between two rectangles"""
@@ -41,7 +142,7 @@ class CollisionDetector:
         collision_y = (center1[1] + center2[1]) // 2
         
         return (collision_x, collision_y)
-    
+        
     @staticmethod
     def check_multiple_collisions(player_rect, obstacle_rects):
         """
@@ -53,4 +154,4 @@ class CollisionDetector:
             if CollisionDetector.check_precise_collision(player_rect, obstacle_rect):
                 collisions.append(i)
         return collisions
-      
+
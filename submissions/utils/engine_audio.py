@@ -0,0 +1,181 @@
+"""
+Engine Audio
+Engine sound whose pitch follows the player's speed. A bank of engine loops, each
+resampled to a higher pitch, is built once with NumPy (or loaded from ENGINE_CACHE_DIR)
+and every loop plays continuously on its own mixer channel; changing speed only moves
+a crossfade between the two loops nearest the current pitch.
+"""
+
+import hashlib
+import math
+import os
+import struct
+import pygame
+from config import *
+
+try:
+    import numpy
+except ImportError:  # NumPy is only needed to build the bank, not to load a cached one
+    numpy = None
+
+
+class EngineAudio:
+    """Precomputed pitch bank crossfaded by speed"""
+    
+    def __init__(self, path=ENGINE_SOUND_FILE, steps=ENGINE_PITCH_STEPS, pitches=ENGINE_PITCH_RANGE,
+                 cache_dir=ENGINE_CACHE_DIR):
+        if not pygame.mixer.get_init():
+            raise pygame.error("mixer not initialized")
+        self.steps = steps
+        self.sounds = self._load_bank(path, steps, pitches, cache_dir)
+        self.channels = None
+        
+        # Equal-power crossfade for every quantized position along the bank:
+        # (lower loop, its volume, volume of the loop above it)
+        self._fades = []
+        for index in range((steps - 1) * ENGINE_FADE_RESOLUTION + 1):
+            lower, part = divmod(index, ENGINE_FADE_RESOLUTION)
+            angle = part / ENGINE_FADE_RESOLUTION * math.pi / 2
+            self._fades.append((min(lower, steps - 2), math.cos(angle), math.sin(angle)))
+        self._fades[-1] = (steps - 2, 0.0, 1.0)
+        self._key = None
+        self._pair = None
+        
+    def start(self):
+        """Start every loop, silent, on channels reserved for the engine"""
+        if self.channels:
+            return
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), self.steps + 8))
+        pygame.mixer.set_reserved(self.steps)
+        self.channels = [pygame.mixer.Channel(index) for index in range(self.steps)]
+        for channel, sound in zip(self.channels, self.sounds):
+            channel.set_volume(0.0)
+            channel.play(sound, loops=-1)
+        self._key = None
+        self._pair = None
+        
+    def stop(self):
+        """Stop the loops and give the channels back"""
+        if self.channels:
+            for channel in self.channels:
+                channel.stop()
+            pygame.mixer.set_reserved(0)
+            self.channels = None
+            
+    def update(self, speed, boost_active):
+        """
+        Follow the car's speed; costs one comparison unless the quantized pitch or the
+        boost changed, and then at most four channel volume changes
+        """
+        if not self.channels:
+            return
+        low, high = ENGINE_SPEED_RANGE
+        position = (speed - low) / (high - low)
+        position = 0.0 if position < 0.0 else 1.0 if position > 1.0 else position
+        key = (int(position * (len(self._fades) - 1) + 0.5), boost_active)
+        if key == self._key:
+            return
+        self._key = key
+        
+        lower, low_volume, high_volume = self._fades[key[0]]
+        volume = ENGINE_BOOST_VOLUME if boost_active else ENGINE_VOLUME
+        if self._pair is not None and self._pair != lower:
+            self.channels[self._pair].set_volume(0.0)
+            self.channels[self._pair + 1].set_volume(0.0)
+        self.channels[lower].set_volume(low_volume * volume)
+        self.channels[lower + 1].set_volume(high_volume * volume)
+        self._pair = lower
+        
+    def silence(self):
+        """Mute the engine (the loops keep running so it can come back without a click)"""
+        if self.channels and self._pair is not None:
+            self.channels[self._pair].set_volume(0.0)
+            self.channels[self._pair + 1].set_volume(0.0)
+        self._key = None
+        self._pair = None
+        
+    def _load_bank(self, path, steps, pitches, cache_dir):
+        """Read the bank from the cache, or build it and write the cache"""
+        stat = os.stat(path)
+        settings = (stat.st_size, stat.st_mtime_ns, pygame.mixer.get_init(), steps, pitches,
+                    ENGINE_LOOP_SECONDS, ENGINE_LOOP_FADE_SECONDS)
+        key = hashlib.sha1(repr(settings).encode()).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"engine_{key}.bank")
+        
+        if os.path.exists(cache_path):
+            sounds = self._read_cache(cache_path, steps)
+            if sounds:
+                return sounds
+            print(f"Rebuilding damaged engine sound cache {cache_path}")
+            
+        sounds = self._build_bank(path, steps, pitches)
+        raw = [sound.get_raw() for sound in sounds]
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write a temporary file and rename it, so a crash never leaves half a cache
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(struct.pack(f'<I{len(raw)}I', len(raw), *(len(chunk) for chunk in raw)))
+            for chunk in raw:
+                f.write(chunk)
+        os.replace(temp_path, cache_path)
+        return sounds
+        
+    @staticmethod
+    def _read_cache(cache_path, steps):
+        """Loops from a cache file, or None if it is truncated or not a bank of steps loops"""
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+        try:
+            count, = struct.unpack_from('<I', data)
+            if count != steps:
+                return None
+            lengths = struct.unpack_from(f'<{count}I', data, 4)
+        except struct.error:
+            return None
+        offset = 4 + 4 * count
+        if offset + sum(lengths) != len(data) or not all(lengths):
+            return None
+            
+        sounds = []
+        for length in lengths:
+            sounds.append(pygame.mixer.Sound(buffer=data[offset:offset + length]))
+            offset += length
+        return sounds
+        
+    @staticmethod
+    def _build_bank(path, steps, pitches):
+        """Resample a stretch of the engine recording into seamless loops at rising pitches"""
+        if numpy is None:
+            raise ImportError("Building the engine pitch bank requires NumPy (pip install numpy)")
+        import pygame.sndarray
+        
+        source = pygame.sndarray.array(pygame.mixer.Sound(path))
+        dtype = source.dtype
+        frequency = pygame.mixer.get_init()[0]
+        loop = int(ENGINE_LOOP_SECONDS * frequency)
+        fade = int(ENGINE_LOOP_FADE_SECONDS * frequency)
+        
+        # A stretch from the middle of the recording, skipping any start-up or tail
+        start = max(0, (len(source) - loop - fade) // 2)
+        stretch = source[start:start + loop + fade].astype(numpy.float32)
+        stretch = stretch.reshape(len(stretch), -1)
+        limits = numpy.iinfo(dtype) if numpy.issubdtype(dtype, numpy.integer) else None
+        
+        sounds = []
+        for ratio in numpy.geomspace(pitches[0], pitches[1], steps):
+            # Reading the stretch ratio times faster raises the pitch by ratio
+            times = numpy.arange(0, len(stretch) - 1, ratio)
+            resampled = numpy.stack([numpy.interp(times, numpy.arange(len(stretch)), stretch[:, channel])
+                                     for channel in range(stretch.shape[1])], axis=1)
+                                     
+            # Blend the tail into the head so the loop wraps without a click
+            tail = max(1, int(fade / ratio))
+            looped = resampled[:-tail].copy()
+            ramp = numpy.linspace(0.0, 1.0, tail, dtype=numpy.float32)[:, None]
+            looped[:tail] = resampled[-tail:] * (1.0 - ramp) + looped[:tail] * ramp
+            
+            if limits is not None:
+                numpy.clip(looped, limits.min, limits.max, out=looped)
+            samples = numpy.ascontiguousarray(looped.astype(dtype).reshape((len(looped),) + source.shape[1:]))
+            sounds.append(pygame.sndarray.make_sound(samples))
+        return sounds
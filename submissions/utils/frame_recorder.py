@@ -0,0 +1,215 @@
+"""
+Frame Recorder
+Captures rendered frames and writes them on a background thread,
+either into a memory-mapped ring file or piped into a local encoder process.
+The game thread only scales each recorded frame into a pooled surface; the
+writer thread converts it to RGB bytes.
+"""
+
+import mmap
+import os
+import queue
+import struct
+import subprocess
+import threading
+import time
+import pygame
+from config import *
+
+
+# Ring file layout: header, then fixed-size slots of (frame number, RGB pixels)
+RING_MAGIC = b'F1RING01'
+RING_HEADER = struct.Struct('<8sIIIQ')   # magic, width, height, capacity, frames written
+RING_SLOT_HEADER = struct.Struct('<Q')   # frame number
+
+
+class FrameRecorder:
+    """Hands captured frames to a background writer through a bounded queue"""
+    
+    def __init__(self, size, path, mode='ring', queue_size=RECORDING_QUEUE_SIZE,
+                 ring_frames=RECORDING_RING_FRAMES, encoder_command=None,
+                 scale=RECORDING_SCALE, frame_step=RECORDING_FRAME_STEP):
+        # Frames are recorded at scale times the screen size, every frame_step-th frame
+        self.width = max(1, int(size[0] * scale))
+        self.height = max(1, int(size[1] * scale))
+        self.path = path
+        self.mode = mode
+        self.ring_frames = ring_frames
+        self.encoder_command = encoder_command
+        self.frame_step = frame_step
+        self.frame_bytes = self.width * self.height * 3
+        
+        # Surfaces the game thread copies frames into, recycled by the writer;
+        # when all of them are waiting for the writer, new frames are dropped
+        self.queue_size = queue_size
+        self._free = queue.Queue()
+        self._pooled = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        
+        # Statistics (written by the game thread except frames_written)
+        self.frames_seen = 0
+        self.frames_dropped = 0
+        self.frames_written = 0
+        self.max_queue_depth = 0
+        
+    def start(self):
+        """Open the output and start the writer thread"""
+        if self.mode == 'ring':
+            sink = self._open_ring()
+        elif self.mode == 'encoder':
+            sink = self._open_encoder()
+        else:
+            raise ValueError(f"Unknown recording mode: {self.mode}")
+            
+        self._thread = threading.Thread(target=self._run, args=(sink,),
+                                        name="frame-recorder", daemon=True)
+        self._thread.start()
+        
+    def capture(self, surface):
+        """
+        Queue a scaled copy of the surface without ever blocking
+        The frame is dropped (and counted) when the writer falls behind
+        """
+        self.frames_seen += 1
+        if (self.frames_seen - 1) % self.frame_step:
+            return
+        try:
+            frame = self._free.get_nowait()
+        except queue.Empty:
+            if self._pooled == self.queue_size:
+                self.frames_dropped += 1
+                return
+            # Same pixel format as the screen, so the copy is a plain blit or scale
+            frame = pygame.Surface((self.width, self.height), 0, surface)
+            self._pooled += 1
+            
+        if frame.get_size() == surface.get_size():
+            frame.blit(surface, (0, 0))
+        else:
+            pygame.transform.scale(surface, (self.width, self.height), frame)
+        self._queue.put_nowait((self.frames_seen, frame))
+        
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+            
+    def stats(self):
+        """Get recording counters"""
+        return {
+            'seen': self.frames_seen,
+            'written': self.frames_written,
+            'dropped': self.frames_dropped,
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+        }
+        
+    def stop(self):
+        """Flush queued frames, close the output and report statistics"""
+        if self._thread is None:
+            return self.stats()
+            
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        
+        stats = self.stats()
+        print(f"Recording saved to {self.path}: {stats['written']} frames written, "
+              f"{stats['dropped']} dropped, max queue depth {stats['max_queue_depth']}")
+        return stats
+        
+    def _open_ring(self):
+        """Create the ring file and map it into memory"""
+        slot_size = RING_SLOT_HEADER.size + self.frame_bytes
+        file_size = RING_HEADER.size + slot_size * self.ring_frames
+        
+        with open(self.path, 'wb') as f:
+            f.truncate(file_size)
+        f = open(self.path, 'r+b')
+        ring = mmap.mmap(f.fileno(), file_size)
+        f.close()
+        
+        RING_HEADER.pack_into(ring, 0, RING_MAGIC, self.width, self.height, self.ring_frames, 0)
+        return ring
+        
+    def _open_encoder(self):
+        """Start the encoder process reading raw RGB frames from stdin"""
+        command = self.encoder_command or [
+            'ffmpeg', '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-s', f'{self.width}x{self.height}', '-r', f'{FPS / self.frame_step:g}',
+            '-i', '-', '-pix_fmt', 'yuv420p', self.path,
+        ]
+        return subprocess.Popen(command, stdin=subprocess.PIPE)
+        
+    def _run(self, sink):
+        """Writer thread: drain the queue into the ring file or encoder"""
+        slot_size = RING_SLOT_HEADER.size + self.frame_bytes
+        
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            frame_number, frame = item
+            pixels = pygame.image.tobytes(frame, 'RGB')
+            self._free.put(frame)
+            
+            if self.mode == 'ring':
+                offset = RING_HEADER.size + (self.frames_written % self.ring_frames) * slot_size
+                RING_SLOT_HEADER.pack_into(sink, offset, frame_number)
+                sink[offset + RING_SLOT_HEADER.size:offset + slot_size] = pixels
+            else:
+                try:
+                    sink.stdin.write(pixels)
+                except (BrokenPipeError, OSError):
+                    print("Recording encoder exited early, stopping recording")
+                    break
+                    
+            self.frames_written += 1
+            
+        if self.mode == 'ring':
+            RING_HEADER.pack_into(sink, 0, RING_MAGIC, self.width, self.height,
+                                  self.ring_frames, self.frames_written)
+            sink.flush()
+            sink.close()
+        else:
+            if not sink.stdin.closed:
+                try:
+                    sink.stdin.close()
+                except OSError:
+                    pass
+            sink.wait()
+
+
+def read_ring(path):
+    """
+    Read a ring file back as a list of (frame number, surface), oldest first
+    Useful for turning a recording into a clip after the session
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+        
+    magic, width, height, capacity, written = RING_HEADER.unpack_from(data, 0)
+    if magic != RING_MAGIC:
+        raise ValueError(f"{path} is not a frame ring file")
+        
+    frame_bytes = width * height * 3
+    slot_size = RING_SLOT_HEADER.size + frame_bytes
+    count = min(written, capacity)
+    first = written - count
+    
+    frames = []
+    for i in range(first, written):
+        offset = RING_HEADER.size + (i % capacity) * slot_size
+        (frame_number,) = RING_SLOT_HEADER.unpack_from(data, offset)
+        start = offset + RING_SLOT_HEADER.size
+        surface = pygame.image.frombytes(data[start:start + frame_bytes], (width, height), 'RGB')
+        frames.append((frame_number, surface))
+    return frames
+
+
+def default_recording_path(mode):
+    """Build a timestamped output path inside RECORDING_DIR"""
+    os.makedirs(RECORDING_DIR, exist_ok=True)
+    extension = 'ring' if mode == 'ring' else 'mp4'
+    return os.path.join(RECORDING_DIR, time.strftime(f'session_%Y%m%d_%H%M%S.{extension}'))
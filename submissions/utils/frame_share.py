@@ -0,0 +1,220 @@
+"""
+Shared Frame Buffer
+Publishes each rendered frame into shared memory so local viewers can mirror
+the game without the game process encoding anything
+
+Run `python -m utils.frame_share` on the same machine to open a mirror window.
+"""
+
+import os
+import struct
+from multiprocessing import resource_tracker, shared_memory
+import pygame
+from config import *
+
+
+# Header: magic, sequence (seqlock), frame number, width, height, pitch,
+# bytes per pixel, the R/G/B masks describing the pixel layout and the writer's pid
+FRAME_MAGIC = b'F1FRAME2'
+FRAME_HEADER = struct.Struct('<8sQQIIIIIIII')
+SEQUENCE_OFFSET = 8
+
+
+def _attach(name):
+    """Open an existing block without taking over its cleanup"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching also registers the block for cleanup,
+        # which would unlink it under the game when the viewer exits
+        block = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(block._name, 'shared_memory')
+        return block
+
+
+def _process_alive(pid):
+    """True if a process with this pid exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedFrameBuffer:
+    """Writer side: copies the display surface's pixels into shared memory"""
+    
+    def __init__(self, surface, name=SHARED_FRAME_NAME):
+        # Sized from the pitch, so rows padded past width * bytes per pixel still fit
+        self.name = name
+        self.capacity = surface.get_pitch() * surface.get_height()
+        self.sequence = 0
+        self.frame_number = 0
+        self._warned = False
+        
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True,
+                                                   size=FRAME_HEADER.size + self.capacity)
+        except FileExistsError:
+            self._reclaim(name)
+            self._shm = shared_memory.SharedMemory(name=name, create=True,
+                                                   size=FRAME_HEADER.size + self.capacity)
+                                                   
+        FRAME_HEADER.pack_into(self._shm.buf, 0, FRAME_MAGIC, 0, 0, 0, 0, 0, 0, 0, 0, 0, os.getpid())
+        
+    @staticmethod
+    def _reclaim(name):
+        """Remove a block left by a crashed game, refusing one that another game still owns"""
+        # Opened like the owner would, so unlink() keeps the resource tracker balanced
+        existing = shared_memory.SharedMemory(name=name)
+        unlinked = False
+        try:
+            header = FRAME_HEADER.unpack_from(existing.buf, 0) if existing.size >= FRAME_HEADER.size else None
+            if header is None or header[0] != FRAME_MAGIC:
+                raise FileExistsError(f"Shared memory block {name!r} exists and is not a frame buffer; "
+                                      f"set SHARED_FRAME_NAME to another name")
+            owner = header[-1]
+            if _process_alive(owner):
+                raise FileExistsError(f"Shared frame buffer {name!r} is in use by process {owner}; "
+                                      f"set SHARED_FRAME_NAME to another name")
+            # The game that wrote it has exited without removing it
+            existing.unlink()
+            unlinked = True
+        finally:
+            existing.close()
+            if not unlinked:
+                resource_tracker.unregister(existing._name, 'shared_memory')
+                
+    def publish(self, surface):
+        """Copy one frame straight from the surface's pixel buffer"""
+        width, height = surface.get_size()
+        pitch = surface.get_pitch()
+        size = pitch * height
+        if size > self.capacity:
+            if not self._warned:
+                print(f"Frame of {size} bytes does not fit the {self.capacity}-byte shared frame buffer, "
+                      f"not publishing")
+                self._warned = True
+            return False
+            
+        buf = self._shm.buf
+        self.frame_number += 1
+        
+        # Odd sequence marks the frame as being written
+        self.sequence += 1
+        struct.pack_into('<Q', buf, SEQUENCE_OFFSET, self.sequence)
+        
+        pixels = surface.get_buffer()
+        buf[FRAME_HEADER.size:FRAME_HEADER.size + size] = pixels
+        del pixels
+        
+        masks = surface.get_masks()
+        self.sequence += 1
+        FRAME_HEADER.pack_into(buf, 0, FRAME_MAGIC, self.sequence, self.frame_number,
+                               width, height, pitch, surface.get_bytesize(),
+                               masks[0], masks[1], masks[2], os.getpid())
+        return True
+        
+    def close(self):
+        """Release and remove the shared memory block"""
+        self._shm.close()
+        self._shm.unlink()
+
+
+class SharedFrameReader:
+    """Reader side: attaches to a published buffer and reads consistent frames"""
+    
+    def __init__(self, name=SHARED_FRAME_NAME):
+        self._shm = _attach(name)
+        self.last_frame_number = 0
+        
+    def header(self):
+        """Get (sequence, frame number, width, height, pitch, bytes per pixel, masks)"""
+        magic, sequence, frame_number, width, height, pitch, bytesize, *masks, _ = \
+            FRAME_HEADER.unpack_from(self._shm.buf, 0)
+        if magic != FRAME_MAGIC:
+            raise ValueError("Shared memory block is not a frame buffer")
+        return sequence, frame_number, width, height, pitch, bytesize, tuple(masks)
+        
+    def view(self):
+        """
+        Get a zero-copy view of the latest frame with its header
+        The writer may overwrite it at any time; check is_current(sequence)
+        after using the pixels to know whether they were torn.
+        """
+        header = self.header()
+        sequence, _, _, height, pitch = header[:5]
+        if sequence % 2:
+            return None
+        return header, self._shm.buf[FRAME_HEADER.size:FRAME_HEADER.size + pitch * height]
+        
+    def is_current(self, sequence):
+        """Check the writer has not touched the frame since sequence was read"""
+        (current,) = struct.unpack_from('<Q', self._shm.buf, SEQUENCE_OFFSET)
+        return current == sequence
+        
+    def read(self, retries=100):
+        """Copy out the latest complete frame, retrying while the writer is mid-frame"""
+        for _ in range(retries):
+            frame = self.view()
+            if frame is None:
+                continue
+            header, pixels = frame
+            data = bytes(pixels)
+            pixels.release()
+            if self.is_current(header[0]):
+                self.last_frame_number = header[1]
+                return header, data
+        return None
+        
+    def to_surface(self, header, data):
+        """Build a surface from a frame returned by read()"""
+        _, _, width, height, pitch, bytesize, masks = header
+        surface = pygame.Surface((width, height), 0, bytesize * 8, masks + (0,))
+        target = surface.get_buffer()
+        if surface.get_pitch() == pitch:
+            target.write(data, 0)
+        else:
+            row_bytes = width * bytesize
+            for row in range(height):
+                start = row * pitch
+                target.write(data[start:start + row_bytes], row * surface.get_pitch())
+        del target
+        return surface
+        
+    def close(self):
+        """Detach from the shared memory block"""
+        self._shm.close()
+
+
+def run_viewer(name=SHARED_FRAME_NAME):
+    """Mirror the published frames in a window until closed"""
+    pygame.init()
+    reader = SharedFrameReader(name)
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption(f"{TITLE} - Spectator")
+    clock = pygame.time.Clock()
+    
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+                
+        frame = reader.read()
+        if frame and frame[0][1] != 0:
+            surface = reader.to_surface(*frame)
+            if surface.get_size() != screen.get_size():
+                surface = pygame.transform.scale(surface, screen.get_size())
+            screen.blit(surface, (0, 0))
+            pygame.display.flip()
+        clock.tick(FPS)
+        
+    reader.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    run_viewer()
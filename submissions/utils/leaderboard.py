@@ -0,0 +1,275 @@
+"""
+Leaderboard Client and Server
+Asyncio leaderboard that never blocks the pygame loop: the client runs its own
+event loop on a background thread, batching submissions over one reused connection
+
+Run `python -m utils.leaderboard` to start a local server for a single venue.
+Protocol: one JSON object per line in each direction.
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import socket
+import threading
+import time
+from config import *
+from utils.score_store import validate_run
+
+
+class LeaderboardClient:
+    """Background leaderboard client with retries, batching and a cached top list"""
+    
+    def __init__(self, host=LEADERBOARD_HOST, port=LEADERBOARD_PORT, kiosk_id=None):
+        self.host = host
+        self.port = port
+        self.kiosk_id = kiosk_id or socket.gethostname()
+        
+        # Latest top list, replaced wholesale so the game thread can read it freely
+        self.cached_top = []
+        self.connected = False
+        
+        self._loop = asyncio.new_event_loop()
+        self._thread = None
+        self._ready = threading.Event()
+        self._pending = None
+        self._reader = None
+        self._writer = None
+        self._io_lock = None
+        self._tasks = []
+        
+    def start(self):
+        """Start the client's event loop thread"""
+        self._thread = threading.Thread(target=self._run_loop, name="leaderboard", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+        
+    def submit(self, score):
+        """Queue a finished run for submission; safe to call from the game thread"""
+        # Checked here as well, so a run the server refuses is never queued
+        score, when, kiosk = validate_run(score, time.time(), self.kiosk_id)
+        entry = {'score': score, 'kiosk': kiosk, 'time': when}
+        self._loop.call_soon_threadsafe(self._pending.put_nowait, entry)
+        
+    def refresh(self):
+        """Ask for a fresh top list in the background"""
+        asyncio.run_coroutine_threadsafe(self._refresh_top(), self._loop)
+        
+    def stop(self, timeout=2.0):
+        """Try to flush pending submissions, then stop the event loop"""
+        if self._thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(timeout), self._loop)
+        try:
+            future.result(timeout + 1.0)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+        
+    def _run_loop(self):
+        """Event loop thread body"""
+        asyncio.set_event_loop(self._loop)
+        self._pending = asyncio.Queue()
+        self._io_lock = asyncio.Lock()
+        self._tasks = [self._loop.create_task(self._send_batches()),
+                       self._loop.create_task(self._refresh_periodically())]
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+        
+    async def _request(self, message):
+        """Send one request over the shared connection, reconnecting and retrying on failure"""
+        delay = LEADERBOARD_RETRY_DELAY
+        for attempt in range(LEADERBOARD_RETRIES):
+            try:
+                async with self._io_lock:
+                    if self._writer is None:
+                        self._reader, self._writer = await asyncio.wait_for(
+                            asyncio.open_connection(self.host, self.port), LEADERBOARD_TIMEOUT)
+                        self.connected = True
+                        
+                    self._writer.write(json.dumps(message).encode('utf-8') + b'\n')
+                    await self._writer.drain()
+                    line = await asyncio.wait_for(self._reader.readline(), LEADERBOARD_TIMEOUT)
+                    if not line:
+                        raise ConnectionError("Leaderboard server closed the connection")
+                    return json.loads(line)
+            except (OSError, asyncio.TimeoutError, ConnectionError, ValueError):
+                self._drop_connection()
+                if attempt + 1 < LEADERBOARD_RETRIES:
+                    await asyncio.sleep(delay)
+                    delay *= 2
+        return None
+        
+    def _drop_connection(self):
+        """Forget a broken connection so the next request reconnects"""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        self.connected = False
+        
+    async def _send_batches(self):
+        """Collect queued runs and send them together"""
+        while True:
+            batch = [await self._pending.get()]
+            while not self._pending.empty() and len(batch) < LEADERBOARD_BATCH_SIZE:
+                batch.append(self._pending.get_nowait())
+                
+            try:
+                response = await self._request({'op': 'submit', 'scores': batch})
+            except asyncio.CancelledError:
+                # Shutting down: leave the batch for the final flush
+                for entry in batch:
+                    self._pending.put_nowait(entry)
+                raise
+                
+            if response is None or not response.get('ok'):
+                # Server unreachable or refused the batch: keep the runs and try again later
+                if response is not None:
+                    print(f"Leaderboard refused {len(batch)} runs: {response.get('error')}")
+                for entry in batch:
+                    self._pending.put_nowait(entry)
+                await asyncio.sleep(LEADERBOARD_REFRESH_INTERVAL)
+                continue
+                
+            if 'top' in response:
+                self.cached_top = response['top']
+                
+    async def _refresh_top(self):
+        """Fetch the top list into the cache"""
+        response = await self._request({'op': 'top', 'n': LEADERBOARD_SIZE})
+        if response and 'top' in response:
+            self.cached_top = response['top']
+            
+    async def _refresh_periodically(self):
+        """Keep the cached top list fresh while the game runs"""
+        while True:
+            await self._refresh_top()
+            await asyncio.sleep(LEADERBOARD_REFRESH_INTERVAL)
+            
+    async def _shutdown(self, timeout):
+        """Stop the background tasks, send whatever is still queued and close the connection"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        
+        batch = []
+        while not self._pending.empty():
+            batch.append(self._pending.get_nowait())
+        if batch:
+            try:
+                response = await asyncio.wait_for(self._request({'op': 'submit', 'scores': batch}), timeout)
+            except asyncio.TimeoutError:
+                response = None
+            if response is None:
+                print(f"Leaderboard unreachable, {len(batch)} runs not submitted")
+            elif not response.get('ok'):
+                print(f"Leaderboard refused {len(batch)} runs: {response.get('error')}")
+        self._drop_connection()
+
+
+class LeaderboardServer:
+    """Small asyncio leaderboard server for tests and single-venue use"""
+    
+    def __init__(self, host=LEADERBOARD_HOST, port=LEADERBOARD_PORT, score_store=None):
+        self.host = host
+        self.port = port
+        self.score_store = score_store
+        self.max_entries = SCORE_INDEX_SIZE
+        
+        # Sorted (-score, time, kiosk) tuples, best first
+        self._top = []
+        if score_store:
+            self._top = [(-score, when, kiosk) for score, when, kiosk in score_store.top(self.max_entries)]
+        self._server = None
+        
+    async def start(self):
+        """Start listening; returns once the socket is bound"""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+        
+    async def serve_forever(self):
+        """Serve until cancelled"""
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+            
+    async def close(self):
+        """Stop accepting clients"""
+        self._server.close()
+        await self._server.wait_closed()
+        
+    def top(self, n):
+        """Get the n best runs"""
+        return [{'score': -neg_score, 'time': when, 'kiosk': kiosk}
+                for neg_score, when, kiosk in self._top[:n]]
+                
+    def add(self, score, when, kiosk):
+        """Record one run"""
+        entry = (-score, when, kiosk)
+        if len(self._top) >= self.max_entries:
+            if entry >= self._top[-1]:
+                return
+            self._top.pop()
+        bisect.insort(self._top, entry)
+        
+    async def _handle_client(self, reader, writer):
+        """Serve requests from one kiosk until it disconnects"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = self._handle_request(json.loads(line))
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {'ok': False, 'error': str(error)}
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            
+    def _handle_request(self, request):
+        """Answer one decoded request"""
+        if request['op'] == 'submit':
+            # Check every run first, so a batch is recorded whole or not at all
+            runs = [validate_run(entry['score'], entry['time'], entry['kiosk']) for entry in request['scores']]
+            for score, when, kiosk in runs:
+                if self.score_store:
+                    self.score_store.record(score, when, kiosk)
+                self.add(score, when, kiosk)
+            return {'ok': True, 'top': self.top(LEADERBOARD_SIZE)}
+        if request['op'] == 'top':
+            return {'ok': True, 'top': self.top(int(request.get('n', LEADERBOARD_SIZE)))}
+        return {'ok': False, 'error': f"Unknown op {request['op']!r}"}
+
+
+def main():
+    """Run a local leaderboard server backed by the score store"""
+    from utils.score_store import ScoreStore
+    
+    parser = argparse.ArgumentParser(description="F1 Racing leaderboard server")
+    parser.add_argument('--host', default=LEADERBOARD_HOST)
+    parser.add_argument('--port', type=int, default=LEADERBOARD_PORT)
+    parser.add_argument('--scores', default=SCORE_STORE_DIR, help="score store directory")
+    args = parser.parse_args()
+    
+    store = ScoreStore(args.scores, kiosk_id="leaderboard").load()
+    server = LeaderboardServer(args.host, args.port, store)
+    print(f"Leaderboard listening on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Session Profiler
+Profiles chosen frames of a game session with cProfile or a low-overhead sampler
+and writes pstats plus collapsed stacks (flamegraph.pl / speedscope input)
+
+The sampler uses a CPU-time interval timer (SIGPROF) where the platform has one:
+the handler runs on the game thread right after the current C call returns, so
+time spent inside pygame is charged to the Python line that called it. Elsewhere
+a background thread samples the game thread's stack instead.
+"""
+
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from config import *
+
+
+# Source files (or 'file:function') per subsystem; a stack belongs to the innermost
+# frame that matches, and the first subsystem listed wins, so 'render' goes last to
+# take only the renderer code that draws no particular subsystem
+SUBSYSTEMS = (
+    ('road', ('game/road.py', 'game/track.py', 'game/scenery.py',
+              'render_queue.py:blit_road', 'texture_renderer.py:draw_road',
+              'texture_renderer.py:_track_texture')),
+    ('cars', ('cars/', 'game/traffic.py', 'render_queue.py:blit_cars', 'texture_renderer.py:draw_car')),
+    ('particles', ('game/particle_effects.py', 'render_queue.py:blit_particles',
+                   'texture_renderer.py:draw_particles')),
+    ('hud', ('ui/hud.py', 'ui/debug_overlay.py', 'ui/glyph_atlas.py', 'render_queue.py:blit_hud')),
+    ('collision', ('utils/collision.py',)),
+    ('snapshot', ('game/snapshot.py',)),
+    ('render', ('game/render_queue.py', 'game/layer_renderer.py', 'game/texture_renderer.py',
+                'main.py:present')),
+)
+
+
+_subsystem_cache = {}
+
+
+def subsystem_of(filename, function=''):
+    """Subsystem name for a function in a source file, or None"""
+    key = (filename, function)
+    if key not in _subsystem_cache:
+        name = f"{filename.replace(os.sep, '/')}:{function}"
+        _subsystem_cache[key] = next((subsystem for subsystem, parts in SUBSYSTEMS
+                                      if any(part in name for part in parts)), None)
+    return _subsystem_cache[key]
+
+
+def parse_frame_range(text):
+    """Parse 'START:END' (either side optional) into a (start, end) tuple"""
+    start, _, end = text.partition(':')
+    return int(start) if start else 0, int(end) if end else None
+
+
+def default_profile_path(mode):
+    """Build a timestamped output prefix inside PROFILE_DIR"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return os.path.join(PROFILE_DIR, time.strftime(f'session_%Y%m%d_%H%M%S_{mode}'))
+
+
+class SessionProfiler:
+    """
+    Profiles only the frames that fall inside the chosen states and frame range
+    Writes <prefix>.prof (cProfile mode), <prefix>.folded and a subsystem summary
+    """
+    
+    def __init__(self, mode='cprofile', states=None, frames=(0, None), prefix=None,
+                 interval=PROFILE_SAMPLE_INTERVAL):
+        if mode not in ('cprofile', 'sample'):
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        self.mode = mode
+        self.states = set(states) if states else None
+        self.first_frame, self.last_frame = frames
+        self.prefix = prefix or default_profile_path(mode)
+        self.interval = interval
+        self.frames_profiled = 0
+        
+        self._profile = cProfile.Profile() if mode == 'cprofile' else None
+        self._use_timer = mode == 'sample' and hasattr(signal, 'setitimer')
+        
+        # Stack (tuple of code objects, leaf first) -> CPU microseconds
+        self._samples = Counter()
+        self._last_sample = 0.0
+        self._active = False
+        self._finished = False
+        self._thread = None
+        self._stop = threading.Event()
+        self._target = None
+        
+    def start(self):
+        """Install the sampler (sample mode); profiling still waits for selected frames"""
+        if self._use_timer:
+            # The timer only runs while the process uses CPU, so idle waits barely see it
+            signal.signal(signal.SIGPROF, self._on_timer)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        elif self.mode == 'sample':
+            self._target = threading.get_ident()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+        return self
+        
+    def begin_frame(self, frame_number, state):
+        """Start profiling this frame if it is selected; returns True when it is"""
+        if self._finished:
+            return False
+        if self.last_frame is not None and frame_number >= self.last_frame:
+            self.finish()
+            return False
+        if frame_number < self.first_frame or (self.states and state not in self.states):
+            return False
+            
+        self.frames_profiled += 1
+        self._active = True
+        if self._profile:
+            self._profile.enable()
+        self._last_sample = time.process_time()
+        return True
+        
+    def end_frame(self):
+        """Stop profiling until the next selected frame"""
+        self._active = False
+        if self._profile:
+            self._profile.disable()
+            
+    def finish(self):
+        """Stop profiling and write the results (safe to call more than once)"""
+        if self._finished:
+            return
+        self.end_frame()
+        self._finished = True
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+        if self._use_timer:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+            
+        if self._profile:
+            self._profile.dump_stats(f"{self.prefix}.prof")
+            stacks = self._stacks_from_stats()
+        else:
+            stacks = self._stacks_from_samples()
+            
+        with open(f"{self.prefix}.folded", 'w') as f:
+            for stack, value in sorted(stacks.items()):
+                f.write(f"{stack} {value}\n")
+                
+        print(f"Profiled {self.frames_profiled} frames, results in {self.prefix}.*")
+        self._print_summary(stacks)
+        
+    def _record(self, frame, weight):
+        """Add one sampled stack"""
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        self._samples[tuple(codes)] += weight
+        
+    def _on_timer(self, signum, frame):
+        """SIGPROF handler: charge the CPU time since the last sample to this stack"""
+        if not self._active:
+            return
+        now = time.process_time()
+        self._record(frame, int((now - self._last_sample) * 1e6))
+        self._last_sample = now
+        
+    def _run(self):
+        """
+        Sampler thread fallback: record the game thread's stack every interval
+        Samples can only land where the game thread releases the GIL, so this is coarser
+        """
+        weight = int(self.interval * 1e6)
+        while not self._stop.wait(self.interval):
+            if self._active:
+                self._record(sys._current_frames().get(self._target), weight)
+                
+    def _stacks_from_samples(self):
+        """Collapsed stacks (root first, subsystem as the root frame) weighted by CPU microseconds"""
+        stacks = Counter()
+        for codes, count in self._samples.items():
+            subsystem = next((subsystem_of(code.co_filename, code.co_name) for code in codes
+                              if subsystem_of(code.co_filename, code.co_name)), 'other')
+            labels = [f"{os.path.basename(code.co_filename)}:{code.co_name}"
+                      for code in reversed(codes)]
+            stacks[';'.join([subsystem] + labels)] += count
+        return stacks
+        
+    def _stacks_from_stats(self):
+        """
+        Collapsed caller;callee pairs from the cProfile call graph, weighted by
+        own time in microseconds (cProfile keeps one level of callers, not full stacks)
+        """
+        stacks = Counter()
+        for function, (_, _, _, _, callers) in pstats.Stats(self._profile).stats.items():
+            for caller, (_, _, own_time, _) in callers.items():
+                subsystem = (subsystem_of(function[0], function[2]) or subsystem_of(caller[0], caller[2])
+                             or 'other')
+                stack = f"{subsystem};{self._label(caller)};{self._label(function)}"
+                stacks[stack] += int(own_time * 1e6)
+        return stacks
+        
+    @staticmethod
+    def _label(function):
+        """Readable name for a pstats function key"""
+        filename, line, name = function
+        if filename == '~':
+            return name
+        return f"{os.path.basename(filename)}:{name}"
+        
+    def _print_summary(self, stacks):
+        """Print the share of profiled time spent in each subsystem"""
+        totals = Counter()
+        for stack, value in stacks.items():
+            totals[stack.split(';', 1)[0]] += value
+        grand_total = sum(totals.values()) or 1
+        for subsystem, value in totals.most_common():
+            print(f"  {subsystem:<10} {value * 100 / grand_total:5.1f}%")
@@ -0,0 +1,260 @@
+"""
+Score Store
+Persistent high scores: an append-only run log per kiosk plus a compacted
+top-score index, written in batches on a background thread
+"""
+
+import bisect
+import math
+import os
+import queue
+import re
+import socket
+import struct
+import threading
+import time
+from config import *
+
+
+# One fixed-size record per finished run: score, unix time
+LOG_RECORD = struct.Struct('<Id')
+
+# Index layout: header, then (name, bytes consumed) per kiosk log, then the top entries
+INDEX_MAGIC = b'F1SCORE1'
+INDEX_HEADER = struct.Struct('<8sQII')    # magic, total runs, log count, entry count
+INDEX_LOG = struct.Struct('<HQ')          # name length, bytes consumed
+INDEX_ENTRY = struct.Struct('<IdH')       # score, unix time, log number
+
+# Largest score a record holds, and the kiosk ids allowed (they name the log files)
+MAX_SCORE = 2 ** 32 - 1
+KIOSK_ID_PATTERN = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]{0,127}')
+
+
+def validate_run(score, when, kiosk):
+    """Check a run before it is queued; returns (score, when, kiosk) or raises ValueError"""
+    if isinstance(score, bool) or not isinstance(score, int) or not 0 <= score <= MAX_SCORE:
+        raise ValueError(f"Invalid score {score!r}")
+    if isinstance(when, bool) or not isinstance(when, (int, float)) or not math.isfinite(when):
+        raise ValueError(f"Invalid run time {when!r}")
+    if not isinstance(kiosk, str) or not KIOSK_ID_PATTERN.fullmatch(kiosk):
+        raise ValueError(f"Invalid kiosk id {kiosk!r}")
+    return score, float(when), kiosk
+
+
+class ScoreStore:
+    """High-score store shared by every kiosk pointed at the same directory"""
+    
+    def __init__(self, directory=SCORE_STORE_DIR, kiosk_id=None, index_size=SCORE_INDEX_SIZE):
+        self.directory = directory
+        self.kiosk_id = kiosk_id or socket.gethostname()
+        if not KIOSK_ID_PATTERN.fullmatch(self.kiosk_id):
+            raise ValueError(f"Invalid kiosk id {self.kiosk_id!r}")
+        self.index_size = index_size
+        self.index_path = os.path.join(directory, SCORE_INDEX_FILE)
+        self.log_path = os.path.join(directory, f"{self.kiosk_id}.log")
+        
+        # Top entries as sorted (-score, time, kiosk) tuples, best first
+        self._top = []
+        self._log_offsets = {}
+        self.total_runs = 0
+        self._lock = threading.Lock()
+        
+        self._queue = queue.Queue()
+        self._thread = None
+        self._unindexed = 0
+        
+    def load(self):
+        """Load the compacted index, then replay only the log tails it has not seen"""
+        os.makedirs(self.directory, exist_ok=True)
+        self._read_index()
+        self.refresh(include_own=True)
+        
+        self._thread = threading.Thread(target=self._run, name="score-store", daemon=True)
+        self._thread.start()
+        return self
+        
+    def refresh(self, include_own=False):
+        """Pick up runs other kiosks have appended; the writer thread calls this periodically"""
+        for name in os.listdir(self.directory):
+            if name.endswith('.log') and (include_own or name[:-4] != self.kiosk_id):
+                self._read_log_tail(name[:-4])
+                
+    def record(self, score, when=None, kiosk=None):
+        """
+        Record a finished run; returns immediately, the write happens off-thread
+        when defaults to now and kiosk to this kiosk; runs relayed for another kiosk
+        go to that kiosk's log. The run shows up in best() and top() once flushed
+        Raises ValueError for a run the log cannot hold (see validate_run)
+        """
+        self._queue.put(validate_run(score, time.time() if when is None else when, kiosk or self.kiosk_id))
+        
+    def best(self):
+        """Get the best score on record"""
+        with self._lock:
+            return -self._top[0][0] if self._top else 0
+            
+    def top(self, n=10):
+        """Get the n best runs as (score, unix time, kiosk id), best first"""
+        with self._lock:
+            return [(-neg_score, when, kiosk) for neg_score, when, kiosk in self._top[:n]]
+            
+    def close(self):
+        """Flush pending writes and compact the index"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        
+    def _insert(self, score, when, kiosk):
+        """Insert into the bounded top list (caller holds the lock)"""
+        entry = (-score, when, kiosk)
+        if len(self._top) >= self.index_size:
+            if entry >= self._top[-1]:
+                return
+            self._top.pop()
+        bisect.insort(self._top, entry)
+        
+    def _read_index(self):
+        """Load the compacted index if one exists"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+            
+        magic, total_runs, log_count, entry_count = INDEX_HEADER.unpack_from(data, 0)
+        if magic != INDEX_MAGIC:
+            print(f"Ignoring unrecognised score index {self.index_path}")
+            return
+            
+        offset = INDEX_HEADER.size
+        names = []
+        for _ in range(log_count):
+            name_length, consumed = INDEX_LOG.unpack_from(data, offset)
+            offset += INDEX_LOG.size
+            name = data[offset:offset + name_length].decode('utf-8')
+            offset += name_length
+            names.append(name)
+            self._log_offsets[name] = consumed
+            
+        top = []
+        for score, when, log_number in INDEX_ENTRY.iter_unpack(
+                data[offset:offset + entry_count * INDEX_ENTRY.size]):
+            top.append((-score, when, names[log_number]))
+            
+        with self._lock:
+            self._top = sorted(top)[:self.index_size]
+            self.total_runs = total_runs
+            
+    def _read_log_tail(self, kiosk):
+        """Merge the records appended to one kiosk's log since its indexed offset"""
+        path = os.path.join(self.directory, f"{kiosk}.log")
+        start = self._log_offsets.get(kiosk, 0)
+        try:
+            with open(path, 'rb') as f:
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return
+            
+        # Ignore a partially written last record; it is picked up next time
+        usable = len(data) - len(data) % LOG_RECORD.size
+        with self._lock:
+            if self._log_offsets.get(kiosk, 0) != start:
+                return    # The writer thread merged these records meanwhile
+            for score, when in LOG_RECORD.iter_unpack(data[:usable]):
+                self._insert(score, when, kiosk)
+                self.total_runs += 1
+            self._log_offsets[kiosk] = start + usable
+            self._unindexed += usable // LOG_RECORD.size
+            
+    def _run(self):
+        """Writer thread: append batches to the kiosk logs and fsync once per log per batch"""
+        running = True
+        next_refresh = time.monotonic() + SCORE_REFRESH_INTERVAL
+        while running:
+            # Wait for runs, waking up in time to pick up the other kiosks' runs
+            try:
+                batch = [self._queue.get(timeout=max(0.0, next_refresh - time.monotonic()))]
+            except queue.Empty:
+                batch = []
+            deadline = time.monotonic() + SCORE_FLUSH_INTERVAL
+            while batch and batch[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+                    
+            if batch and batch[-1] is None:
+                batch.pop()
+                running = False
+                
+            # One failure must not stop persistence for the rest of the session
+            try:
+                if batch:
+                    self._append(batch)
+                if time.monotonic() >= next_refresh:
+                    self.refresh()
+                    next_refresh = time.monotonic() + SCORE_REFRESH_INTERVAL
+                if self._unindexed >= SCORE_COMPACT_EVERY or (not running and self._unindexed):
+                    self._compact()
+            except Exception as error:
+                print(f"Score store error: {error!r}")
+                
+    def _append(self, batch):
+        """Append records to each kiosk's log, one fsync per log; runs or logs that fail are skipped"""
+        runs = {}
+        for score, when, kiosk in batch:
+            try:
+                runs.setdefault(kiosk, []).append((score, when, LOG_RECORD.pack(score, when)))
+            except struct.error as error:
+                print(f"Score store skipped run {score!r} at {when!r}: {error}")
+        for kiosk, records in runs.items():
+            data = b''.join(record for _, _, record in records)
+            try:
+                with open(os.path.join(self.directory, f"{kiosk}.log"), 'ab') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except (OSError, ValueError) as error:
+                print(f"Score store could not save {len(records)} runs for {kiosk!r}: {error}")
+                continue
+            if kiosk != self.kiosk_id:
+                # Other kiosks may append to their own logs too: read the tail back
+                self._read_log_tail(kiosk)
+                continue
+            with self._lock:
+                for score, when, _ in records:
+                    self._insert(score, when, kiosk)
+                self.total_runs += len(records)
+                self._log_offsets[kiosk] = self._log_offsets.get(kiosk, 0) + len(data)
+                self._unindexed += len(records)
+                
+    def _compact(self):
+        """Write a fresh index covering everything read so far, replacing the old one atomically"""
+        with self._lock:
+            top = list(self._top)
+            total_runs = self.total_runs
+            logs = dict(self._log_offsets)
+            self._unindexed = 0
+        names = list(logs)
+        numbers = {name: i for i, name in enumerate(names)}
+        
+        parts = [INDEX_HEADER.pack(INDEX_MAGIC, total_runs, len(names), len(top))]
+        for name in names:
+            encoded = name.encode('utf-8')
+            parts.append(INDEX_LOG.pack(len(encoded), logs[name]))
+            parts.append(encoded)
+        for neg_score, when, kiosk in top:
+            parts.append(INDEX_ENTRY.pack(-neg_score, when, numbers[kiosk]))
+            
+        temp_path = f"{self.index_path}.{self.kiosk_id}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(b''.join(parts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.index_path)
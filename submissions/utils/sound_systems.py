@@ -1,17 +1,32 @@
 """
 Sound Manager
-Placeholder for future sound and music integration
+Game sounds and music: the engine note follows the car's speed (see engine_audio.py),
+the other effects are placeholders for future sound integration
 """
 
+import pygame
+from config import *
+from utils.engine_audio import EngineAudio
+
 
 class SoundManager:
     """
     Manages game sounds and music
-    Currently a placeholder - can be extended with pygame.mixer
+    Sound effects are still placeholders - can be extended with pygame.mixer
     """
     
-    def __init__(self):
+    def __init__(self, enabled=SOUND_ENABLED):
         self.enabled = False
+        
+        # Engine pitch bank, built (or read from its cache) once at startup
+        self.engine = None
+        if ENGINE_AUDIO:
+            try:
+                self.engine = EngineAudio()
+            except (pygame.error, ImportError, OSError) as e:
+                print(f"Engine audio unavailable: {e}")
+        if enabled:
+            self.toggle()
         # Future: Load sound effects here
         # self.collision_sound = pygame.mixer.Sound('assets/sounds/crash.wav')
         # self.boost_sound = pygame.mixer.Sound('assets/sounds/boost.wav')
@@ -22,38 +37,52 @@ class SoundManager:
         if self.enabled:
             # Future implementation
             pass
-    
+            
     def play_boost(self):
         """Play boost activation sound"""
         if self.enabled:
             # Future implementation
             pass
-    
+            
     def play_score(self):
         """Play score increase sound"""
         if self.enabled:
             # Future implementation
             pass
-    
+            
     def play_menu_music(self):
         """Play menu background music"""
         if self.enabled:
             # Future implementation
             pass
-    
+            
     def play_game_music(self):
         """Play game background music"""
         if self.enabled:
             # Future implementation
             pass
-    
+            
+    def update_engine(self, speed, boost_active):
+        """Match the engine note to the car (cheap enough to call every frame)"""
+        if self.engine:
+            self.engine.update(speed, boost_active)
+            
+    def silence_engine(self):
+        """Mute the engine note while the car is not driving"""
+        if self.engine:
+            self.engine.silence()
+            
     def stop_all(self):
         """Stop all sounds"""
-        if self.enabled:
-            # Future implementation
-            pass
-    
+        if self.engine:
+            self.engine.stop()
+            
     def toggle(self):
         """Toggle sound on/off"""
         self.enabled = not self.enabled
+        if self.engine:
+            if self.enabled:
+                self.engine.start()
+            else:
+                self.engine.stop()
         return self.enabled
@@ -0,0 +1,65 @@
+"""
+Sprite Cache
+Keeps pre-rendered sprites so drawing code runs once per look, not per frame,
+and the collision masks built from them
+"""
+
+import pygame
+
+
+class SpriteCache:
+    """Caches pre-rendered sprites per key and scale factor"""
+    
+    def __init__(self):
+        self._base = {}
+        self._scaled = {}
+        self._masks = {}
+        
+    def get(self, key, build, scale=(1.0, 1.0)):
+        """
+        Get the sprite for key at the given (x, y) scale
+        build() is only called the first time a key is requested
+        """
+        sprite = self._scaled.get((key, scale))
+        if sprite is None:
+            base = self._base.get(key)
+            if base is None:
+                base = build()
+                self._base[key] = base
+                
+            if scale == (1.0, 1.0):
+                sprite = base
+            else:
+                size = (max(1, round(base.get_width() * scale[0])),
+                        max(1, round(base.get_height() * scale[1])))
+                sprite = pygame.transform.smoothscale(base, size)
+            self._scaled[(key, scale)] = sprite
+        return sprite
+        
+    def mask(self, key, build):
+        """
+        Collision mask of the unscaled sprite for key, built once and shared by
+        every car with that look
+        """
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(self.get(key, build))
+            self._masks[key] = mask
+        return mask
+        
+    def drop_scale(self, scale):
+        """Drop the sprites built for one scale factor, e.g. after a resolution change"""
+        if scale == (1.0, 1.0):
+            return
+        for cache_key in [k for k in self._scaled if k[1] == scale]:
+            del self._scaled[cache_key]
+            
+    def clear(self):
+        """Drop all cached sprites and masks"""
+        self._base.clear()
+        self._scaled.clear()
+        self._masks.clear()
+
+
+# Shared by every renderer so each sprite is only built once
+sprite_cache = SpriteCache()
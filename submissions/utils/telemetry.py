@@ -0,0 +1,199 @@
+"""
+Telemetry Recorder
+Records per-frame gameplay values into preallocated column arrays. Full chunks of
+frames are handed to a background thread that appends them to a columnar session
+file, so the game thread never formats or writes anything. read_session() loads
+a session straight into NumPy arrays for analysis (where players crash, where
+frames drop).
+
+Run `python -m utils.telemetry <file>` for a quick summary of a session.
+"""
+
+import argparse
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from config import *
+
+try:
+    import numpy
+except ImportError:  # NumPy is only needed to read sessions back
+    numpy = None
+
+
+# Columns recorded every played frame: (name, array typecode)
+TELEMETRY_COLUMNS = (
+    ('frame', 'I'),
+    ('frame_ms', 'f'),
+    ('score', 'I'),
+    ('speed', 'f'),
+    ('boost_active', 'B'),
+    ('obstacles', 'H'),
+    ('particles', 'H'),
+    ('spawn_delay', 'f'),
+    ('player_x', 'f'),
+    ('crashed', 'B'),
+)
+
+# Session file: header, column table, then chunks of (row count, each column's values)
+TELEMETRY_MAGIC = b'F1TELE01'
+TELEMETRY_HEADER = struct.Struct('<8scH')    # magic, byte order ('<' or '>'), column count
+TELEMETRY_COLUMN = struct.Struct('<16sc')    # column name, typecode
+TELEMETRY_CHUNK = struct.Struct('<I')        # rows in the chunk
+
+
+class TelemetryRecorder:
+    """Fills column chunks on the game thread; a writer thread appends full ones to disk"""
+    
+    def __init__(self, path, chunk_frames=TELEMETRY_CHUNK_FRAMES, chunks=TELEMETRY_CHUNKS):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        
+        # Every chunk is one preallocated array per column, reused for the whole session
+        self._chunks = [[array(typecode, bytes(array(typecode).itemsize * chunk_frames))
+                         for _, typecode in TELEMETRY_COLUMNS]
+                        for _ in range(chunks)]
+        self._free = queue.SimpleQueue()
+        for index in range(1, chunks):
+            self._free.put(index)
+        self._full = queue.SimpleQueue()
+        self._chunk = 0
+        self._columns = self._chunks[0]
+        self._row = 0
+        self._thread = None
+        
+        # Statistics (written by the game thread except frames_written)
+        self.frames_seen = 0
+        self.frames_dropped = 0
+        self.frames_written = 0
+        
+    def start(self):
+        """Write the file header and start the writer thread"""
+        f = open(self.path, 'wb')
+        byte_order = b'<' if sys.byteorder == 'little' else b'>'
+        f.write(TELEMETRY_HEADER.pack(TELEMETRY_MAGIC, byte_order, len(TELEMETRY_COLUMNS)))
+        for name, typecode in TELEMETRY_COLUMNS:
+            f.write(TELEMETRY_COLUMN.pack(name.encode(), typecode.encode()))
+        self._thread = threading.Thread(target=self._run, args=(f,), name="telemetry", daemon=True)
+        self._thread.start()
+        return self
+        
+    def record(self, frame_ms, score, speed, boost_active, obstacles, particles, spawn_delay,
+               player_x, crashed):
+        """Store one frame's values (never blocks; the chunk is dropped if the writer is behind)"""
+        self.frames_seen += 1
+        row = self._row
+        columns = self._columns
+        columns[0][row] = self.frames_seen
+        columns[1][row] = frame_ms
+        columns[2][row] = score
+        columns[3][row] = speed
+        columns[4][row] = boost_active
+        columns[5][row] = obstacles
+        columns[6][row] = particles
+        columns[7][row] = spawn_delay
+        columns[8][row] = player_x
+        columns[9][row] = crashed
+        self._row = row + 1
+        if self._row == self.chunk_frames:
+            self._hand_off()
+            
+    def stop(self):
+        """Write out the partly filled chunk, wait for the writer and report statistics"""
+        if self._thread is None:
+            return
+        if self._row:
+            self._full.put((self._chunk, self._row))
+        self._full.put(None)
+        self._thread.join()
+        self._thread = None
+        print(f"Telemetry saved to {self.path}: {self.frames_written} frames written, "
+              f"{self.frames_dropped} dropped")
+              
+    def _hand_off(self):
+        """Queue the full chunk for writing and carry on in a free one"""
+        try:
+            chunk = self._free.get_nowait()
+        except queue.Empty:
+            # Writer is behind: overwrite this chunk rather than wait
+            self.frames_dropped += self._row
+            self._row = 0
+            return
+        self._full.put((self._chunk, self._row))
+        self._chunk = chunk
+        self._columns = self._chunks[chunk]
+        self._row = 0
+        
+    def _run(self, f):
+        """Writer thread: append full chunks column by column, then hand them back"""
+        with f:
+            while True:
+                item = self._full.get()
+                if item is None:
+                    break
+                chunk, rows = item
+                f.write(TELEMETRY_CHUNK.pack(rows))
+                for column in self._chunks[chunk]:
+                    f.write(memoryview(column)[:rows])
+                self.frames_written += rows
+                self._free.put(chunk)
+
+
+def read_session(path):
+    """Load a session file as a dictionary of NumPy arrays, one per column"""
+    if numpy is None:
+        raise ImportError("Reading telemetry requires NumPy (pip install numpy)")
+    with open(path, 'rb') as f:
+        data = f.read()
+        
+    magic, byte_order, count = TELEMETRY_HEADER.unpack_from(data, 0)
+    if magic != TELEMETRY_MAGIC:
+        raise ValueError(f"{path} is not a telemetry file")
+    offset = TELEMETRY_HEADER.size
+    columns = []
+    for _ in range(count):
+        name, typecode = TELEMETRY_COLUMN.unpack_from(data, offset)
+        columns.append((name.rstrip(b'\0').decode(), numpy.dtype(byte_order.decode() + typecode.decode())))
+        offset += TELEMETRY_COLUMN.size
+        
+    parts = {name: [] for name, _ in columns}
+    while offset < len(data):
+        (rows,) = TELEMETRY_CHUNK.unpack_from(data, offset)
+        offset += TELEMETRY_CHUNK.size
+        for name, dtype in columns:
+            parts[name].append(numpy.frombuffer(data, dtype, rows, offset))
+            offset += rows * dtype.itemsize
+    return {name: numpy.concatenate(chunks) if chunks else numpy.empty(0, dtype)
+            for (name, dtype), chunks in zip(columns, parts.values())}
+
+
+def default_telemetry_path():
+    """Build a timestamped session path inside TELEMETRY_DIR"""
+    os.makedirs(TELEMETRY_DIR, exist_ok=True)
+    return os.path.join(TELEMETRY_DIR, time.strftime('session_%Y%m%d_%H%M%S.f1t'))
+
+
+def main():
+    """Print a summary of a telemetry session"""
+    parser = argparse.ArgumentParser(description="Summarise a telemetry session")
+    parser.add_argument('path', help="session file written by the game")
+    args = parser.parse_args()
+    
+    session = read_session(args.path)
+    frame_ms = session['frame_ms']
+    print(f"{len(frame_ms)} frames, {frame_ms.mean():.2f} ms mean, "
+          f"{numpy.percentile(frame_ms, 99):.2f} ms 99th percentile" if len(frame_ms) else "No frames")
+    slow = numpy.flatnonzero(frame_ms > 1000 / FPS)
+    print(f"{len(slow)} frames over the {1000 / FPS:.1f} ms budget")
+    for index in numpy.flatnonzero(session['crashed']):
+        print(f"  crash at frame {session['frame'][index]}: score {session['score'][index]}, "
+              f"x {session['player_x'][index]:.0f}, speed {session['speed'][index]:.1f}, "
+              f"{session['obstacles'][index]} cars on screen")
+
+
+if __name__ == "__main__":
+    main()